@@ -1,12 +1,56 @@
+import time
+# Отсчет для замера времени запуска (--startup-benchmark)
+STARTUP_STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
-from PIL import Image, ImageTk
-import sqlite3
 import hashlib
 import os
+import sys
 import json
+import weakref
 from datetime import datetime
-import random
+
+IMPORTS_DONE = time.perf_counter()
+
+
+def import_app_modules():
+    """Модули данных и экранов: импортируются после первого кадра, стартовому
+    экрану они не нужны"""
+    global JobFinderRepository, FeedPager, build_resume_query
+    global EXPORT_APPLICATION_COLUMNS, EXPORT_VACANCY_COLUMNS, STATUS_CONFLICT
+    global Vacancy, VacancyColumns, date_key, salary_text, BackgroundExecutor
+    global VacancyCard, ResumeCard, VirtualCardList, ChunkedTreeLoader, ScreenManager
+    global sqlite3
+    import sqlite3
+    from jobfinder_db import (JobFinderRepository, FeedPager, build_resume_query,
+                              EXPORT_APPLICATION_COLUMNS, EXPORT_VACANCY_COLUMNS,
+                              STATUS_CONFLICT)
+    from jobfinder_records import Vacancy, VacancyColumns, date_key, salary_text
+    from jobfinder_tasks import BackgroundExecutor
+    from jobfinder_ui import (VacancyCard, ResumeCard, VirtualCardList, ChunkedTreeLoader,
+                              ScreenManager)
+
+
+# Размер демонстрационных данных, создаваемых при первом запуске
+SAMPLE_DATA_SIZES = {'employers': 15, 'seekers': 100, 'vacancies': 300, 'applications': 800}
+
+# Допустимое время до первого кадра в режиме --startup-benchmark, мс
+STARTUP_BUDGET_MS = 500
+
+# Режим профилирования (--profile или JOBFINDER_PROFILE=1): замеры запросов и
+# построения экранов, окно замеров по F12, трасса в TRACE_PATH при выходе
+PROFILING = '--profile' in sys.argv or os.environ.get('JOBFINDER_PROFILE') == '1'
+TRACE_PATH = 'jobfinder_trace.json'
+
+# Тонкий клиент (--server URL или JOBFINDER_SERVER=URL): данные через сервис
+# jobfinder_server.py вместо прямой работы с jobfinder.db
+SERVER_URL = os.environ.get('JOBFINDER_SERVER')
+if '--server' in sys.argv[:-1]:
+    SERVER_URL = sys.argv[sys.argv.index('--server') + 1]
+
+# Период проверки новых записей для значков в меню, мс
+BADGE_POLL_INTERVAL = 30000
 
 class JobFinderApp:
     def __init__(self, root):
@@ -35,15 +79,66 @@ class JobFinderApp:
         self.current_user = None
         self.user_type = None
         
-        # База данных
-        self.init_database()
-        
-        # Загрузка тестовых данных
-        self.load_sample_data()
+        # Значки новых записей в меню: экран -> (кнопка, текст кнопки)
+        self.badges = {}
+        self.badge_job = None
+        
+        # Профилирование включается до создания базы и экранов
+        self.tracer = None
+        if PROFILING:
+            from jobfinder_trace import Tracer
+            self.tracer = Tracer()
+        
+        # База данных и модули экранов - после первого кадра
+        self.db = None
+        self.tasks = None
+        self.recommender = None
+        self.exit_code = 0
+        if self.tracer:
+            self.enable_profiling()
+        self.startup_times = {'imports': IMPORTS_DONE - STARTUP_STARTED}
+        self.root.bind('<Map>', self.on_first_frame, add='+')
         
         # Запуск стартового экрана
         self.show_start_screen()
     
+    def on_first_frame(self, event):
+        """Окно показано: замерить время запуска и подготовить базу"""
+        if event.widget is not self.root or 'first_frame' in self.startup_times:
+            return
+        self.startup_times['first_frame'] = time.perf_counter() - STARTUP_STARTED
+        # Модули приложения, загруженные до первого кадра (должно быть пусто)
+        self.startup_modules = sorted(name for name in sys.modules
+                                      if name.startswith('jobfinder'))
+        # after_idle - чтобы стартовый экран успел отрисоваться
+        self.root.after_idle(self.prepare_database)
+    
+    def prepare_database(self):
+        """Импортировать модули приложения, открыть базу, обновить схему (если
+        устарела) и добавить тестовые данные"""
+        import_app_modules()
+        self.startup_times['modules'] = time.perf_counter() - STARTUP_STARTED
+        self.init_database()
+        # Базу тонкого клиента готовит сервис
+        if not SERVER_URL:
+            if self.db.needs_migration():
+                self.db.migrate()
+            self.load_sample_data()
+        self.startup_times['ready'] = time.perf_counter() - STARTUP_STARTED
+        if '--startup-benchmark' in sys.argv:
+            self.report_startup()
+    
+    def report_startup(self):
+        """Вывести замеры запуска в stdout (JSON, мс) и закрыть окно"""
+        times = {name: round(seconds * 1000, 1)
+                 for name, seconds in self.startup_times.items()}
+        times['modules_before_first_frame'] = self.startup_modules
+        print(json.dumps(times))
+        if times['first_frame'] > STARTUP_BUDGET_MS:
+            print(f"Первый кадр медленнее {STARTUP_BUDGET_MS} мс", file=sys.stderr)
+            self.exit_code = 1
+        self.root.destroy()
+    
     def setup_styles(self):
         """Настройка стилей для виджетов"""
         style = ttk.Style()
@@ -90,114 +185,71 @@ class JobFinderApp:
     
     def init_database(self):
         """Инициализация базы данных"""
-        self.conn = sqlite3.connect('jobfinder.db', check_same_thread=False)
-        self.cursor = self.conn.cursor()
-        
-        # Создание таблиц
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                user_type TEXT NOT NULL,
-                first_name TEXT,
-                last_name TEXT,
-                phone TEXT,
-                city TEXT,
-                company_name TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS resumes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                desired_position TEXT,
-                salary_expectation INTEGER,
-                experience TEXT,
-                education TEXT,
-                skills TEXT,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users (id)
-            )
-        ''')
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS vacancies (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                employer_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                description TEXT,
-                requirements TEXT,
-                salary_from INTEGER,
-                salary_to INTEGER,
-                employment_type TEXT,
-                city TEXT,
-                is_active BOOLEAN DEFAULT 1,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (employer_id) REFERENCES users (id)
-            )
-        ''')
-        
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS applications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                resume_id INTEGER NOT NULL,
-                vacancy_id INTEGER NOT NULL,
-                cover_letter TEXT,
-                status TEXT DEFAULT 'pending',
-                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (resume_id) REFERENCES resumes (id),
-                FOREIGN KEY (vacancy_id) REFERENCES vacancies (id)
-            )
-        ''')
-        
-        self.conn.commit()
+        if SERVER_URL:
+            from jobfinder_server import RemoteRepository
+            self.db = RemoteRepository(SERVER_URL, tracer=self.tracer)
+        else:
+            self.db = JobFinderRepository('jobfinder.db', tracer=self.tracer)
+        # Потоки для фоновых запросов (каждый со своим соединением)
+        self.tasks = BackgroundExecutor(self.root)
+        # Движок рекомендаций создается при первом открытии ленты; ему нужна
+        # локальная база, поэтому в режиме тонкого клиента его нет
+        self.recommender = False if SERVER_URL else None
+    
+    def enable_profiling(self):
+        """Замерять построение экранов (show_*/render_*) и открыть окно по F12"""
+        for name in dir(self):
+            if name.startswith(('show_', 'render_')):
+                setattr(self, name, self.traced_screen(name, getattr(self, name)))
+        self.profiler_panel = None
+        self.root.bind_all('<F12>', lambda e: self.open_profiler_panel())
+    
+    def traced_screen(self, name, build):
+        """Обертка построителя экрана: время Python-кода, число виджетов и
+        отдельно время раскладки Tk (update_idletasks)"""
+        def traced(*args, **kwargs):
+            with self.tracer.span(name, 'screen') as info:
+                result = build(*args, **kwargs)
+                info['widgets'] = self.count_widgets(self.root)
+            with self.tracer.span(name + ': layout', 'tk'):
+                self.root.update_idletasks()
+            return result
+        return traced
+    
+    def count_widgets(self, widget):
+        """Число виджетов в дереве widget"""
+        return 1 + sum(self.count_widgets(child) for child in widget.winfo_children())
+    
+    def open_profiler_panel(self):
+        """Открыть окно замеров (или поднять уже открытое)"""
+        from jobfinder_ui import ProfilerPanel
+        if self.profiler_panel is not None and self.profiler_panel.winfo_exists():
+            self.profiler_panel.lift()
+            return
+        self.profiler_panel = ProfilerPanel(self.root, self.tracer, self.export_trace)
+    
+    def export_trace(self):
+        """Сохранить трассу в формате Chrome Trace Event"""
+        path = filedialog.asksaveasfilename(
+            parent=self.profiler_panel or self.root,
+            title="Экспорт трассы",
+            initialfile=f"jobfinder_trace_{datetime.now():%Y%m%d_%H%M%S}.json",
+            defaultextension='.json',
+            filetypes=[("Chrome trace", "*.json")])
+        if path:
+            count = self.tracer.export(path)
+            messagebox.showinfo("Экспорт трассы",
+                                f"Сохранено замеров: {count}\n"
+                                "Открыть: chrome://tracing или ui.perfetto.dev")
     
     def load_sample_data(self):
         """Загрузка тестовых данных"""
         # Проверяем, есть ли уже вакансии
-        self.cursor.execute("SELECT COUNT(*) FROM vacancies")
-        if self.cursor.fetchone()[0] == 0:
-            # Добавляем тестовые вакансии
-            sample_vacancies = [
-                ("Python Developer", "Разработка backend-части веб-приложений", "Опыт работы от 1 года, знание Django/Flask", 120000, 200000, "full_time", "Москва"),
-                ("Frontend Developer", "Создание пользовательских интерфейсов", "Знание React/Vue.js, опыт от 2 лет", 100000, 180000, "full_time", "Санкт-Петербург"),
-                ("Data Analyst", "Анализ данных, построение отчетов", "SQL, Python, Excel, опыт от 1 года", 80000, 150000, "full_time", "Новосибирск"),
-                ("UX/UI Designer", "Дизайн интерфейсов мобильных и веб-приложений", "Figma, Adobe XD, опыт от 2 лет", 90000, 160000, "full_time", "Екатеринбург"),
-                ("DevOps Engineer", "Настройка и поддержка инфраструктуры", "Docker, Kubernetes, AWS, опыт от 3 лет", 150000, 250000, "full_time", "Москва"),
-                ("Project Manager", "Управление IT-проектами", "Опыт управления командами от 3 лет", 130000, 220000, "full_time", "Казань"),
-                ("QA Engineer", "Тестирование программного обеспечения", "Опыт тестирования от 1 года", 70000, 130000, "full_time", "Москва"),
-                ("System Administrator", "Администрирование IT-инфраструктуры", "Linux, Windows Server, сетевые технологии", 60000, 120000, "full_time", "Ростов-на-Дону"),
-                ("Mobile Developer", "Разработка мобильных приложений", "Kotlin/Swift или React Native/Flutter", 110000, 190000, "full_time", "Санкт-Петербург"),
-                ("Marketing Manager", "Разработка и реализация маркетинговых стратегий", "Опыт в digital-маркетинге от 2 лет", 90000, 160000, "full_time", "Москва"),
-                ("Backend Developer", "Разработка серверной логики", "Node.js/Python/Java, опыт от 2 лет", 130000, 220000, "remote", "Удаленно"),
-                ("Data Scientist", "Построение ML-моделей", "Python, ML-библиотеки, опыт от 2 лет", 140000, 250000, "hybrid", "Москва"),
-                ("HR Specialist", "Подбор IT-персонала", "Опыт рекрутинга в IT от 2 лет", 70000, 130000, "full_time", "Москва"),
-                ("SEO Specialist", "Продвижение сайтов в поисковых системах", "Опыт SEO-оптимизации от 1.5 лет", 60000, 120000, "remote", "Удаленно"),
-                ("Content Manager", "Создание и редактирование контента", "Копирайтинг, редактура, SMM", 50000, 100000, "part_time", "Санкт-Петербург")
-            ]
-            
-            # Создаем тестового работодателя
-            self.cursor.execute("""
-                INSERT OR IGNORE INTO users (email, password_hash, user_type, company_name) 
-                VALUES (?, ?, ?, ?)
-            """, ('employer@test.com', self.hash_password('123'), 'employer', 'IT Solutions Inc.'))
-            
-            employer_id = self.cursor.lastrowid
-            
-            # Добавляем вакансии
-            for vacancy in sample_vacancies:
-                self.cursor.execute("""
-                    INSERT INTO vacancies (employer_id, title, description, requirements, 
-                                         salary_from, salary_to, employment_type, city)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (employer_id, *vacancy))
-            
-            self.conn.commit()
+        if not self.db.has_vacancies():
+            # Демонстрационный набор: вход employer@test.com или seeker@test.com,
+            # пароль 123 (у остальных пользователей тот же)
+            from jobfinder_seed import generate_dataset
+            generate_dataset(self.db, demo_accounts=True, **SAMPLE_DATA_SIZES)
     
     def hash_password(self, password):
         """Хеширование пароля"""
@@ -461,13 +513,7 @@ class JobFinderApp:
         
         password_hash = self.hash_password(password)
         
-        self.cursor.execute("""
-            SELECT id, user_type, first_name, last_name, company_name 
-            FROM users 
-            WHERE email = ? AND password_hash = ?
-        """, (email, password_hash))
-        
-        user = self.cursor.fetchone()
+        user = self.db.find_user(email, password_hash)
         
         if user:
             self.current_user = {
@@ -506,18 +552,11 @@ class JobFinderApp:
             password_hash = self.hash_password(password)
             
             if user_type == 'seeker':
-                self.cursor.execute("""
-                    INSERT INTO users (email, password_hash, user_type, first_name, last_name)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (email, password_hash, user_type, 
-                      kwargs.get('first_name', ''), kwargs.get('last_name', '')))
+                self.db.create_seeker(email, password_hash,
+                                      kwargs.get('first_name', ''), kwargs.get('last_name', ''))
             else:
-                self.cursor.execute("""
-                    INSERT INTO users (email, password_hash, user_type, company_name)
-                    VALUES (?, ?, ?, ?)
-                """, (email, password_hash, user_type, kwargs.get('company_name', '')))
+                self.db.create_employer(email, password_hash, kwargs.get('company_name', ''))
             
-            self.conn.commit()
             messagebox.showinfo("Успех", "Регистрация прошла успешно!")
             self.show_login_screen(user_type)
             
@@ -528,6 +567,13 @@ class JobFinderApp:
         """Показать интерфейс соискателя"""
         self.clear_window()
         
+        # Избранное загружается один раз в фоне; карточки берут состояние из
+        # множества и обновляются, когда оно загружено
+        self.favorite_ids = set()
+        self.vacancy_cards = weakref.WeakSet()
+        self.tasks.submit(self.db.get_favorite_ids, self.current_user['id'],
+                          on_success=self.set_favorite_ids)
+        
         # Основной контейнер
         main_container = tk.Frame(self.root, bg=self.colors['light'])
         main_container.pack(fill='both', expand=True)
@@ -554,7 +600,10 @@ class JobFinderApp:
             ("⚙️ Профиль", self.show_seeker_profile),
             ("🚪 Выйти", self.logout)
         ]
+        # Пункты со значком числа новых записей (ключ экрана в CHANGE_FEEDS)
+        badge_screens = {"📋 Лента вакансий": 'feed'}
         
+        badges = {}
         for text, command in nav_items:
             btn = tk.Button(sidebar, text=text,
                           font=('Segoe UI', 11),
@@ -565,10 +614,17 @@ class JobFinderApp:
                           cursor='hand2',
                           command=command)
             btn.pack(fill='x', padx=10, pady=5)
+            if text in badge_screens:
+                badges[badge_screens[text]] = (btn, text)
         
         # Основная область
         self.main_content = tk.Frame(main_container, bg=self.colors['white'])
         self.main_content.pack(side='right', fill='both', expand=True)
+        self.screens = ScreenManager(self.main_content, self.db.table_versions)
+        self.unseen_handlers = {}
+        # Списки карточек сохраненных лент по режиму (рекомендации/новые)
+        self.feed_lists = {}
+        self.start_badges(badges)
         
         # Показываем ленту вакансий по умолчанию
         self.show_vacancy_feed()
@@ -600,7 +656,9 @@ class JobFinderApp:
             ("⚙️ Профиль компании", self.show_employer_profile),
             ("🚪 Выйти", self.logout)
         ]
+        badge_screens = {"📨 Отклики": 'employer_applications'}
         
+        badges = {}
         for text, command in nav_items:
             btn = tk.Button(sidebar, text=text,
                           font=('Segoe UI', 11),
@@ -611,43 +669,86 @@ class JobFinderApp:
                           cursor='hand2',
                           command=command)
             btn.pack(fill='x', padx=10, pady=5)
+            if text in badge_screens:
+                badges[badge_screens[text]] = (btn, text)
         
         self.main_content = tk.Frame(main_container, bg=self.colors['white'])
         self.main_content.pack(side='right', fill='both', expand=True)
+        self.screens = ScreenManager(self.main_content, self.db.table_versions)
+        self.unseen_handlers = {}
+        self.start_badges(badges)
         
         self.show_my_vacancies()
     
-    def show_vacancy_feed(self):
-        """Показать ленту вакансий"""
-        self.clear_main_content()
+    def show_vacancy_feed(self, recommended=None):
+        """Показать ленту вакансий (рекомендации или новые).
+        
+        recommended=None - режим, открывавшийся последним. Режимы - отдельные
+        сохраненные экраны: переключение не перестраивает другой.
+        """
+        recommender = self.get_recommender()
+        if recommended is None:
+            recommended = getattr(self, 'feed_mode', True)
+        recommended = recommended and recommender is not None
+        self.feed_mode = recommended
+        key = self.feed_screen_key(recommended)
+        # Порядок рекомендаций зависит от резюме и откликов, новых - только от вакансий
+        tables = ('vacancies', 'resumes', 'applications') if recommended else ('vacancies',)
+        if not self.open_screen(key, tables):
+            # Изменения вакансий (в том числе других клиентов) - в показанные карточки
+            self.merge_unseen('feed')
+            return
+        self.screens.set_refresh(lambda: self.refresh_feed(recommended))
+        
+        self.set_badge('feed', 0)
+        self.unseen_handlers['feed'] = self.merge_feed_changes
+        if any(self.alive_feed_list(mode) for mode in (True, False)):
+            # Сохраненная лента другого режима получает изменения до отметки
+            self.merge_unseen('feed')
+        else:
+            # Лента строится заново - все изменения вакансий просмотрены
+            self.tasks.submit(self.db.mark_seen, self.current_user['id'], 'feed')
         
         # Заголовок
         header_frame = tk.Frame(self.main_content, bg=self.colors['primary'], height=80)
         header_frame.pack(fill='x')
         header_frame.pack_propagate(False)
         
-        tk.Label(header_frame, text="💼 Лента вакансий",
+        title_frame = tk.Frame(header_frame, bg=self.colors['primary'])
+        title_frame.pack(expand=True)
+        
+        tk.Label(title_frame, text="💼 Лента вакансий",
                 font=('Segoe UI', 20, 'bold'),
                 fg=self.colors['white'],
-                bg=self.colors['primary']).pack(expand=True)
+                bg=self.colors['primary']).pack(side='left', padx=10)
+        
+        if recommender is not None:
+            for text, mode in (("⭐ Для вас", True), ("🕒 Новые", False)):
+                tk.Button(title_frame, text=text,
+                         font=('Segoe UI', 11, 'bold' if mode == recommended else 'normal'),
+                         bg=self.colors['white'] if mode == recommended else self.colors['primary'],
+                         fg=self.colors['primary'] if mode == recommended else self.colors['white'],
+                         cursor='hand2',
+                         command=lambda mode=mode: self.show_vacancy_feed(mode)).pack(side='left', padx=5)
         
         # Контейнер для вакансий
         content_frame = tk.Frame(self.main_content, bg=self.colors['light'])
         content_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
-        # Получаем вакансии из базы данных
-        self.cursor.execute("""
-            SELECT v.id, v.title, v.description, v.salary_from, v.salary_to, 
-                   v.city, v.employment_type, u.company_name, v.created_at
-            FROM vacancies v
-            JOIN users u ON v.employer_id = u.id
-            WHERE v.is_active = 1
-            ORDER BY v.created_at DESC
-            LIMIT 20
-        """)
-        
-        vacancies = self.cursor.fetchall()
+        if recommended:
+            # Лучшие вакансии для активного резюме, оценка всех вакансий в фоне
+            self.load_screen_data(content_frame, recommender.recommend_vacancies,
+                                  self.current_user['id'], 100,
+                                  on_success=lambda vacancies: self.render_recommendations(content_frame, vacancies))
+            return
         
+        # Получаем первую страницу вакансий, следующие подгружаются при прокрутке
+        self.feed_pager = FeedPager(self.db, self.tasks, page_size=20)
+        self.load_in_background(content_frame, self.feed_pager.first_page,
+                                on_success=lambda vacancies: self.render_vacancy_feed(content_frame, vacancies))
+    
+    def render_vacancy_feed(self, content_frame, vacancies):
+        """Отобразить первую страницу ленты"""
         if not vacancies:
             tk.Label(content_frame, text="Нет доступных вакансий",
                     font=('Segoe UI', 16),
@@ -655,99 +756,191 @@ class JobFinderApp:
                     bg=self.colors['light']).pack(pady=50)
             return
         
-        # Создаем скроллируемый фрейм
-        canvas = tk.Canvas(content_frame, bg=self.colors['light'], highlightthickness=0)
-        scrollbar = ttk.Scrollbar(content_frame, orient='vertical', command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg=self.colors['light'])
+        # Виртуализированный список: виджеты создаются только для видимых
+        # карточек, а строки хранятся по столбцам (VacancyColumns) - длинная
+        # пролистанная лента занимает немного памяти
+        pager = self.feed_pager
+        feed_list = VirtualCardList(content_frame, self.create_vacancy_card,
+                                    lambda card, vacancy: card.show(vacancy),
+                                    bg=self.colors['light'],
+                                    on_near_end=lambda: self.load_next_page(pager, feed_list))
+        feed_list.pack()
+        feed_list.set_rows(VacancyColumns(vacancies))
+        self.feed_lists[False] = feed_list
+        
+        # Пока пользователь читает первую страницу, загружаем вторую
+        self.feed_pager.prefetch()
+    
+    def feed_screen_key(self, recommended):
+        """Ключ сохраненного экрана ленты в режиме recommended"""
+        return 'feed_recommended' if recommended else 'feed_new'
+    
+    def alive_feed_list(self, recommended):
+        """Список карточек сохраненной ленты режима recommended или None"""
+        feed_list = self.feed_lists.get(recommended)
+        if feed_list is None or not feed_list.canvas.winfo_exists():
+            return None
+        return feed_list
+    
+    def merge_feed_changes(self, rows):
+        """Обновить в сохраненных лентах карточки измененных вакансий.
+        
+        rows - строки ленты из take_unseen; у снятых с публикации вакансий
+        заголовок равен None, они убираются. В ленту новых вакансий новые
+        добавляются сверху, более старые измененные - только если уже
+        загружены (остальные придут со своими страницами). В рекомендациях
+        меняются только показанные карточки: порядок пересчитывается, когда
+        меняются резюме или отклики (refresh_feed).
+        """
+        changed = {row[0]: row for row in rows}
+        for recommended in (True, False):
+            feed_list = self.alive_feed_list(recommended)
+            if feed_list is None:
+                continue
+            if not feed_list.rows:
+                # Пустую ленту проще построить заново
+                self.rebuild_screen(self.feed_screen_key(recommended),
+                                    lambda mode=recommended: self.show_vacancy_feed(mode))
+                continue
+            merged = VacancyColumns()
+            if not recommended:
+                top = feed_list.rows[0]
+                merged.extend(
+                    row for row in changed.values()
+                    if row[1] is not None
+                    and (date_key(row[8]), row[0]) > (date_key(top.created_at), top.id))
+            for vacancy in feed_list.rows:
+                row = changed.get(vacancy.id)
+                if row is None:
+                    merged.append(vacancy)
+                elif row[1] is not None:
+                    merged.append(row)
+            feed_list.set_rows(merged, keep_position=True)
+    
+    def refresh_feed(self, recommended):
+        """Таблицы сохраненной ленты изменились.
         
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
+        Изменения вакансий приходят в карточки через merge_unseen; для
+        рекомендаций, кроме того, в фоне пересчитывается порядок, и список
+        обновляется без перестроения экрана и с той же прокруткой.
+        """
+        if not recommended:
+            return
         
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        def update(vacancies):
+            feed_list = self.alive_feed_list(True)
+            if feed_list is None or not vacancies or not feed_list.rows:
+                self.rebuild_screen('feed_recommended', lambda: self.show_vacancy_feed(True))
+                return
+            feed_list.set_rows(VacancyColumns(vacancies), keep_position=True)
         
-        # Отображаем вакансии
-        for i, vacancy in enumerate(vacancies):
-            vac_frame = tk.Frame(scrollable_frame, bg=self.colors['white'],
-                                relief='groove', borderwidth=1)
-            vac_frame.pack(fill='x', padx=10, pady=10, ipady=10)
-            
-            # Заголовок и зарплата
-            title_frame = tk.Frame(vac_frame, bg=self.colors['white'])
-            title_frame.pack(fill='x', padx=20, pady=(10, 5))
-            
-            tk.Label(title_frame, text=vacancy[1], 
-                    font=('Segoe UI', 16, 'bold'),
-                    fg=self.colors['dark'],
-                    bg=self.colors['white'],
-                    anchor='w').pack(side='left')
-            
-            salary_text = f"💰 {vacancy[3]:,} - {vacancy[4]:,} руб."
-            tk.Label(title_frame, text=salary_text,
-                    font=('Segoe UI', 14),
-                    fg=self.colors['success'],
-                    bg=self.colors['white']).pack(side='right')
-            
-            # Компания и локация
-            info_frame = tk.Frame(vac_frame, bg=self.colors['white'])
-            info_frame.pack(fill='x', padx=20, pady=5)
-            
-            tk.Label(info_frame, text=f"🏢 {vacancy[7]}",
-                    font=('Segoe UI', 12),
-                    fg=self.colors['gray'],
-                    bg=self.colors['white']).pack(side='left')
-            
-            location_text = f"📍 {vacancy[5]} • {self.get_employment_type(vacancy[6])}"
-            tk.Label(info_frame, text=location_text,
-                    font=('Segoe UI', 12),
+        self.tasks.submit(self.get_recommender().recommend_vacancies,
+                          self.current_user['id'], 100, on_success=update)
+    
+    def render_recommendations(self, content_frame, vacancies):
+        """Отобразить рекомендованные вакансии"""
+        if not vacancies:
+            tk.Label(content_frame, text="Создайте резюме, чтобы получать рекомендации",
+                    font=('Segoe UI', 16),
                     fg=self.colors['gray'],
-                    bg=self.colors['white']).pack(side='right')
-            
-            # Описание
-            description = vacancy[2][:200] + "..." if len(vacancy[2]) > 200 else vacancy[2]
-            tk.Label(vac_frame, text=description,
-                    font=('Segoe UI', 11),
-                    fg=self.colors['dark'],
-                    bg=self.colors['white'],
-                    wraplength=800,
-                    justify='left',
-                    anchor='w').pack(fill='x', padx=20, pady=10)
+                    bg=self.colors['light']).pack(pady=(50, 20))
             
-            # Кнопки действий
-            button_frame = tk.Frame(vac_frame, bg=self.colors['white'])
-            button_frame.pack(fill='x', padx=20, pady=(5, 10))
-            
-            details_btn = tk.Button(button_frame, text="Подробнее",
-                                   font=('Segoe UI', 10),
-                                   bg=self.colors['primary'],
-                                   fg='white',
-                                   cursor='hand2',
-                                   command=lambda v=vacancy: self.show_vacancy_details(v))
-            details_btn.pack(side='left', padx=5)
+            tk.Button(content_frame, text="Показать новые вакансии",
+                     font=('Segoe UI', 12),
+                     bg=self.colors['primary'],
+                     fg='white',
+                     cursor='hand2',
+                     command=lambda: self.show_vacancy_feed(False)).pack()
+            return
+        
+        feed_list = VirtualCardList(content_frame, self.create_vacancy_card,
+                                    lambda card, vacancy: card.show(vacancy),
+                                    bg=self.colors['light'])
+        feed_list.pack()
+        feed_list.set_rows(VacancyColumns(vacancies))
+        self.feed_lists[True] = feed_list
+    
+    def get_recommender(self):
+        """Движок рекомендаций или None, если NumPy не установлен"""
+        if self.recommender is None:
+            try:
+                from jobfinder_recommend import RecommendationEngine
+            except ImportError:
+                self.recommender = False
+            else:
+                cache_path = os.path.splitext(self.db.db_path)[0] + '_vectors.npz'
+                self.recommender = RecommendationEngine(self.db, cache_path)
+        return self.recommender or None
+    
+    def load_next_page(self, pager, card_list):
+        """Добавить в список следующую страницу, загруженную заранее"""
+        if pager.exhausted and not pager.next_ready():
+            return
+        if getattr(pager, 'page_pending', False):
+            return
+        
+        if not pager.next_ready():
+            # Страница еще загружается — проверим позже, не блокируя интерфейс
+            pager.prefetch()
+            pager.page_pending = True
             
-            apply_btn = tk.Button(button_frame, text="Откликнуться",
-                                 font=('Segoe UI', 10, 'bold'),
-                                 bg=self.colors['success'],
-                                 fg=self.colors['dark'],
-                                 cursor='hand2',
-                                 command=lambda v=vacancy: self.apply_to_vacancy(v[0]))
-            apply_btn.pack(side='left', padx=5)
+            def retry():
+                pager.page_pending = False
+                if card_list.canvas.winfo_exists():
+                    self.load_next_page(pager, card_list)
             
-            favorite_btn = tk.Button(button_frame, text="⭐ В избранное",
-                                    font=('Segoe UI', 10),
-                                    bg=self.colors['accent'],
-                                    fg='white',
-                                    cursor='hand2')
-            favorite_btn.pack(side='left', padx=5)
+            self.root.after(50, retry)
+            return
         
-        canvas.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
+        card_list.extend(pager.take_next())
+        pager.prefetch()
+    
+    def create_vacancy_card(self, parent, selection=None, on_select=None):
+        """Карточка вакансии для ленты или результатов поиска.
+        
+        selection - множество отмеченных id для массового отклика
+        """
+        card = VacancyCard(parent, self.colors, self.get_employment_type,
+                           self.show_vacancy_details, self.apply_to_vacancy,
+                           self.toggle_favorite, self.is_favorite,
+                           selection, on_select)
+        self.vacancy_cards.add(card)
+        return card
+    
+    def set_favorite_ids(self, favorite_ids):
+        """Избранное загружено: отметить карточки, которые уже показаны"""
+        self.favorite_ids.update(favorite_ids)
+        for card in list(self.vacancy_cards):
+            if card.winfo_exists() and card.vacancy and card.vacancy.id in favorite_ids:
+                card.update_favorite()
+    
+    def is_favorite(self, vacancy_id):
+        """В избранном ли вакансия (без запроса к базе)"""
+        return vacancy_id in self.favorite_ids
+    
+    def toggle_favorite(self, vacancy_id):
+        """Добавить вакансию в избранное или убрать из него"""
+        if vacancy_id in self.favorite_ids:
+            self.db.remove_favorite(self.current_user['id'], vacancy_id)
+            self.favorite_ids.discard(vacancy_id)
+            # На открытом экране избранного карточка убирается сразу
+            favorites = getattr(self, 'favorites_list', None)
+            if (self.screens.current == 'favorites' and favorites is not None
+                    and favorites.canvas.winfo_exists()):
+                favorites.set_rows(favorites.rows.without(vacancy_id), keep_position=True)
+                self.screens.sync()
+        else:
+            self.db.add_favorite(self.current_user['id'], vacancy_id)
+            self.favorite_ids.add(vacancy_id)
+        # Та же вакансия может быть видна в другой карточке (лента, поиск)
+        for card in list(self.vacancy_cards):
+            if card.winfo_exists() and card.vacancy and card.vacancy.id == vacancy_id:
+                card.update_favorite()
     
     def show_vacancy_search(self):
         """Показать поиск вакансий"""
-        self.clear_main_content()
+        if not self.open_screen('vacancy_search'):
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['primary'], height=80)
         header_frame.pack(fill='x')
@@ -774,9 +967,10 @@ class JobFinderApp:
                 font=('Segoe UI', 12),
                 bg=self.colors['white']).grid(row=0, column=2, padx=10, pady=10, sticky='w')
         
-        cities = ['Любой', 'Москва', 'Санкт-Петербург', 'Новосибирск', 'Екатеринбург', 
-                 'Казань', 'Удаленно']
-        city_combo = ttk.Combobox(filter_frame, values=cities, width=15)
+        # Значения фасетов подписаны числом найденных вакансий; подпись -> значение
+        city_values = {'Любой': None}
+        type_values = {'Любой': None}
+        city_combo = ttk.Combobox(filter_frame, values=list(city_values), width=22)
         city_combo.set('Любой')
         city_combo.grid(row=0, column=3, padx=10, pady=10)
         
@@ -794,16 +988,244 @@ class JobFinderApp:
         salary_to_entry = tk.Entry(filter_frame, font=('Segoe UI', 12), width=15)
         salary_to_entry.grid(row=1, column=3, padx=10, pady=10)
         
+        tk.Label(filter_frame, text="Занятость:",
+                font=('Segoe UI', 12),
+                bg=self.colors['white']).grid(row=2, column=0, padx=10, pady=10, sticky='w')
+        
+        type_combo = ttk.Combobox(filter_frame, values=list(type_values), width=28,
+                                  state='readonly')
+        type_combo.set('Любой')
+        type_combo.grid(row=2, column=1, padx=10, pady=10)
+        
+        # Пороги зарплаты с числом вакансий: нажатие подставляет «Зарплата от»
+        salary_facets = tk.Frame(filter_frame, bg=self.colors['white'])
+        salary_facets.grid(row=3, column=0, columnspan=4, padx=10, sticky='w')
+        
+        # Результаты поиска
+        results_frame = tk.Frame(self.main_content, bg=self.colors['light'])
+        results_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        
+        def selected(combo, values):
+            # Город можно ввести вручную — тогда это текст без числа
+            text = combo.get().strip()
+            return values.get(text, None if text in ('', 'Любой') else text)
+        
+        def set_values(combo, values, counts, current, label):
+            values.clear()
+            values['Любой'] = None
+            for value, count in counts:
+                values[f"{label(value)} ({count:,})"] = value
+            if current is not None and current not in values.values():
+                values[f"{label(current)} (0)"] = current
+            combo['values'] = list(values)
+            combo.set(next(text for text, value in values.items() if value == current))
+        
+        def show_facets(facets):
+            if not salary_facets.winfo_exists():
+                return
+            total, cities, types, salaries = facets
+            set_values(city_combo, city_values, cities, selected(city_combo, city_values),
+                       str)
+            set_values(type_combo, type_values, types, selected(type_combo, type_values),
+                       self.get_employment_type)
+            
+            for widget in salary_facets.winfo_children():
+                widget.destroy()
+            tk.Label(salary_facets, text=f"Найдено: {total:,}   Зарплата:",
+                    font=('Segoe UI', 10),
+                    fg=self.colors['gray'],
+                    bg=self.colors['white']).pack(side='left')
+            for threshold, count in salaries:
+                tk.Button(salary_facets, text=f"от {threshold:,} ({count:,})",
+                         font=('Segoe UI', 10),
+                         bg=self.colors['white'],
+                         fg=self.colors['primary'],
+                         relief='flat', cursor='hand2',
+                         command=lambda threshold=threshold: apply_salary(threshold)
+                         ).pack(side='left', padx=2)
+        
+        search_callback = lambda: self.run_vacancy_search(
+            results_frame, keyword_entry.get(), selected(city_combo, city_values),
+            salary_from_entry.get(), salary_to_entry.get(),
+            selected(type_combo, type_values), show_facets
+        )
+        
+        def apply_salary(threshold):
+            salary_from_entry.delete(0, 'end')
+            salary_from_entry.insert(0, str(threshold))
+            search_callback()
+        
         search_btn = tk.Button(filter_frame, text="Найти",
                               font=('Segoe UI', 12, 'bold'),
                               bg=self.colors['success'],
                               fg=self.colors['dark'],
-                              width=20)
-        search_btn.grid(row=2, column=0, columnspan=4, pady=20)
+                              width=20,
+                              command=search_callback)
+        search_btn.grid(row=4, column=0, columnspan=4, pady=20)
+        
+        keyword_entry.bind('<Return>', lambda e: search_callback())
+        # Выбор значения фасета сразу применяет фильтр
+        city_combo.bind('<<ComboboxSelected>>', lambda e: search_callback())
+        type_combo.bind('<<ComboboxSelected>>', lambda e: search_callback())
+        
+        # Фасеты без фильтров — до первого поиска
+        self.tasks.submit(self.db.get_search_facets, on_success=show_facets)
+    
+    def run_vacancy_search(self, results_frame, keywords, city, salary_from, salary_to,
+                           employment_type=None, on_facets=None):
+        """Выполнить поиск вакансий и показать результаты.
+        
+        on_facets получает фасеты (get_search_facets) для тех же фильтров.
+        """
+        try:
+            salary_from = int(salary_from) if salary_from.strip() else None
+            salary_to = int(salary_to) if salary_to.strip() else None
+        except ValueError:
+            messagebox.showerror("Ошибка", "Зарплата должна быть числом")
+            return
+        
+        city = None if city in ('', 'Любой') else city
+        
+        for widget in results_frame.winfo_children():
+            widget.destroy()
+        
+        # Результат предыдущего, еще не завершенного поиска уже не нужен
+        if getattr(self, 'search_task', None) is not None:
+            self.search_task.cancel()
+        self.search_task = self.load_in_background(
+            results_frame, self.db.search_vacancies,
+            keywords, city, salary_from, salary_to, 50, employment_type,
+            on_success=lambda vacancies: self.render_search_results(results_frame, vacancies))
+        
+        if on_facets is not None:
+            if getattr(self, 'facets_task', None) is not None:
+                self.facets_task.cancel()
+            self.facets_task = self.tasks.submit(
+                self.db.get_search_facets, keywords, city, salary_from, salary_to,
+                employment_type, on_success=on_facets)
+    
+    def render_search_results(self, results_frame, vacancies):
+        """Отобразить результаты поиска вакансий"""
+        if not vacancies:
+            tk.Label(results_frame, text="По вашему запросу ничего не найдено",
+                    font=('Segoe UI', 16),
+                    fg=self.colors['gray'],
+                    bg=self.colors['light']).pack(pady=50)
+            return
+        
+        vacancies = [Vacancy.from_search_row(row) for row in vacancies]
+        
+        # Отмеченные вакансии: отклик на все одной транзакцией
+        selection = set()
+        cards = []
+        toolbar = tk.Frame(results_frame, bg=self.colors['light'])
+        toolbar.pack(fill='x', pady=(0, 10))
+        
+        count_label = tk.Label(toolbar, text="Выбрано: 0",
+                              font=('Segoe UI', 11),
+                              fg=self.colors['gray'],
+                              bg=self.colors['light'])
+        count_label.pack(side='left', padx=5)
+        
+        def update_selection():
+            # Отклики отправляются в фоне: результаты поиска могли смениться
+            if not count_label.winfo_exists():
+                return
+            count_label.config(text=f"Выбрано: {len(selection)}")
+            for card in cards:
+                card.update_selection()
+        
+        def select_all():
+            if len(selection) == len(vacancies):
+                selection.clear()
+            else:
+                selection.update(vacancy.id for vacancy in vacancies)
+            update_selection()
+        
+        tk.Button(toolbar, text="Выбрать все",
+                 font=('Segoe UI', 10),
+                 bg=self.colors['primary'],
+                 fg='white',
+                 cursor='hand2',
+                 command=select_all).pack(side='left', padx=5)
+        
+        tk.Button(toolbar, text="📨 Откликнуться на выбранные",
+                 font=('Segoe UI', 10, 'bold'),
+                 bg=self.colors['success'],
+                 fg=self.colors['dark'],
+                 cursor='hand2',
+                 command=lambda: self.apply_to_selected(vacancies, selection, update_selection)).pack(side='left', padx=5)
+        
+        def create_card(parent):
+            card = self.create_vacancy_card(parent, selection, lambda: count_label.config(text=f"Выбрано: {len(selection)}"))
+            cards.append(card)
+            return card
+        
+        # Совпадения в заголовке и описании выделены скобками
+        results = VirtualCardList(results_frame, create_card,
+                                  lambda card, vacancy: card.show(vacancy),
+                                  bg=self.colors['light'])
+        results.pack()
+        results.set_rows(vacancies)
+    
+    def submit_applications(self, vacancy_ids, on_success):
+        """Откликнуться активным резюме на вакансии в фоне.
+        
+        on_success получает множество id вакансий с новыми откликами;
+        если резюме нет, предлагает его создать.
+        """
+        user_id = self.current_user['id']
+        
+        def apply():
+            # Выполняется в потоке пула: оба запроса вне главного цикла
+            resume_id = self.db.get_resume_id(user_id)
+            if not resume_id:
+                return None
+            return set(self.db.create_applications(resume_id, vacancy_ids,
+                                                   "Заинтересован в вакансии"))
+        
+        def deliver(created):
+            if created is None:
+                messagebox.showerror("Ошибка", "Сначала создайте резюме")
+                self.show_my_resume()
+                return
+            on_success(created)
+        
+        def fail(error):
+            messagebox.showerror("Ошибка", f"Не удалось отправить отклики: {error}")
+        
+        return self.tasks.submit(apply, on_success=deliver, on_error=fail)
+    
+    def apply_to_selected(self, vacancies, selection, on_done):
+        """Откликнуться на отмеченные вакансии и сообщить, какие отклики новые"""
+        if not selection:
+            messagebox.showinfo("Информация", "Отметьте вакансии для отклика")
+            return
+        chosen = [vacancy for vacancy in vacancies if vacancy.id in selection]
+        self.submit_applications(
+            [vacancy.id for vacancy in chosen],
+            lambda created: self.show_applied(chosen, created, selection, on_done))
+    
+    def show_applied(self, chosen, created, selection, on_done):
+        """Отклики на отмеченные вакансии отправлены: снять отметки и сообщить итог"""
+        selection.clear()
+        on_done()
+        
+        # Заголовки поиска содержат подсветку, показываем исходные
+        new_titles = [vacancy.title for vacancy in chosen if vacancy.id in created]
+        message = f"Отправлено откликов: {len(created)}"
+        if new_titles:
+            message += "\n\n" + "\n".join(f"• {title}" for title in new_titles[:10])
+            if len(new_titles) > 10:
+                message += f"\n... и еще {len(new_titles) - 10}"
+        if len(chosen) > len(created):
+            message += f"\n\nУже были отклики: {len(chosen) - len(created)}"
+        messagebox.showinfo("Отклики", message)
     
     def show_my_resume(self):
         """Показать мое резюме"""
-        self.clear_main_content()
+        if not self.open_screen('my_resume', ('resumes',)):
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['primary'], height=80)
         header_frame.pack(fill='x')
@@ -817,16 +1239,13 @@ class JobFinderApp:
         content_frame = tk.Frame(self.main_content, bg=self.colors['white'])
         content_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
-        # Проверяем, есть ли резюме
-        self.cursor.execute("""
-            SELECT id, title, desired_position, salary_expectation, 
-                   experience, education, skills
-            FROM resumes 
-            WHERE user_id = ? AND is_active = 1
-        """, (self.current_user['id'],))
-        
-        resume = self.cursor.fetchone()
-        
+        # Проверяем, есть ли резюме (запрос выполняется в фоне)
+        self.load_screen_data(content_frame, self.db.get_active_resume,
+                                  self.current_user['id'],
+                                  on_success=lambda resume: self.render_my_resume(content_frame, resume))
+    
+    def render_my_resume(self, content_frame, resume):
+        """Отобразить резюме или предложение его создать"""
         if resume:
             # Отображаем существующее резюме
             tk.Label(content_frame, text=resume[2] or "Должность не указана",
@@ -897,7 +1316,8 @@ class JobFinderApp:
     
     def show_my_applications(self):
         """Показать мои отклики"""
-        self.clear_main_content()
+        if not self.open_screen('my_applications', ('applications', 'resumes')):
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['primary'], height=80)
         header_frame.pack(fill='x')
@@ -911,54 +1331,17 @@ class JobFinderApp:
         content_frame = tk.Frame(self.main_content, bg=self.colors['white'])
         content_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
-        # Получаем отклики пользователя
-        self.cursor.execute("""
-            SELECT a.id, v.title, u.company_name, a.status, 
-                   a.applied_at, a.cover_letter
-            FROM applications a
-            JOIN vacancies v ON a.vacancy_id = v.id
-            JOIN users u ON v.employer_id = u.id
-            JOIN resumes r ON a.resume_id = r.id
-            WHERE r.user_id = ?
-            ORDER BY a.applied_at DESC
-        """, (self.current_user['id'],))
-        
-        applications = self.cursor.fetchall()
-        
-        if not applications:
-            tk.Label(content_frame, text="У вас пока нет откликов",
-                    font=('Segoe UI', 16),
-                    fg=self.colors['gray'],
-                    bg=self.colors['white']).pack(pady=50)
-            return
-        
-        # Создаем таблицу для отображения откликов
+        # Отклики загружаются пачками, таблица заполняется постепенно
         columns = ('Вакансия', 'Компания', 'Статус', 'Дата отклика')
-        tree = ttk.Treeview(content_frame, columns=columns, show='headings', height=15)
-        
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=200)
-        
-        # Добавляем данные
-        for app in applications:
-            status_text = self.get_status_text(app[3])
-            status_color = self.get_status_color(app[3])
-            
-            tree.insert('', 'end', values=(
-                app[1], app[2], status_text, app[4]
-            ))
-        
-        # Панель прокрутки
-        scrollbar = ttk.Scrollbar(content_frame, orient='vertical', command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        
-        tree.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
+        self.load_applications_tree(content_frame, columns, 200,
+                                    self.db.stream_seeker_applications,
+                                    lambda app: (app[1], app[2], self.get_status_text(app[3]), app[4]),
+                                    "У вас пока нет откликов")
     
     def show_favorites(self):
         """Показать избранное"""
-        self.clear_main_content()
+        if not self.open_screen('favorites', ('favorites', 'vacancies')):
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['primary'], height=80)
         header_frame.pack(fill='x')
@@ -969,17 +1352,41 @@ class JobFinderApp:
                 fg=self.colors['white'],
                 bg=self.colors['primary']).pack(expand=True)
         
-        content_frame = tk.Frame(self.main_content, bg=self.colors['white'])
+        content_frame = tk.Frame(self.main_content, bg=self.colors['light'])
         content_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
-        tk.Label(content_frame, text="Раздел в разработке",
-                font=('Segoe UI', 18),
-                fg=self.colors['gray'],
-                bg=self.colors['white']).pack(expand=True)
+        # Страницы по ключу f.id: следующая загружается заранее, как в ленте
+        user_id = self.current_user['id']
+        pager = FeedPager(self.db, self.tasks, page_size=20,
+                          fetch=lambda before, limit: self.db.get_favorites(user_id, before, limit),
+                          cursor_of=lambda rows: rows[-1][9])
+        self.load_screen_data(content_frame, pager.first_page,
+                              on_success=lambda vacancies: self.render_favorites(content_frame, pager, vacancies))
+    
+    def render_favorites(self, content_frame, pager, vacancies):
+        """Отобразить первую страницу избранного"""
+        if not vacancies:
+            tk.Label(content_frame, text="В избранном пока пусто",
+                    font=('Segoe UI', 16),
+                    fg=self.colors['gray'],
+                    bg=self.colors['light']).pack(pady=50)
+            return
+        
+        # VacancyColumns берет из строк столбцы ленты; последний столбец -
+        # курсор страниц, он нужен только pager
+        favorites = VirtualCardList(content_frame, self.create_vacancy_card,
+                                    lambda card, vacancy: card.show(vacancy),
+                                    bg=self.colors['light'],
+                                    on_near_end=lambda: self.load_next_page(pager, favorites))
+        favorites.pack()
+        favorites.set_rows(VacancyColumns(vacancies))
+        self.favorites_list = favorites
+        pager.prefetch()
     
     def show_seeker_profile(self):
         """Показать профиль соискателя"""
-        self.clear_main_content()
+        if not self.open_screen('seeker_profile', ('users',)):
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['primary'], height=80)
         header_frame.pack(fill='x')
@@ -994,13 +1401,12 @@ class JobFinderApp:
         content_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Получаем данные пользователя
-        self.cursor.execute("""
-            SELECT first_name, last_name, email, phone, city
-            FROM users WHERE id = ?
-        """, (self.current_user['id'],))
-        
-        user_data = self.cursor.fetchone()
-        
+        self.load_screen_data(content_frame, self.db.get_seeker_profile,
+                                  self.current_user['id'],
+                                  on_success=lambda user_data: self.render_seeker_profile(content_frame, user_data))
+    
+    def render_seeker_profile(self, content_frame, user_data):
+        """Отобразить данные соискателя"""
         # Отображаем информацию
         info_frame = tk.Frame(content_frame, bg=self.colors['white'])
         info_frame.pack(pady=20)
@@ -1024,7 +1430,8 @@ class JobFinderApp:
     
     def show_my_vacancies(self):
         """Показать мои вакансии (для работодателя)"""
-        self.clear_main_content()
+        if not self.open_screen('my_vacancies', ('vacancies',)):
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['secondary'], height=80)
         header_frame.pack(fill='x')
@@ -1046,20 +1453,26 @@ class JobFinderApp:
                               command=self.show_create_vacancy)
         create_btn.pack(side='right', padx=10)
         
+        export_btn = tk.Button(title_frame, text="📤 Выгрузить",
+                              font=('Segoe UI', 12),
+                              bg=self.colors['primary'],
+                              fg='white',
+                              cursor='hand2',
+                              command=lambda: self.export_employer_data(
+                                  self.db.stream_vacancy_export,
+                                  EXPORT_VACANCY_COLUMNS, "vakansii"))
+        export_btn.pack(side='right', padx=10)
+        
         content_frame = tk.Frame(self.main_content, bg=self.colors['white'])
         content_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Получаем вакансии работодателя
-        self.cursor.execute("""
-            SELECT id, title, salary_from, salary_to, city, 
-                   employment_type, is_active, created_at
-            FROM vacancies 
-            WHERE employer_id = ?
-            ORDER BY created_at DESC
-        """, (self.current_user['id'],))
-        
-        vacancies = self.cursor.fetchall()
-        
+        self.load_screen_data(content_frame, self.db.get_employer_vacancies,
+                                  self.current_user['id'],
+                                  on_success=lambda vacancies: self.render_my_vacancies(content_frame, vacancies))
+    
+    def render_my_vacancies(self, content_frame, vacancies):
+        """Отобразить вакансии работодателя"""
         if not vacancies:
             tk.Label(content_frame, text="У вас пока нет вакансий",
                     font=('Segoe UI', 16),
@@ -1068,7 +1481,7 @@ class JobFinderApp:
             return
         
         # Отображаем вакансии
-        for vacancy in vacancies:
+        for vacancy in map(Vacancy.from_employer_row, vacancies):
             vac_frame = tk.Frame(content_frame, bg=self.colors['light'],
                                 relief='groove', borderwidth=1)
             vac_frame.pack(fill='x', pady=10, padx=10)
@@ -1077,8 +1490,8 @@ class JobFinderApp:
             status_frame = tk.Frame(vac_frame, bg=self.colors['light'])
             status_frame.pack(fill='x', padx=10, pady=5)
             
-            status = "✅ Активна" if vacancy[6] else "❌ Неактивна"
-            status_color = self.colors['success'] if vacancy[6] else self.colors['danger']
+            status = "✅ Активна" if vacancy.is_active else "❌ Неактивна"
+            status_color = self.colors['success'] if vacancy.is_active else self.colors['danger']
             
             tk.Label(status_frame, text=status,
                     font=('Segoe UI', 10, 'bold'),
@@ -1089,13 +1502,13 @@ class JobFinderApp:
             info_frame = tk.Frame(vac_frame, bg=self.colors['light'])
             info_frame.pack(fill='x', padx=10, pady=5)
             
-            tk.Label(info_frame, text=vacancy[1],
+            tk.Label(info_frame, text=vacancy.title,
                     font=('Segoe UI', 14, 'bold'),
                     fg=self.colors['dark'],
                     bg=self.colors['light']).pack(side='left')
             
-            salary_text = f"💰 {vacancy[2]:,} - {vacancy[3]:,} руб."
-            tk.Label(info_frame, text=salary_text,
+            salary = salary_text(vacancy.salary_from, vacancy.salary_to)
+            tk.Label(info_frame, text=salary,
                     font=('Segoe UI', 12),
                     fg=self.colors['success'],
                     bg=self.colors['light']).pack(side='right')
@@ -1104,7 +1517,7 @@ class JobFinderApp:
             details_frame = tk.Frame(vac_frame, bg=self.colors['light'])
             details_frame.pack(fill='x', padx=10, pady=5)
             
-            tk.Label(details_frame, text=f"📍 {vacancy[4]} • {self.get_employment_type(vacancy[5])}",
+            tk.Label(details_frame, text=f"📍 {vacancy.city} • {self.get_employment_type(vacancy.employment_type)}",
                     font=('Segoe UI', 11),
                     fg=self.colors['gray'],
                     bg=self.colors['light']).pack(side='left')
@@ -1121,7 +1534,7 @@ class JobFinderApp:
             edit_btn.pack(side='left', padx=5)
             
             toggle_btn = tk.Button(button_frame, 
-                                  text="✅ Активировать" if not vacancy[6] else "❌ Деактивировать",
+                                  text="✅ Активировать" if not vacancy.is_active else "❌ Деактивировать",
                                   font=('Segoe UI', 10),
                                   bg=self.colors['accent'],
                                   fg='white',
@@ -1144,7 +1557,8 @@ class JobFinderApp:
     
     def show_create_vacancy(self):
         """Показать создание вакансии"""
-        self.clear_main_content()
+        if not self.open_screen('create_vacancy', keep=False):
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['secondary'], height=80)
         header_frame.pack(fill='x')
@@ -1208,67 +1622,274 @@ class JobFinderApp:
     
     def show_employer_applications(self):
         """Показать отклики (для работодателя)"""
-        self.clear_main_content()
+        if not self.open_screen('employer_applications', ('applications', 'resumes', 'vacancies')):
+            self.merge_unseen('employer_applications')
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['secondary'], height=80)
         header_frame.pack(fill='x')
         header_frame.pack_propagate(False)
         
-        tk.Label(header_frame, text="📨 Отклики на вакансии",
+        title_frame = tk.Frame(header_frame, bg=self.colors['secondary'])
+        title_frame.pack(expand=True)
+        
+        tk.Label(title_frame, text="📨 Отклики на вакансии",
                 font=('Segoe UI', 20, 'bold'),
                 fg=self.colors['white'],
-                bg=self.colors['secondary']).pack(expand=True)
+                bg=self.colors['secondary']).pack(side='left', padx=10)
+        
+        export_btn = tk.Button(title_frame, text="📤 Выгрузить",
+                              font=('Segoe UI', 12, 'bold'),
+                              bg=self.colors['success'],
+                              fg=self.colors['dark'],
+                              cursor='hand2',
+                              command=lambda: self.export_employer_data(
+                                  self.db.stream_application_export,
+                                  EXPORT_APPLICATION_COLUMNS, "otkliki"))
+        export_btn.pack(side='right', padx=10)
+        
+        # Смена статуса выделенных в таблице откликов (Ctrl/Shift + щелчок).
+        # Строки таблицы - id откликов, statuses - показанный статус каждой
+        view = {'tree': None, 'statuses': {}}
+        actions_frame = tk.Frame(self.main_content, bg=self.colors['white'])
+        actions_frame.pack(fill='x', padx=20, pady=(20, 0))
+        
+        for text, status, color in (("👁 Просмотрено", 'viewed', 'primary'),
+                                    ("📅 Пригласить", 'interview', 'accent'),
+                                    ("✖ Отклонить", 'rejected', 'danger'),
+                                    ("✔ Принять", 'hired', 'success')):
+            tk.Button(actions_frame, text=text,
+                     font=('Segoe UI', 10, 'bold'),
+                     bg=self.colors[color],
+                     fg='white' if color != 'success' else self.colors['dark'],
+                     cursor='hand2',
+                     command=lambda s=status: self.change_application_status(
+                         view, s, result_label)).pack(side='left', padx=(0, 5))
+        
+        result_label = tk.Label(actions_frame, text="",
+                               font=('Segoe UI', 10),
+                               fg=self.colors['gray'],
+                               bg=self.colors['white'])
+        result_label.pack(side='left', padx=10)
         
         content_frame = tk.Frame(self.main_content, bg=self.colors['white'])
-        content_frame.pack(fill='both', expand=True, padx=20, pady=20)
+        content_frame.pack(fill='both', expand=True, padx=20, pady=(10, 20))
+        
+        def make_values(app):
+            view['statuses'][app[0]] = app[5]
+            return self.employer_application_values(app)
+        
+        def on_tree(tree):
+            view['tree'] = tree
+            view['statuses'].clear()
+            self.set_badge('employer_applications', 0)
+        
+        def on_loaded(loader):
+            # Просмотрены отклики до последнего загруженного; более новые
+            # (пришедшие во время загрузки) покажет значок
+            self.tasks.submit(self.db.mark_seen, self.current_user['id'],
+                              'employer_applications', loader.last_id)
+        
+        def merge_new(rows):
+            tree = view['tree']
+            if tree is None or not tree.winfo_exists():
+                self.rebuild_screen('employer_applications', self.show_employer_applications)
+                return
+            # Новые отклики - сверху и выделены шрифтом
+            tree.tag_configure('new', font=('Segoe UI', 10, 'bold'))
+            for app in reversed(rows):
+                if not tree.exists(str(app[0])):
+                    tree.insert('', 0, iid=str(app[0]), values=make_values(app), tags=('new',))
         
-        # Получаем отклики на вакансии работодателя
-        self.cursor.execute("""
-            SELECT a.id, v.title, u.first_name, u.last_name, 
-                   r.desired_position, a.status, a.applied_at
-            FROM applications a
-            JOIN vacancies v ON a.vacancy_id = v.id
-            JOIN resumes r ON a.resume_id = r.id
-            JOIN users u ON r.user_id = u.id
-            WHERE v.employer_id = ?
-            ORDER BY a.applied_at DESC
-        """, (self.current_user['id'],))
-        
-        applications = self.cursor.fetchall()
-        
-        if not applications:
-            tk.Label(content_frame, text="Пока нет откликов на ваши вакансии",
-                    font=('Segoe UI', 16),
-                    fg=self.colors['gray'],
-                    bg=self.colors['white']).pack(pady=50)
-            return
+        self.unseen_handlers['employer_applications'] = merge_new
         
-        # Таблица откликов
+        # Отклики загружаются пачками, таблица заполняется постепенно
         columns = ('Вакансия', 'Кандидат', 'Должность', 'Статус', 'Дата')
-        tree = ttk.Treeview(content_frame, columns=columns, show='headings', height=15)
+        self.load_applications_tree(content_frame, columns, 150,
+                                    self.db.stream_employer_applications,
+                                    make_values,
+                                    "Пока нет откликов на ваши вакансии",
+                                    on_tree, on_loaded)
+    
+    def employer_application_values(self, app):
+        """Значения строки таблицы откликов работодателя"""
+        candidate = f"{app[2]} {app[3]}" if app[2] and app[3] else "Не указано"
+        return (app[1], candidate, app[4], self.get_status_text(app[5]), app[6])
+    
+    def change_application_status(self, view, status, result_label):
+        """Перевести выделенные отклики в статус status.
+        
+        Все отклики меняются одной транзакцией; в таблице обновляются только
+        строки затронутых откликов, без перезагрузки.
+        """
+        tree = view['tree']
+        selected = tree.selection() if tree is not None and tree.winfo_exists() else ()
+        if not selected:
+            messagebox.showinfo("Информация", "Выделите отклики в таблице")
+            return
+        status_text = self.get_status_text(status)
+        if len(selected) > 1 and not messagebox.askyesno(
+                "Подтверждение",
+                f"Изменить статус {len(selected):,} откликов на «{status_text}»?"):
+            return
+        
+        statuses = view['statuses']
+        expected = {int(iid): statuses[int(iid)] for iid in selected}
+        updated, rejected = self.db.set_application_statuses(
+            self.current_user['id'], expected, status)
+        conflicts = {app_id: current for app_id, (reason, current) in rejected.items()
+                     if reason == STATUS_CONFLICT}
+        not_allowed = len(rejected) - len(conflicts)
+        
+        for app_id in updated:
+            tree.set(str(app_id), 'Статус', status_text)
+            statuses[app_id] = status
+        # Отклики, измененные за это время в другом окне, показываем как есть
+        for app_id, current in conflicts.items():
+            if current is None:
+                tree.delete(str(app_id))
+                del statuses[app_id]
+            else:
+                tree.set(str(app_id), 'Статус', self.get_status_text(current))
+                statuses[app_id] = current
+        tree.selection_set([str(app_id) for app_id in updated])
+        self.screens.sync()
+        
+        message = f"Изменено: {len(updated):,}"
+        if not_allowed:
+            message += f", недопустимый переход: {not_allowed:,}"
+        if conflicts:
+            message += f", изменены другим пользователем: {len(conflicts):,}"
+        result_label.config(text=message)
+    
+    def load_applications_tree(self, content_frame, columns, column_width, stream,
+                               make_values, empty_text, on_tree=None, on_loaded=None):
+        """Таблица откликов, заполняемая постепенно из фонового потока.
+        
+        on_tree(tree) вызывается для каждой новой таблицы (и после обновления),
+        on_loaded(loader) - после успешной загрузки всех строк
+        """
+        progress_label = tk.Label(content_frame, text="⏳ Загрузка...",
+                                 font=('Segoe UI', 10),
+                                 fg=self.colors['gray'],
+                                 bg=self.colors['white'],
+                                 anchor='w')
+        progress_label.pack(fill='x', pady=(0, 5))
+        
+        table_frame = tk.Frame(content_frame, bg=self.colors['white'])
+        table_frame.pack(fill='both', expand=True)
+        
+        tree = ttk.Treeview(table_frame, columns=columns, show='headings', height=15)
         
         for col in columns:
             tree.heading(col, text=col)
-            tree.column(col, width=150)
+            tree.column(col, width=column_width)
         
-        # Добавляем данные
-        for app in applications:
-            candidate = f"{app[2]} {app[3]}" if app[2] and app[3] else "Не указано"
-            status_text = self.get_status_text(app[5])
-            
-            tree.insert('', 'end', values=(
-                app[1], candidate, app[4], status_text, app[6]
-            ))
-        
-        scrollbar = ttk.Scrollbar(content_frame, orient='vertical', command=tree.yview)
+        scrollbar = ttk.Scrollbar(table_frame, orient='vertical', command=tree.yview)
         tree.configure(yscrollcommand=scrollbar.set)
         
         tree.pack(side='left', fill='both', expand=True)
         scrollbar.pack(side='right', fill='y')
+        if on_tree is not None:
+            on_tree(tree)
+        
+        def on_progress(count):
+            progress_label.config(text=f"⏳ Загружено: {count:,}")
+        
+        def on_done(count):
+            if loader.error is None and on_loaded is not None:
+                on_loaded(loader)
+            if loader.error is not None:
+                progress_label.config(text=f"Ошибка загрузки: {loader.error}")
+            elif count == 0:
+                progress_label.destroy()
+                table_frame.destroy()
+                tk.Label(content_frame, text=empty_text,
+                        font=('Segoe UI', 16),
+                        fg=self.colors['gray'],
+                        bg=self.colors['white']).pack(pady=50)
+            else:
+                progress_label.config(text=f"Всего: {count:,}")
+        
+        loader = ChunkedTreeLoader(self.root, tree, make_values,
+                                   on_progress=on_progress, on_done=on_done)
+        loader.start(self.tasks, stream, self.current_user['id'])
+        
+        def reload():
+            loader.stop()
+            for widget in content_frame.winfo_children():
+                widget.destroy()
+            self.load_applications_tree(content_frame, columns, column_width, stream,
+                                        make_values, empty_text, on_tree, on_loaded)
+        
+        self.screens.set_refresh(reload)
+        return tree
+    
+    def export_employer_data(self, stream, columns, default_name):
+        """Выгрузить данные работодателя в CSV или NDJSON с окном прогресса"""
+        path = filedialog.asksaveasfilename(
+            parent=self.root,
+            title="Выгрузка",
+            initialfile=f"{default_name}_{datetime.now():%Y%m%d}.csv",
+            defaultextension='.csv',
+            filetypes=[("CSV", "*.csv"), ("NDJSON", "*.ndjson"), ("JSON Lines", "*.jsonl")])
+        if not path:
+            return
+        
+        # Модуль выгрузки нужен только здесь - не загружаем его при запуске
+        from jobfinder_io import ExportJob
+        fmt = 'csv' if os.path.splitext(path)[1].lower() == '.csv' else 'ndjson'
+        job = ExportJob(stream, (self.current_user['id'],), columns, path, fmt,
+                        release=self.db.release).start()
+        
+        # Окно прогресса не зависит от экрана и переживает переход по меню
+        window = tk.Toplevel(self.root)
+        window.title("Выгрузка")
+        window.configure(bg=self.colors['white'])
+        window.resizable(False, False)
+        window.transient(self.root)
+        
+        tk.Label(window, text=os.path.basename(path),
+                font=('Segoe UI', 12, 'bold'),
+                fg=self.colors['dark'],
+                bg=self.colors['white']).pack(padx=30, pady=(20, 5))
+        
+        progress_label = tk.Label(window, text="⏳ Выгружено: 0",
+                                 font=('Segoe UI', 11),
+                                 fg=self.colors['gray'],
+                                 bg=self.colors['white'])
+        progress_label.pack(padx=30, pady=5)
+        
+        cancel_btn = tk.Button(window, text="Отмена",
+                              font=('Segoe UI', 10),
+                              bg=self.colors['gray'],
+                              fg='white',
+                              width=15,
+                              cursor='hand2',
+                              command=job.cancel)
+        cancel_btn.pack(pady=(5, 20))
+        window.protocol('WM_DELETE_WINDOW', job.cancel)
+        
+        def poll():
+            if not window.winfo_exists():
+                job.cancel()
+                return
+            if not job.done:
+                progress_label.config(text=f"⏳ Выгружено: {job.count:,}")
+                self.root.after(100, poll)
+                return
+            window.destroy()
+            if job.error is not None:
+                messagebox.showerror("Ошибка", f"Не удалось выгрузить данные: {job.error}")
+            elif not job.cancelled:
+                messagebox.showinfo("Выгрузка", f"Выгружено записей: {job.count:,}\n{path}")
+        
+        self.root.after(100, poll)
     
     def show_resume_search(self):
         """Показать поиск резюме (для работодателя)"""
-        self.clear_main_content()
+        if not self.open_screen('resume_search'):
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['secondary'], height=80)
         header_frame.pack(fill='x')
@@ -1279,17 +1900,100 @@ class JobFinderApp:
                 fg=self.colors['white'],
                 bg=self.colors['secondary']).pack(expand=True)
         
-        content_frame = tk.Frame(self.main_content, bg=self.colors['white'])
-        content_frame.pack(fill='both', expand=True, padx=20, pady=20)
+        # Панель фильтров
+        filter_frame = tk.Frame(self.main_content, bg=self.colors['white'],
+                               relief='groove', borderwidth=1)
+        filter_frame.pack(fill='x', padx=20, pady=20)
+        
+        tk.Label(filter_frame, text="Навыки:",
+                font=('Segoe UI', 12),
+                bg=self.colors['white']).grid(row=0, column=0, padx=10, pady=10, sticky='w')
+        
+        query_entry = tk.Entry(filter_frame, font=('Segoe UI', 12), width=50)
+        query_entry.grid(row=0, column=1, columnspan=3, padx=10, pady=10, sticky='w')
         
-        tk.Label(content_frame, text="Раздел в разработке",
-                font=('Segoe UI', 18),
+        tk.Label(filter_frame, text="Например: Python AND SQL NOT PHP, (Go OR Rust) Docker",
+                font=('Segoe UI', 10),
                 fg=self.colors['gray'],
-                bg=self.colors['white']).pack(expand=True)
+                bg=self.colors['white']).grid(row=1, column=1, columnspan=3, padx=10, sticky='w')
+        
+        tk.Label(filter_frame, text="Зарплата от:",
+                font=('Segoe UI', 12),
+                bg=self.colors['white']).grid(row=2, column=0, padx=10, pady=10, sticky='w')
+        
+        salary_from_entry = tk.Entry(filter_frame, font=('Segoe UI', 12), width=15)
+        salary_from_entry.grid(row=2, column=1, padx=10, pady=10, sticky='w')
+        
+        tk.Label(filter_frame, text="Зарплата до:",
+                font=('Segoe UI', 12),
+                bg=self.colors['white']).grid(row=2, column=2, padx=10, pady=10, sticky='w')
+        
+        salary_to_entry = tk.Entry(filter_frame, font=('Segoe UI', 12), width=15)
+        salary_to_entry.grid(row=2, column=3, padx=10, pady=10, sticky='w')
+        
+        # Результаты поиска
+        results_frame = tk.Frame(self.main_content, bg=self.colors['light'])
+        results_frame.pack(fill='both', expand=True, padx=20, pady=(0, 20))
+        
+        search_callback = lambda: self.run_resume_search(
+            results_frame, query_entry.get(),
+            salary_from_entry.get(), salary_to_entry.get()
+        )
+        
+        search_btn = tk.Button(filter_frame, text="Найти",
+                              font=('Segoe UI', 12, 'bold'),
+                              bg=self.colors['success'],
+                              fg=self.colors['dark'],
+                              width=20,
+                              command=search_callback)
+        search_btn.grid(row=3, column=0, columnspan=4, pady=20)
+        
+        query_entry.bind('<Return>', lambda e: search_callback())
+    
+    def run_resume_search(self, results_frame, query, salary_from, salary_to):
+        """Выполнить поиск резюме и показать результаты"""
+        try:
+            salary_from = int(salary_from) if salary_from.strip() else None
+            salary_to = int(salary_to) if salary_to.strip() else None
+        except ValueError:
+            messagebox.showerror("Ошибка", "Зарплата должна быть числом")
+            return
+        
+        try:
+            build_resume_query(query)
+        except ValueError as error:
+            messagebox.showerror("Ошибка", f"Ошибка в запросе: {error}")
+            return
+        
+        for widget in results_frame.winfo_children():
+            widget.destroy()
+        
+        if getattr(self, 'search_task', None) is not None:
+            self.search_task.cancel()
+        self.search_task = self.load_in_background(
+            results_frame, self.db.search_resumes, query, salary_from, salary_to,
+            on_success=lambda resumes: self.render_resume_results(results_frame, resumes))
+    
+    def render_resume_results(self, results_frame, resumes):
+        """Отобразить результаты поиска резюме"""
+        if not resumes:
+            tk.Label(results_frame, text="Подходящих резюме не найдено",
+                    font=('Segoe UI', 16),
+                    fg=self.colors['gray'],
+                    bg=self.colors['light']).pack(pady=50)
+            return
+        
+        # Совпавшие навыки выделены скобками
+        results = VirtualCardList(results_frame, lambda parent: ResumeCard(parent, self.colors),
+                                  lambda card, resume: card.show(resume),
+                                  row_height=190, bg=self.colors['light'])
+        results.pack()
+        results.set_rows(resumes)
     
     def show_statistics(self):
         """Показать статистику"""
-        self.clear_main_content()
+        if not self.open_screen('statistics', ('employer_stats',)):
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['secondary'], height=80)
         header_frame.pack(fill='x')
@@ -1303,15 +2007,23 @@ class JobFinderApp:
         content_frame = tk.Frame(self.main_content, bg=self.colors['white'])
         content_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
-        # Пример статистики
-        stats = [
-            ("Всего вакансий:", "15"),
-            ("Активных вакансий:", "12"),
-            ("Всего откликов:", "47"),
-            ("Новых откликов:", "3"),
-            ("Приглашено на собеседование:", "12"),
-            ("Отклонено:", "8")
+        # Счетчики поддерживаются триггерами, поэтому это чтение одной строки
+        self.load_screen_data(content_frame, self.db.get_employer_stats,
+                                  self.current_user['id'],
+                                  on_success=lambda counters: self.render_statistics(content_frame, counters))
+    
+    def render_statistics(self, content_frame, counters):
+        """Отобразить статистику работодателя"""
+        labels = [
+            "Всего вакансий:",
+            "Активных вакансий:",
+            "Всего откликов:",
+            "Новых откликов:",
+            "Приглашено на собеседование:",
+            "Отклонено:",
+            "Принято на работу:"
         ]
+        stats = [(label, f"{value:,}") for label, value in zip(labels, counters)]
         
         for i, (label, value) in enumerate(stats):
             stat_frame = tk.Frame(content_frame, bg=self.colors['white'])
@@ -1329,7 +2041,8 @@ class JobFinderApp:
     
     def show_employer_profile(self):
         """Показать профиль компании"""
-        self.clear_main_content()
+        if not self.open_screen('employer_profile', ('users',)):
+            return
         
         header_frame = tk.Frame(self.main_content, bg=self.colors['secondary'], height=80)
         header_frame.pack(fill='x')
@@ -1344,13 +2057,12 @@ class JobFinderApp:
         content_frame.pack(fill='both', expand=True, padx=20, pady=20)
         
         # Получаем данные компании
-        self.cursor.execute("""
-            SELECT company_name, email, phone, city
-            FROM users WHERE id = ?
-        """, (self.current_user['id'],))
-        
-        company_data = self.cursor.fetchone()
-        
+        self.load_screen_data(content_frame, self.db.get_employer_profile,
+                                  self.current_user['id'],
+                                  on_success=lambda company_data: self.render_employer_profile(content_frame, company_data))
+    
+    def render_employer_profile(self, content_frame, company_data):
+        """Отобразить данные компании"""
         # Отображаем информацию
         info_frame = tk.Frame(content_frame, bg=self.colors['white'])
         info_frame.pack(pady=20)
@@ -1375,19 +2087,14 @@ class JobFinderApp:
     def create_resume(self):
         """Создание резюме"""
         # В реальном приложении здесь должна быть форма для создания резюме
-        self.cursor.execute("""
-            INSERT INTO resumes (user_id, title, desired_position, 
-                               salary_expectation, experience, education, skills)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (self.current_user['id'], 
-              "Мое резюме", 
-              "Разработчик Python",
-              120000,
-              "Опыт работы 2 года в IT-компании",
-              "Высшее техническое образование",
-              "Python, Django, SQL, Git"))
-        
-        self.conn.commit()
+        self.db.create_resume(self.current_user['id'], 
+                              "Мое резюме", 
+                              "Разработчик Python",
+                              120000,
+                              "Опыт работы 2 года в IT-компании",
+                              "Высшее техническое образование",
+                              "Python, Django, SQL, Git")
+        
         messagebox.showinfo("Успех", "Резюме создано успешно!")
         self.show_my_resume()
     
@@ -1398,37 +2105,22 @@ class JobFinderApp:
     def delete_resume(self, resume_id):
         """Удаление резюме"""
         if messagebox.askyesno("Подтверждение", "Вы уверены, что хотите удалить резюме?"):
-            self.cursor.execute("DELETE FROM resumes WHERE id = ?", (resume_id,))
-            self.conn.commit()
+            self.db.delete_resume(resume_id)
             messagebox.showinfo("Успех", "Резюме удалено")
             self.show_my_resume()
     
     def apply_to_vacancy(self, vacancy_id):
         """Откликнуться на вакансию"""
-        # Проверяем, есть ли у пользователя резюме
-        self.cursor.execute("SELECT id FROM resumes WHERE user_id = ?", (self.current_user['id'],))
-        resume = self.cursor.fetchone()
-        
-        if not resume:
-            messagebox.showerror("Ошибка", "Сначала создайте резюме")
-            self.show_my_resume()
-            return
+        def done(created):
+            if created:
+                messagebox.showinfo("Успех", "Отклик отправлен успешно!")
+            else:
+                messagebox.showinfo("Информация", "Вы уже откликались на эту вакансию")
         
-        # Создаем отклик
-        try:
-            self.cursor.execute("""
-                INSERT INTO applications (resume_id, vacancy_id, cover_letter)
-                VALUES (?, ?, ?)
-            """, (resume[0], vacancy_id, "Заинтересован в вакансии"))
-            
-            self.conn.commit()
-            messagebox.showinfo("Успех", "Отклик отправлен успешно!")
-            
-        except sqlite3.IntegrityError:
-            messagebox.showinfo("Информация", "Вы уже откликались на эту вакансию")
+        self.submit_applications([vacancy_id], done)
     
     def show_vacancy_details(self, vacancy):
-        """Показать детали вакансии"""
+        """Показать детали вакансии (Vacancy); полное описание загружается в фоне"""
         dialog = tk.Toplevel(self.root)
         dialog.title("Детали вакансии")
         dialog.geometry("800x600")
@@ -1438,7 +2130,7 @@ class JobFinderApp:
         title_frame = tk.Frame(dialog, bg=self.colors['primary'])
         title_frame.pack(fill='x', pady=(0, 20))
         
-        tk.Label(title_frame, text=vacancy[1],
+        tk.Label(title_frame, text=vacancy.title,
                 font=('Segoe UI', 20, 'bold'),
                 fg=self.colors['white'],
                 bg=self.colors['primary'],
@@ -1452,8 +2144,8 @@ class JobFinderApp:
         salary_frame = tk.Frame(content_frame, bg=self.colors['white'])
         salary_frame.pack(fill='x', pady=10)
         
-        salary_text = f"💰 {vacancy[3]:,} - {vacancy[4]:,} руб."
-        tk.Label(salary_frame, text=salary_text,
+        salary = salary_text(vacancy.salary_from, vacancy.salary_to)
+        tk.Label(salary_frame, text=salary,
                 font=('Segoe UI', 18, 'bold'),
                 fg=self.colors['success'],
                 bg=self.colors['white']).pack()
@@ -1462,12 +2154,12 @@ class JobFinderApp:
         info_frame = tk.Frame(content_frame, bg=self.colors['white'])
         info_frame.pack(fill='x', pady=10)
         
-        tk.Label(info_frame, text=f"🏢 {vacancy[7]}",
+        tk.Label(info_frame, text=f"🏢 {vacancy.company_name}",
                 font=('Segoe UI', 14),
                 fg=self.colors['dark'],
                 bg=self.colors['white']).pack()
         
-        location_text = f"📍 {vacancy[5]} • {self.get_employment_type(vacancy[6])}"
+        location_text = f"📍 {vacancy.city} • {self.get_employment_type(vacancy.employment_type)}"
         tk.Label(info_frame, text=location_text,
                 font=('Segoe UI', 14),
                 fg=self.colors['gray'],
@@ -1481,21 +2173,53 @@ class JobFinderApp:
         
         description_text = tk.Text(content_frame, font=('Segoe UI', 12),
                                   height=10, width=70, wrap='word')
-        description_text.insert('1.0', vacancy[2])
+        # Пока загружается полный текст, показываем начало из карточки
+        description_text.insert('1.0', vacancy.summary or "⏳ Загрузка...")
         description_text.config(state='disabled')
         description_text.pack(fill='both', expand=True)
         
+        def show_description(rows):
+            if not rows or not description_text.winfo_exists():
+                return
+            description_text.config(state='normal')
+            description_text.delete('1.0', 'end')
+            description_text.insert('1.0', rows[0][2] or "")
+            description_text.config(state='disabled')
+        
+        self.tasks.submit(self.db.get_vacancies_by_ids, [vacancy.id],
+                          on_success=show_description)
+        
         # Кнопки
         button_frame = tk.Frame(content_frame, bg=self.colors['white'])
         button_frame.pack(pady=20)
         
+        if self.current_user['user_type'] == 'seeker':
+            favorite_btn = tk.Button(button_frame,
+                                     font=('Segoe UI', 12),
+                                     fg='white',
+                                     width=20)
+            
+            def update_favorite():
+                if self.is_favorite(vacancy.id):
+                    favorite_btn.config(text="★ В избранном", bg=self.colors['secondary'])
+                else:
+                    favorite_btn.config(text="⭐ В избранное", bg=self.colors['accent'])
+            
+            def toggle():
+                self.toggle_favorite(vacancy.id)
+                update_favorite()
+            
+            favorite_btn.config(command=toggle)
+            update_favorite()
+            favorite_btn.pack(side='left', padx=5)
+        
         close_btn = tk.Button(button_frame, text="Закрыть",
                              font=('Segoe UI', 12),
                              bg=self.colors['gray'],
                              fg='white',
                              width=20,
                              command=dialog.destroy)
-        close_btn.pack()
+        close_btn.pack(side='left', padx=5)
     
     def get_employment_type(self, type_code):
         """Получить текстовое представление типа занятости"""
@@ -1503,7 +2227,8 @@ class JobFinderApp:
             'full_time': 'Полная занятость',
             'part_time': 'Частичная занятость',
             'remote': 'Удаленная работа',
-            'hybrid': 'Гибридный формат'
+            'hybrid': 'Гибридный формат',
+            'project': 'Проектная работа'
         }
         return types.get(type_code, type_code)
     
@@ -1529,17 +2254,110 @@ class JobFinderApp:
         }
         return colors.get(status, self.colors['dark'])
     
+    def load_in_background(self, parent, query, *args, on_success):
+        """Выполнить запрос в фоне, показывая в parent индикатор загрузки"""
+        loading_label = tk.Label(parent, text="⏳ Загрузка...",
+                                font=('Segoe UI', 14),
+                                fg=self.colors['gray'],
+                                bg=parent.cget('bg'))
+        loading_label.pack(pady=50)
+        
+        def deliver(result):
+            # Экран мог быть вытеснен из кэша, пока шел запрос
+            if not loading_label.winfo_exists():
+                return
+            loading_label.destroy()
+            on_success(result)
+        
+        def fail(error):
+            if not loading_label.winfo_exists():
+                return
+            loading_label.destroy()
+            messagebox.showerror("Ошибка", f"Не удалось загрузить данные: {error}")
+        
+        return self.tasks.submit(query, *args, on_success=deliver, on_error=fail)
+    
+    def load_screen_data(self, content_frame, query, *args, on_success):
+        """Загрузить данные экрана; при изменении его таблиц запрос повторится"""
+        def reload():
+            for widget in content_frame.winfo_children():
+                widget.destroy()
+            self.load_in_background(content_frame, query, *args, on_success=on_success)
+        
+        self.screens.set_refresh(reload)
+        return self.load_in_background(content_frame, query, *args, on_success=on_success)
+    
+    def merge_unseen(self, screen):
+        """Добавить на сохраненный экран записи, появившиеся после просмотра.
+        
+        Читаются только новые записи (take_unseen), а не весь список.
+        """
+        handler = self.unseen_handlers.get(screen)
+        if handler is None:
+            return
+        
+        def deliver(rows):
+            self.set_badge(screen, 0)
+            if rows:
+                handler(rows)
+        
+        self.tasks.submit(self.db.take_unseen, self.current_user['id'], screen,
+                          on_success=deliver)
+    
+    def rebuild_screen(self, key, show):
+        """Построить экран заново: сразу, если он открыт, иначе при открытии"""
+        current = self.screens.current == key
+        self.screens.discard(key)
+        if current:
+            show()
+    
+    def start_badges(self, badges):
+        """Начать проверку новых записей для значков меню"""
+        self.badges = badges
+        self.poll_badges()
+    
+    def poll_badges(self):
+        """Обновить значки меню и запланировать следующую проверку"""
+        self.badge_job = None
+        if not self.badges:
+            return
+        for screen in self.badges:
+            self.tasks.submit(self.db.count_unseen, self.current_user['id'], screen,
+                              on_success=lambda count, screen=screen: self.set_badge(screen, count))
+        self.badge_job = self.root.after(BADGE_POLL_INTERVAL, self.poll_badges)
+    
+    def set_badge(self, screen, count):
+        """Показать число новых записей на кнопке меню"""
+        button, text = self.badges.get(screen, (None, None))
+        if button is None or not button.winfo_exists():
+            return
+        button.config(text=f"{text}  ({count:,})" if count else text,
+                      font=('Segoe UI', 11, 'bold' if count else 'normal'))
+    
+    def open_screen(self, key, tables=(), keep=True):
+        """Показать сохраненный экран key.
+        
+        Возвращает True, если экран нужно построить: тогда self.main_content
+        указывает на его пустой фрейм. tables — таблицы, при изменении которых
+        данные экрана обновляются при следующем открытии.
+        """
+        frame = self.screens.open(key, tables, keep)
+        if frame is None:
+            return False
+        self.main_content = frame
+        return True
+    
     def clear_window(self):
         """Очистить главное окно"""
+        if self.tasks is not None:
+            self.tasks.cancel_all()
+        if self.badge_job is not None:
+            self.root.after_cancel(self.badge_job)
+            self.badge_job = None
+        self.badges = {}
         for widget in self.root.winfo_children():
             widget.destroy()
     
-    def clear_main_content(self):
-        """Очистить основную область контента"""
-        if hasattr(self, 'main_content'):
-            for widget in self.main_content.winfo_children():
-                widget.destroy()
-    
     def logout(self):
         """Выйти из системы"""
         self.current_user = None
@@ -1547,9 +2365,23 @@ class JobFinderApp:
         self.show_start_screen()
 
 def main():
+    # Замер запуска: jobfinder_startup.py (запускает приложение с
+    # --startup-benchmark и -X importtime). stdout - JSON с временем импорта,
+    # первого кадра, модулей и готовности базы (мс), код возврата 1, если
+    # первый кадр дольше STARTUP_BUDGET_MS
     root = tk.Tk()
     app = JobFinderApp(root)
     root.mainloop()
+    if app.tasks is not None:
+        app.tasks.shutdown()
+    if app.recommender:
+        app.recommender.save()
+    if app.db is not None:
+        app.db.close()
+    if app.tracer:
+        app.tracer.export(TRACE_PATH)
+        print(f"Трасса: {os.path.abspath(TRACE_PATH)}")
+    return app.exit_code
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,264 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import time
+from datetime import datetime
+
+from jobfinder_db import (
+    JobFinderRepository, SCHEMA_VERSION, build_search_sql, build_resume_search_sql,
+    SQL_FIND_USER, SQL_VACANCY_FEED, SQL_VACANCY_FEED_AFTER, SQL_EMPLOYER_VACANCIES,
+    SQL_SEEKER_APPLICATIONS, SQL_EMPLOYER_APPLICATIONS, SQL_SEEKER_PROFILE,
+    SQL_EMPLOYER_PROFILE, SQL_ACTIVE_RESUME, SQL_RESUME_ID, SQL_RECOMMENDATION_PROFILE,
+    SQL_APPLIED_EMPLOYMENT_TYPES, SQL_VACANCIES_BY_IDS, SQL_EMPLOYER_STATS,
+    SQL_APPLY_IF_NEW,
+)
+from jobfinder_seed import CITIES as SEED_CITIES, DEMO_PASSWORD_HASH, generate_dataset
+
+# Размеры наборов: число вакансий (и откликов). Соискателей с резюме в 10
+# раз меньше, работодателей — в 100 раз (см. jobfinder_seed.dataset_sizes)
+SIZES = {
+    '10k': 10_000,
+    '1m': 1_000_000,
+    '10m': 10_000_000,
+}
+
+CITIES = [city for city, _, _ in SEED_CITIES]
+
+
+def build_dataset(path, vacancies, seed):
+    """Создать базу для замеров генератором синтетических данных.
+
+    База строится во временном файле и появляется под именем path только
+    целиком: прерванная сборка не оставляет неполной базы.
+    """
+    partial = path + '.part'
+    for name in (partial, partial + '-wal', partial + '-shm'):
+        if os.path.exists(name):
+            os.remove(name)
+    repo = JobFinderRepository(partial)
+    try:
+        repo.migrate()
+        generate_dataset(repo, vacancies, seed=seed)
+        # Переносим журнал WAL в файл базы, чтобы переименовать один файл
+        repo.connection().execute("PRAGMA journal_mode = DELETE")
+    finally:
+        repo.close()
+    os.replace(partial, path)
+
+
+def dataset_bounds(conn):
+    """Диапазоны id работодателей, соискателей, резюме и вакансий"""
+    def bounds(sql):
+        return conn.execute(sql).fetchone()
+    return {
+        'employers': bounds("SELECT MIN(id), MAX(id) FROM users WHERE user_type = 'employer'"),
+        'seekers': bounds("SELECT MIN(id), MAX(id) FROM users WHERE user_type = 'seeker'"),
+        'resumes': bounds("SELECT MIN(id), MAX(id) FROM resumes"),
+        'vacancies': bounds("SELECT MIN(id), MAX(id) FROM vacancies"),
+    }
+
+
+def _feed_cursor(conn, rnd, bounds):
+    # Курсор ленты — (created_at, id) случайной вакансии
+    vacancy_id = rnd.randint(*bounds['vacancies'])
+    created_at = conn.execute("SELECT created_at FROM vacancies WHERE id = ?",
+                              (vacancy_id,)).fetchone()[0]
+    return (created_at, vacancy_id, 20)
+
+
+def _employer_email(conn, rnd, bounds):
+    user_id = rnd.randint(*bounds['employers'])
+    email = conn.execute("SELECT email FROM users WHERE id = ?", (user_id,)).fetchone()[0]
+    return (email, DEMO_PASSWORD_HASH)
+
+
+# Запросы приложения и генераторы их параметров: (conn, random, bounds) -> params
+BENCH_QUERIES = {
+    'login': (SQL_FIND_USER, _employer_email),
+    'vacancy_feed': (SQL_VACANCY_FEED, lambda conn, rnd, b: (20,)),
+    'vacancy_feed_after': (SQL_VACANCY_FEED_AFTER, _feed_cursor),
+    'employer_vacancies': (SQL_EMPLOYER_VACANCIES,
+                           lambda conn, rnd, b: (rnd.randint(*b['employers']),)),
+    'seeker_applications': (SQL_SEEKER_APPLICATIONS,
+                            lambda conn, rnd, b: (rnd.randint(*b['seekers']),)),
+    'employer_applications': (SQL_EMPLOYER_APPLICATIONS,
+                              lambda conn, rnd, b: (rnd.randint(*b['employers']),)),
+    'seeker_profile': (SQL_SEEKER_PROFILE,
+                       lambda conn, rnd, b: (rnd.randint(*b['seekers']),)),
+    'employer_profile': (SQL_EMPLOYER_PROFILE,
+                         lambda conn, rnd, b: (rnd.randint(*b['employers']),)),
+    'active_resume': (SQL_ACTIVE_RESUME, lambda conn, rnd, b: (rnd.randint(*b['seekers']),)),
+    'resume_id': (SQL_RESUME_ID, lambda conn, rnd, b: (rnd.randint(*b['seekers']),)),
+    'recommendation_profile': (SQL_RECOMMENDATION_PROFILE,
+                               lambda conn, rnd, b: (rnd.randint(*b['seekers']),)),
+    'applied_employment_types': (SQL_APPLIED_EMPLOYMENT_TYPES,
+                                 lambda conn, rnd, b: (rnd.randint(*b['seekers']),)),
+    'employer_stats': (SQL_EMPLOYER_STATS,
+                       lambda conn, rnd, b: (rnd.randint(*b['employers']),)),
+    'vacancies_by_ids': (SQL_VACANCIES_BY_IDS, lambda conn, rnd, b: (
+        json.dumps([rnd.randint(*b['vacancies']) for _ in range(20)]),)),
+    'search_keywords': (build_search_sql(keywords=True, city=True),
+                        lambda conn, rnd, b: ('"python"*', rnd.choice(CITIES), 50)),
+    'search_city_salary': (build_search_sql(city=True, salary_from=True),
+                           lambda conn, rnd, b: (rnd.choice(CITIES),
+                                                 rnd.randrange(50000, 250000, 10000), 50)),
+    'resume_search': (build_resume_search_sql(query=True),
+                      lambda conn, rnd, b: ('"python" AND "sql"', 50)),
+}
+
+
+def percentile(sorted_values, fraction):
+    """Перцентиль по ближайшему рангу"""
+    index = max(0, min(len(sorted_values) - 1,
+                       round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies, rows):
+    """p50/p95/p99 в мс и строки в секунду по списку длительностей (с)"""
+    latencies = sorted(latencies)
+    total = sum(latencies)
+    return {
+        'runs': len(latencies),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'rows': rows,
+        'rows_per_s': round(rows / total) if total else 0,
+    }
+
+
+def bench_query(conn, sql, make_params, bounds, runs, rnd):
+    """Выполнить запрос runs раз со случайными параметрами, прочитав все строки"""
+    conn.execute(sql, make_params(conn, rnd, bounds)).fetchall()  # прогрев
+    latencies = []
+    rows = 0
+    for _ in range(runs):
+        params = make_params(conn, rnd, bounds)
+        started = time.perf_counter()
+        rows += len(conn.execute(sql, params).fetchall())
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies, rows)
+
+
+def bench_apply(conn, bounds, runs, rnd):
+    """Отклик: вставка в applications с фиксацией; вставленные строки удаляются.
+
+    Случайная пара может совпасть с существующим откликом, поэтому
+    используется вставка с ON CONFLICT DO NOTHING, как при массовом отклике.
+    """
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM applications").fetchone()[0]
+    latencies = []
+    for _ in range(runs):
+        params = (rnd.randint(*bounds['resumes']), rnd.randint(*bounds['vacancies']),
+                  'Benchmark')
+        started = time.perf_counter()
+        with conn:
+            conn.execute(SQL_APPLY_IF_NEW, params)
+        latencies.append(time.perf_counter() - started)
+    with conn:
+        conn.execute("DELETE FROM applications WHERE id > ?", (last_id,))
+    return summarize(latencies, runs)
+
+
+def run_dataset(path, runs, seed):
+    """Замеры всех запросов на одной базе.
+
+    Базу, созданную на более старом коммите, сначала обновляем до текущей
+    схемы: запросы рассчитаны на ее индексы.
+    """
+    repo = JobFinderRepository(path)
+    repo.migrate()
+    conn = repo.connection()
+    bounds = dataset_bounds(conn)
+    rnd = random.Random(seed)
+    results = {}
+    for name, (sql, make_params) in BENCH_QUERIES.items():
+        results[name] = bench_query(conn, sql, make_params, bounds, runs, rnd)
+        print(f"  {name:26} p50 {results[name]['p50_ms']:9.3f} мс  "
+              f"p99 {results[name]['p99_ms']:9.3f} мс")
+    results['apply'] = bench_apply(conn, bounds, runs, rnd)
+    print(f"  {'apply':26} p50 {results['apply']['p50_ms']:9.3f} мс  "
+          f"p99 {results['apply']['p99_ms']:9.3f} мс")
+    repo.close()
+    return results
+
+
+def git_commit():
+    """Текущий коммит (для сравнения результатов между коммитами)"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous, current):
+    """Вывести изменение p95 относительно предыдущего прогона"""
+    for size, dataset in current['datasets'].items():
+        before = previous.get('datasets', {}).get(size)
+        if not before:
+            continue
+        if before.get('schema_version') != dataset['schema_version']:
+            print(f"{size}: схема {before.get('schema_version')} -> "
+                  f"{dataset['schema_version']}, индексы могли измениться")
+        print(f"{size}: p95 относительно {previous.get('commit')}")
+        for name, stats in dataset['queries'].items():
+            old = before['queries'].get(name)
+            if old and old['p95_ms']:
+                print(f"  {name:26} {stats['p95_ms'] / old['p95_ms']:6.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры запросов JobFinder без интерфейса")
+    # 10m строится долго и занимает много места на диске — только по запросу
+    parser.add_argument('--sizes', nargs='+', choices=SIZES, default=['10k', '1m'])
+    parser.add_argument('--dir', default='bench_data',
+                        help="каталог баз для замеров (создаются один раз)")
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--out', default='bench_results.json')
+    parser.add_argument('--compare', help="JSON предыдущего прогона")
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    report = {
+        'commit': git_commit(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'runs': args.runs,
+        'seed': args.seed,
+        'datasets': {},
+    }
+    for size in args.sizes:
+        path = os.path.join(args.dir, f'bench_{size}.db')
+        build_seconds = None
+        if not os.path.exists(path):
+            print(f"{size}: создание базы {path}")
+            started = time.perf_counter()
+            build_dataset(path, SIZES[size], args.seed)
+            build_seconds = round(time.perf_counter() - started, 1)
+        print(f"{size}: замеры")
+        report['datasets'][size] = {
+            'vacancies': SIZES[size],
+            'build_seconds': build_seconds,
+            'schema_version': SCHEMA_VERSION,
+            'queries': run_dataset(path, args.runs, args.seed),
+        }
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результаты: {args.out}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
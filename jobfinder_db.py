@@ -0,0 +1,1946 @@
+import functools
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+
+DB_PATH = 'jobfinder.db'
+
+# SQL-запросы держим константами: sqlite3 кэширует подготовленные выражения
+# по тексту запроса на каждом соединении, поэтому одинаковый текст означает
+# повторное использование уже скомпилированного выражения.
+SQL_FIND_USER = """
+    SELECT id, user_type, first_name, last_name, company_name
+    FROM users
+    WHERE email = ? AND password_hash = ?
+"""
+
+SQL_INSERT_SEEKER = """
+    INSERT INTO users (email, password_hash, user_type, first_name, last_name)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+SQL_INSERT_EMPLOYER = """
+    INSERT INTO users (email, password_hash, user_type, company_name)
+    VALUES (?, ?, ?, ?)
+"""
+
+SQL_COUNT_VACANCIES = "SELECT COUNT(*) FROM vacancies"
+
+# Проверка без подсчета: останавливается на первой строке
+SQL_HAS_VACANCIES = "SELECT EXISTS (SELECT 1 FROM vacancies)"
+
+SQL_INSERT_VACANCY = """
+    INSERT INTO vacancies (employer_id, title, description, requirements,
+                           salary_from, salary_to, employment_type, city)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Лента листается по ключу (created_at, id): следующая страница начинается
+# сразу после последней показанной строки, поэтому стоимость любой страницы
+# равна стоимости первой (в отличие от OFFSET).
+# Списки вакансий получают вместо описания первые 201 символ: карточке нужно
+# 200 и признак, что текст длиннее; полный текст — SQL_VACANCIES_BY_IDS
+SQL_VACANCY_FEED = """
+    SELECT v.id, v.title, substr(v.description, 1, 201),
+           v.salary_from, v.salary_to, v.city, v.employment_type, u.company_name,
+           v.created_at
+    FROM vacancies v
+    JOIN users u ON v.employer_id = u.id
+    WHERE v.is_active = 1
+    ORDER BY v.created_at DESC, v.id DESC
+    LIMIT ?
+"""
+
+SQL_VACANCY_FEED_AFTER = """
+    SELECT v.id, v.title, substr(v.description, 1, 201),
+           v.salary_from, v.salary_to, v.city, v.employment_type, u.company_name,
+           v.created_at
+    FROM vacancies v
+    JOIN users u ON v.employer_id = u.id
+    WHERE v.is_active = 1 AND (v.created_at, v.id) < (?, ?)
+    ORDER BY v.created_at DESC, v.id DESC
+    LIMIT ?
+"""
+
+SQL_EMPLOYER_VACANCIES = """
+    SELECT id, title, salary_from, salary_to, city,
+           employment_type, is_active, created_at
+    FROM vacancies
+    WHERE employer_id = ?
+    ORDER BY created_at DESC
+"""
+
+SQL_SEEKER_APPLICATIONS = """
+    SELECT a.id, v.title, u.company_name, a.status,
+           a.applied_at, a.cover_letter
+    FROM applications a
+    JOIN vacancies v ON a.vacancy_id = v.id
+    JOIN users u ON v.employer_id = u.id
+    JOIN resumes r ON a.resume_id = r.id
+    WHERE r.user_id = ?
+    ORDER BY a.applied_at DESC
+"""
+
+SQL_EMPLOYER_APPLICATIONS = """
+    SELECT a.id, v.title, u.first_name, u.last_name,
+           r.desired_position, a.status, a.applied_at
+    FROM applications a
+    JOIN vacancies v ON a.vacancy_id = v.id
+    JOIN resumes r ON a.resume_id = r.id
+    JOIN users u ON r.user_id = u.id
+    WHERE v.employer_id = ?
+    ORDER BY a.applied_at DESC
+"""
+
+# Выгрузка откликов: те же соединения и порядок, что и на экране откликов,
+# плюс контакты кандидата и сопроводительное письмо
+SQL_EXPORT_EMPLOYER_APPLICATIONS = """
+    SELECT a.id, v.id, v.title, u.first_name, u.last_name, u.email, u.phone,
+           r.desired_position, r.salary_expectation, a.status, a.applied_at,
+           a.cover_letter
+    FROM applications a
+    JOIN vacancies v ON a.vacancy_id = v.id
+    JOIN resumes r ON a.resume_id = r.id
+    JOIN users u ON r.user_id = u.id
+    WHERE v.employer_id = ?
+    ORDER BY a.applied_at DESC
+"""
+
+EXPORT_APPLICATION_COLUMNS = (
+    'application_id', 'vacancy_id', 'vacancy_title', 'first_name', 'last_name',
+    'email', 'phone', 'desired_position', 'salary_expectation', 'status',
+    'applied_at', 'cover_letter',
+)
+
+SQL_EXPORT_EMPLOYER_VACANCIES = """
+    SELECT id, external_id, title, description, requirements, salary_from,
+           salary_to, employment_type, city, is_active, created_at
+    FROM vacancies
+    WHERE employer_id = ?
+    ORDER BY created_at DESC
+"""
+
+EXPORT_VACANCY_COLUMNS = (
+    'id', 'external_id', 'title', 'description', 'requirements', 'salary_from',
+    'salary_to', 'employment_type', 'city', 'is_active', 'created_at',
+)
+
+SQL_SEEKER_PROFILE = """
+    SELECT first_name, last_name, email, phone, city
+    FROM users WHERE id = ?
+"""
+
+SQL_EMPLOYER_PROFILE = """
+    SELECT company_name, email, phone, city
+    FROM users WHERE id = ?
+"""
+
+SQL_ACTIVE_RESUME = """
+    SELECT id, title, desired_position, salary_expectation,
+           experience, education, skills
+    FROM resumes
+    WHERE user_id = ? AND is_active = 1
+"""
+
+SQL_RESUME_ID = "SELECT id FROM resumes WHERE user_id = ?"
+
+# Данные соискателя для рекомендаций: резюме и город из профиля
+SQL_RECOMMENDATION_PROFILE = """
+    SELECT r.skills, r.desired_position, r.salary_expectation, u.city
+    FROM resumes r
+    JOIN users u ON r.user_id = u.id
+    WHERE r.user_id = ? AND r.is_active = 1
+"""
+
+# Типы занятости вакансий, на которые соискатель уже откликался
+SQL_APPLIED_EMPLOYMENT_TYPES = """
+    SELECT v.employment_type, COUNT(*)
+    FROM resumes r
+    JOIN applications a ON a.resume_id = r.id
+    JOIN vacancies v ON a.vacancy_id = v.id
+    WHERE r.user_id = ?
+    GROUP BY v.employment_type
+"""
+
+SQL_LAST_VACANCY_CHANGE = "SELECT COALESCE(MAX(seq), 0) FROM vacancy_changes"
+
+SQL_RECOMMENDATION_VACANCIES = """
+    SELECT id, title, requirements, salary_from, salary_to, city, employment_type
+    FROM vacancies
+    WHERE is_active = 1
+"""
+
+# Значения фасетов поиска для индекса в памяти (jobfinder_facets)
+SQL_FACET_VACANCIES = """
+    SELECT id, salary_from, salary_to, city, employment_type
+    FROM vacancies
+    WHERE is_active = 1
+"""
+
+# id вакансий, совпавших с запросом FTS, одной строкой через запятую:
+# разобрать ее в NumPy намного быстрее, чем получать строки по одной
+SQL_MATCHING_VACANCY_IDS = """
+    SELECT rowid FROM vacancies_fts WHERE vacancies_fts MATCH ?
+"""
+
+# Вакансии, измененные после seq. Для удаленных вакансий и снятых с
+# публикации остальные столбцы равны NULL
+SQL_CHANGED_VACANCIES = """
+    SELECT c.vacancy_id, v.title, v.requirements, v.salary_from, v.salary_to,
+           v.city, v.employment_type
+    FROM vacancy_changes c
+    LEFT JOIN vacancies v ON v.id = c.vacancy_id AND v.is_active = 1
+    WHERE c.seq > ?
+"""
+
+# Строки ленты для списка id (JSON-массив) с полным описанием — текст
+# запроса не зависит от числа id, поэтому подготовленное выражение
+# переиспользуется
+SQL_VACANCIES_BY_IDS = """
+    SELECT v.id, v.title, v.description, v.salary_from, v.salary_to,
+           v.city, v.employment_type, u.company_name, v.created_at
+    FROM vacancies v
+    JOIN users u ON v.employer_id = u.id
+    WHERE v.id IN (SELECT value FROM json_each(?))
+"""
+
+SQL_INSERT_RESUME = """
+    INSERT INTO resumes (user_id, title, desired_position,
+                         salary_expectation, experience, education, skills)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_DELETE_RESUME = "DELETE FROM resumes WHERE id = ?"
+
+SQL_EMPLOYER_STATS = """
+    SELECT vacancies_total, vacancies_active, applications_total,
+           applications_pending, applications_interview,
+           applications_rejected, applications_hired
+    FROM employer_stats
+    WHERE employer_id = ?
+"""
+
+SQL_INSERT_APPLICATION = """
+    INSERT INTO applications (resume_id, vacancy_id, cover_letter)
+    VALUES (?, ?, ?)
+"""
+
+# Массовый отклик: уже существующие пары (resume_id, vacancy_id) пропускаются
+SQL_APPLY_IF_NEW = """
+    INSERT INTO applications (resume_id, vacancy_id, cover_letter)
+    VALUES (?, ?, ?)
+    ON CONFLICT (resume_id, vacancy_id) DO NOTHING
+"""
+
+# Вакансии из списка (JSON-массив), на которые резюме уже откликалось
+SQL_APPLIED_VACANCIES = """
+    SELECT vacancy_id FROM applications
+    WHERE resume_id = ? AND vacancy_id IN (SELECT value FROM json_each(?))
+"""
+
+# Статусы откликов, в которые работодатель может перевести отклик из
+# данного статуса. Отклоненные и принятые отклики больше не меняются
+STATUS_TRANSITIONS = {
+    'pending': ('viewed', 'interview', 'rejected', 'hired'),
+    'viewed': ('interview', 'rejected', 'hired'),
+    'interview': ('rejected', 'hired'),
+    'rejected': (),
+    'hired': (),
+}
+
+# Причины, по которым set_application_statuses не изменил отклик
+STATUS_CONFLICT = 'conflict'  # статус уже изменен кем-то еще или отклика нет
+STATUS_NOT_ALLOWED = 'not_allowed'  # переход не разрешен STATUS_TRANSITIONS
+
+# Текущие статусы откликов из списка (JSON-массив) на вакансии работодателя
+SQL_APPLICATION_STATUSES = """
+    SELECT a.id, a.status
+    FROM applications a
+    JOIN vacancies v ON a.vacancy_id = v.id
+    WHERE a.id IN (SELECT value FROM json_each(?)) AND v.employer_id = ?
+"""
+
+# Смена статуса с проверкой, что отклик не изменили с момента показа
+SQL_SET_APPLICATION_STATUS = """
+    UPDATE applications SET status = ?
+    WHERE id = ? AND status = ?
+"""
+
+# Отметки «просмотрено до» пользователя по экранам: наибольший id или
+# номер изменения, который пользователь уже видел
+SQL_SEEN_MARK = "SELECT mark FROM seen_marks WHERE user_id = ? AND screen = ?"
+
+SQL_SET_SEEN_MARK = """
+    INSERT INTO seen_marks (user_id, screen, mark) VALUES (?, ?, ?)
+    ON CONFLICT (user_id, screen) DO UPDATE SET mark = MAX(mark, excluded.mark)
+"""
+
+SQL_LAST_APPLICATION = "SELECT COALESCE(MAX(id), 0) FROM applications"
+
+# Новые отклики работодателя с id в (since, mark]: по индексу
+# (vacancy_id, rowid) читаются только новые строки каждой вакансии.
+# Столбцы совпадают с SQL_EMPLOYER_APPLICATIONS
+SQL_NEW_EMPLOYER_APPLICATIONS = """
+    SELECT a.id, v.title, u.first_name, u.last_name,
+           r.desired_position, a.status, a.applied_at
+    FROM vacancies v
+    JOIN applications a ON a.vacancy_id = v.id
+    JOIN resumes r ON a.resume_id = r.id
+    JOIN users u ON r.user_id = u.id
+    WHERE v.employer_id = :user_id AND a.id > :since AND a.id <= :mark
+    ORDER BY a.id DESC
+"""
+
+SQL_COUNT_NEW_EMPLOYER_APPLICATIONS = """
+    SELECT COUNT(*)
+    FROM vacancies v
+    JOIN applications a ON a.vacancy_id = v.id
+    WHERE v.employer_id = :user_id AND a.id > :since AND a.id <= :mark
+"""
+
+# Вакансии, добавленные или измененные с номерами изменений в (since, mark].
+# Столбцы совпадают с лентой; у снятых с публикации и удаленных вакансий
+# все столбцы, кроме id, равны NULL
+SQL_CHANGED_FEED_VACANCIES = """
+    SELECT c.vacancy_id, v.title, substr(v.description, 1, 201),
+           v.salary_from, v.salary_to, v.city, v.employment_type, u.company_name,
+           v.created_at
+    FROM vacancy_changes c
+    LEFT JOIN vacancies v ON v.id = c.vacancy_id AND v.is_active = 1
+    LEFT JOIN users u ON v.employer_id = u.id
+    WHERE c.seq > :since AND c.seq <= :mark
+    ORDER BY v.created_at DESC, c.vacancy_id DESC
+"""
+
+SQL_COUNT_CHANGED_FEED_VACANCIES = """
+    SELECT COUNT(*)
+    FROM vacancy_changes c
+    JOIN vacancies v ON v.id = c.vacancy_id AND v.is_active = 1
+    WHERE c.seq > :since AND c.seq <= :mark
+"""
+
+SQL_ADD_FAVORITE = """
+    INSERT INTO favorites (user_id, vacancy_id) VALUES (?, ?)
+    ON CONFLICT (user_id, vacancy_id) DO NOTHING
+"""
+
+SQL_REMOVE_FAVORITE = "DELETE FROM favorites WHERE user_id = ? AND vacancy_id = ?"
+
+# Все избранные вакансии пользователя одним запросом: состояние кнопок
+# ленты берется из этого множества, а не запросом на каждую карточку
+SQL_FAVORITE_IDS = "SELECT vacancy_id FROM favorites WHERE user_id = ?"
+
+# Избранное листается по ключу f.id (порядок добавления, новые сверху).
+# Последний столбец — курсор для следующей страницы
+SQL_FAVORITES = """
+    SELECT v.id, v.title, substr(v.description, 1, 201),
+           v.salary_from, v.salary_to, v.city, v.employment_type, u.company_name,
+           v.created_at, f.id
+    FROM favorites f
+    JOIN vacancies v ON v.id = f.vacancy_id
+    JOIN users u ON v.employer_id = u.id
+    WHERE f.user_id = ?
+    ORDER BY f.id DESC
+    LIMIT ?
+"""
+
+SQL_FAVORITES_AFTER = """
+    SELECT v.id, v.title, substr(v.description, 1, 201),
+           v.salary_from, v.salary_to, v.city, v.employment_type, u.company_name,
+           v.created_at, f.id
+    FROM favorites f
+    JOIN vacancies v ON v.id = f.vacancy_id
+    JOIN users u ON v.employer_id = u.id
+    WHERE f.user_id = ? AND f.id < ?
+    ORDER BY f.id DESC
+    LIMIT ?
+"""
+
+# Триггеры синхронизации полнотекстового индекса с таблицей vacancies.
+# Массовый импорт временно снимает их и индексирует пачку одним запросом.
+FTS_TRIGGERS = {
+    'vacancies_fts_insert': """
+        CREATE TRIGGER IF NOT EXISTS vacancies_fts_insert AFTER INSERT ON vacancies BEGIN
+            INSERT INTO vacancies_fts (rowid, title, description, requirements)
+            VALUES (new.id, new.title, new.description, new.requirements);
+        END
+        """,
+    'vacancies_fts_delete': """
+        CREATE TRIGGER IF NOT EXISTS vacancies_fts_delete AFTER DELETE ON vacancies BEGIN
+            INSERT INTO vacancies_fts (vacancies_fts, rowid, title, description, requirements)
+            VALUES ('delete', old.id, old.title, old.description, old.requirements);
+        END
+        """,
+    'vacancies_fts_update': """
+        CREATE TRIGGER IF NOT EXISTS vacancies_fts_update
+        AFTER UPDATE OF title, description, requirements ON vacancies BEGIN
+            INSERT INTO vacancies_fts (vacancies_fts, rowid, title, description, requirements)
+            VALUES ('delete', old.id, old.title, old.description, old.requirements);
+            INSERT INTO vacancies_fts (rowid, title, description, requirements)
+            VALUES (new.id, new.title, new.description, new.requirements);
+        END
+        """,
+}
+
+# Триггеры журнала изменений вакансий (vacancy_changes). Номер изменения —
+# следующий после максимального (поиск идет по индексу seq); строки журнала
+# не удаляются, поэтому номера только растут
+VACANCY_CHANGE_TRIGGERS = {
+    f'vacancy_changes_{event.lower()}': f"""
+        CREATE TRIGGER IF NOT EXISTS vacancy_changes_{event.lower()}
+        AFTER {event} ON vacancies BEGIN
+            UPDATE vacancy_changes
+            SET seq = (SELECT MAX(seq) FROM vacancy_changes) + 1
+            WHERE vacancy_id = {row}.id;
+            INSERT INTO vacancy_changes (vacancy_id, seq)
+            SELECT {row}.id, (SELECT COALESCE(MAX(seq), 0) + 1 FROM vacancy_changes)
+            WHERE NOT EXISTS (SELECT 1 FROM vacancy_changes WHERE vacancy_id = {row}.id);
+        END
+        """
+    for event, row in (('INSERT', 'new'), ('UPDATE', 'new'), ('DELETE', 'old'))
+}
+
+# Счетчики employer_stats по всем данным (миграция 4 и восстановление
+# после загрузки без триггеров)
+SQL_FILL_VACANCY_STATS = """
+    INSERT OR REPLACE INTO employer_stats (employer_id, vacancies_total, vacancies_active)
+    SELECT employer_id, COUNT(*), SUM(is_active = 1)
+    FROM vacancies
+    GROUP BY employer_id
+"""
+
+SQL_FILL_APPLICATION_STATS = """
+    WITH counts AS (
+        SELECT v.employer_id,
+               COUNT(*) AS total,
+               SUM(a.status = 'pending') AS pending,
+               SUM(a.status = 'viewed') AS viewed,
+               SUM(a.status = 'interview') AS interview,
+               SUM(a.status = 'rejected') AS rejected,
+               SUM(a.status = 'hired') AS hired
+        FROM applications a
+        JOIN vacancies v ON a.vacancy_id = v.id
+        GROUP BY v.employer_id
+    )
+    UPDATE employer_stats
+    SET applications_total = counts.total,
+        applications_pending = counts.pending,
+        applications_viewed = counts.viewed,
+        applications_interview = counts.interview,
+        applications_rejected = counts.rejected,
+        applications_hired = counts.hired
+    FROM counts
+    WHERE employer_stats.employer_id = counts.employer_id
+"""
+
+# Журнал изменений для вакансий, которых в нем нет (добавленных без триггеров)
+SQL_FILL_VACANCY_CHANGES = """
+    INSERT INTO vacancy_changes (vacancy_id, seq)
+    SELECT v.id, (SELECT COALESCE(MAX(seq), 0) FROM vacancy_changes)
+                 + ROW_NUMBER() OVER (ORDER BY v.id)
+    FROM vacancies v
+    WHERE NOT EXISTS (SELECT 1 FROM vacancy_changes c WHERE c.vacancy_id = v.id)
+"""
+
+# Таблицы, которые поддерживают триггеры, пересчитанные целиком
+SQL_REBUILD_TRIGGERED = [
+    "INSERT INTO vacancies_fts (vacancies_fts) VALUES ('rebuild')",
+    "INSERT INTO resumes_fts (resumes_fts) VALUES ('rebuild')",
+    "DELETE FROM employer_stats",
+    SQL_FILL_VACANCY_STATS,
+    SQL_FILL_APPLICATION_STATS,
+    SQL_FILL_VACANCY_CHANGES,
+]
+
+# Таблицы, из которых читают лента и поиск вакансий
+FEED_TABLES = ('vacancies', 'users')
+
+# Таблицы, которые триггеры обновляют при записи в ключевую таблицу
+TRIGGERED_TABLES = {
+    'vacancies': ('vacancies_fts', 'employer_stats', 'vacancy_changes'),
+    'applications': ('employer_stats',),
+    'resumes': ('resumes_fts',),
+}
+
+# Миграции схемы: номер версии хранится в PRAGMA user_version.
+# Версия N означает, что применены первые N элементов списка. Существующие
+# файлы jobfinder.db без версии (0) обновляются на месте: таблицы создаются
+# через IF NOT EXISTS, затем добавляются индексы.
+MIGRATIONS = [
+    # 1: исходные таблицы
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            user_type TEXT NOT NULL,
+            first_name TEXT,
+            last_name TEXT,
+            phone TEXT,
+            city TEXT,
+            company_name TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS resumes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            desired_position TEXT,
+            salary_expectation INTEGER,
+            experience TEXT,
+            education TEXT,
+            skills TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS vacancies (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            employer_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            requirements TEXT,
+            salary_from INTEGER,
+            salary_to INTEGER,
+            employment_type TEXT,
+            city TEXT,
+            is_active BOOLEAN DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (employer_id) REFERENCES users (id)
+        )
+        ''',
+        '''
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            resume_id INTEGER NOT NULL,
+            vacancy_id INTEGER NOT NULL,
+            cover_letter TEXT,
+            status TEXT DEFAULT 'pending',
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (resume_id) REFERENCES resumes (id),
+            FOREIGN KEY (vacancy_id) REFERENCES vacancies (id)
+        )
+        ''',
+    ],
+    # 2: индексы для часто выполняемых запросов
+    [
+        # Лента: WHERE is_active = 1 ORDER BY created_at DESC
+        "CREATE INDEX IF NOT EXISTS idx_vacancies_active_created "
+        "ON vacancies (is_active, created_at, id)",
+        # Мои вакансии и отклики работодателя: v.employer_id = ?
+        "CREATE INDEX IF NOT EXISTS idx_vacancies_employer_created "
+        "ON vacancies (employer_id, created_at)",
+        # Мои отклики: resumes r WHERE r.user_id = ?
+        "CREATE INDEX IF NOT EXISTS idx_resumes_user_active "
+        "ON resumes (user_id, is_active)",
+        # Соединения applications с resumes и vacancies
+        "CREATE INDEX IF NOT EXISTS idx_applications_resume_applied "
+        "ON applications (resume_id, applied_at)",
+        "CREATE INDEX IF NOT EXISTS idx_applications_vacancy_applied "
+        "ON applications (vacancy_id, applied_at)",
+    ],
+    # 3: полнотекстовый поиск по вакансиям и индексы фильтров поиска
+    [
+        # Внешнее содержимое: текст хранится только в vacancies,
+        # FTS-таблица содержит лишь индекс
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS vacancies_fts USING fts5(
+            title, description, requirements,
+            content='vacancies', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+        """,
+        *FTS_TRIGGERS.values(),
+        # Индексируем уже существующие вакансии
+        "INSERT INTO vacancies_fts (vacancies_fts) VALUES ('rebuild')",
+        # Поиск по городу без ключевых слов: строки идут сразу в порядке
+        # created_at, зарплата проверяется по ходу до набора LIMIT строк
+        "CREATE INDEX IF NOT EXISTS idx_vacancies_city_created "
+        "ON vacancies (city, is_active, created_at)",
+    ],
+    # 4: счетчики статистики работодателя, поддерживаемые триггерами
+    [
+        """
+        CREATE TABLE IF NOT EXISTS employer_stats (
+            employer_id INTEGER PRIMARY KEY,
+            vacancies_total INTEGER NOT NULL DEFAULT 0,
+            vacancies_active INTEGER NOT NULL DEFAULT 0,
+            applications_total INTEGER NOT NULL DEFAULT 0,
+            applications_pending INTEGER NOT NULL DEFAULT 0,
+            applications_viewed INTEGER NOT NULL DEFAULT 0,
+            applications_interview INTEGER NOT NULL DEFAULT 0,
+            applications_rejected INTEGER NOT NULL DEFAULT 0,
+            applications_hired INTEGER NOT NULL DEFAULT 0,
+            FOREIGN KEY (employer_id) REFERENCES users (id)
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS employer_stats_vacancy_insert
+        AFTER INSERT ON vacancies BEGIN
+            INSERT OR IGNORE INTO employer_stats (employer_id) VALUES (new.employer_id);
+            UPDATE employer_stats
+            SET vacancies_total = vacancies_total + 1,
+                vacancies_active = vacancies_active + (new.is_active = 1)
+            WHERE employer_id = new.employer_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS employer_stats_vacancy_delete
+        AFTER DELETE ON vacancies BEGIN
+            UPDATE employer_stats
+            SET vacancies_total = vacancies_total - 1,
+                vacancies_active = vacancies_active - (old.is_active = 1)
+            WHERE employer_id = old.employer_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS employer_stats_vacancy_update
+        AFTER UPDATE OF is_active, employer_id ON vacancies BEGIN
+            UPDATE employer_stats
+            SET vacancies_total = vacancies_total - 1,
+                vacancies_active = vacancies_active - (old.is_active = 1)
+            WHERE employer_id = old.employer_id;
+            INSERT OR IGNORE INTO employer_stats (employer_id) VALUES (new.employer_id);
+            UPDATE employer_stats
+            SET vacancies_total = vacancies_total + 1,
+                vacancies_active = vacancies_active + (new.is_active = 1)
+            WHERE employer_id = new.employer_id;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS employer_stats_application_insert
+        AFTER INSERT ON applications BEGIN
+            UPDATE employer_stats
+            SET applications_total = applications_total + 1,
+                applications_pending = applications_pending + (new.status = 'pending'),
+                applications_viewed = applications_viewed + (new.status = 'viewed'),
+                applications_interview = applications_interview + (new.status = 'interview'),
+                applications_rejected = applications_rejected + (new.status = 'rejected'),
+                applications_hired = applications_hired + (new.status = 'hired')
+            WHERE employer_id = (SELECT employer_id FROM vacancies WHERE id = new.vacancy_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS employer_stats_application_delete
+        AFTER DELETE ON applications BEGIN
+            UPDATE employer_stats
+            SET applications_total = applications_total - 1,
+                applications_pending = applications_pending - (old.status = 'pending'),
+                applications_viewed = applications_viewed - (old.status = 'viewed'),
+                applications_interview = applications_interview - (old.status = 'interview'),
+                applications_rejected = applications_rejected - (old.status = 'rejected'),
+                applications_hired = applications_hired - (old.status = 'hired')
+            WHERE employer_id = (SELECT employer_id FROM vacancies WHERE id = old.vacancy_id);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS employer_stats_application_update
+        AFTER UPDATE OF status, vacancy_id ON applications BEGIN
+            UPDATE employer_stats
+            SET applications_total = applications_total - 1,
+                applications_pending = applications_pending - (old.status = 'pending'),
+                applications_viewed = applications_viewed - (old.status = 'viewed'),
+                applications_interview = applications_interview - (old.status = 'interview'),
+                applications_rejected = applications_rejected - (old.status = 'rejected'),
+                applications_hired = applications_hired - (old.status = 'hired')
+            WHERE employer_id = (SELECT employer_id FROM vacancies WHERE id = old.vacancy_id);
+            UPDATE employer_stats
+            SET applications_total = applications_total + 1,
+                applications_pending = applications_pending + (new.status = 'pending'),
+                applications_viewed = applications_viewed + (new.status = 'viewed'),
+                applications_interview = applications_interview + (new.status = 'interview'),
+                applications_rejected = applications_rejected + (new.status = 'rejected'),
+                applications_hired = applications_hired + (new.status = 'hired')
+            WHERE employer_id = (SELECT employer_id FROM vacancies WHERE id = new.vacancy_id);
+        END
+        """,
+        # Заполняем счетчики по уже существующим данным
+        SQL_FILL_VACANCY_STATS,
+        SQL_FILL_APPLICATION_STATS,
+    ],
+    # 5: внешний идентификатор для импорта и контрольные точки импорта
+    [
+        # INSERT OR IGNORE в теле триггера не срабатывает, если внешний
+        # оператор — upsert (его ON CONFLICT имеет приоритет), поэтому строку
+        # счетчиков создаем через проверку NOT EXISTS
+        "DROP TRIGGER IF EXISTS employer_stats_vacancy_insert",
+        """
+        CREATE TRIGGER employer_stats_vacancy_insert
+        AFTER INSERT ON vacancies BEGIN
+            INSERT INTO employer_stats (employer_id)
+            SELECT new.employer_id
+            WHERE NOT EXISTS (SELECT 1 FROM employer_stats WHERE employer_id = new.employer_id);
+            UPDATE employer_stats
+            SET vacancies_total = vacancies_total + 1,
+                vacancies_active = vacancies_active + (new.is_active = 1)
+            WHERE employer_id = new.employer_id;
+        END
+        """,
+        "DROP TRIGGER IF EXISTS employer_stats_vacancy_update",
+        """
+        CREATE TRIGGER employer_stats_vacancy_update
+        AFTER UPDATE OF is_active, employer_id ON vacancies BEGIN
+            UPDATE employer_stats
+            SET vacancies_total = vacancies_total - 1,
+                vacancies_active = vacancies_active - (old.is_active = 1)
+            WHERE employer_id = old.employer_id;
+            INSERT INTO employer_stats (employer_id)
+            SELECT new.employer_id
+            WHERE NOT EXISTS (SELECT 1 FROM employer_stats WHERE employer_id = new.employer_id);
+            UPDATE employer_stats
+            SET vacancies_total = vacancies_total + 1,
+                vacancies_active = vacancies_active + (new.is_active = 1)
+            WHERE employer_id = new.employer_id;
+        END
+        """,
+        "ALTER TABLE vacancies ADD COLUMN external_id TEXT",
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_vacancies_external_id "
+        "ON vacancies (external_id) WHERE external_id IS NOT NULL",
+        """
+        CREATE TABLE IF NOT EXISTS import_checkpoints (
+            source TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+    ],
+    # 6: поиск резюме по навыкам
+    [
+        # Инвертированный индекс по навыкам, должности и опыту. Символы + и #
+        # входят в токены, чтобы C++ и C# не сводились к «c»
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts USING fts5(
+            skills, desired_position, experience,
+            content='resumes', content_rowid='id',
+            tokenize="unicode61 remove_diacritics 2 tokenchars '+#'"
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS resumes_fts_insert AFTER INSERT ON resumes BEGIN
+            INSERT INTO resumes_fts (rowid, skills, desired_position, experience)
+            VALUES (new.id, new.skills, new.desired_position, new.experience);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS resumes_fts_delete AFTER DELETE ON resumes BEGIN
+            INSERT INTO resumes_fts (resumes_fts, rowid, skills, desired_position, experience)
+            VALUES ('delete', old.id, old.skills, old.desired_position, old.experience);
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS resumes_fts_update
+        AFTER UPDATE OF skills, desired_position, experience ON resumes BEGIN
+            INSERT INTO resumes_fts (resumes_fts, rowid, skills, desired_position, experience)
+            VALUES ('delete', old.id, old.skills, old.desired_position, old.experience);
+            INSERT INTO resumes_fts (rowid, skills, desired_position, experience)
+            VALUES (new.id, new.skills, new.desired_position, new.experience);
+        END
+        """,
+        "INSERT INTO resumes_fts (resumes_fts) VALUES ('rebuild')",
+        # Поиск только по зарплатным ожиданиям
+        "CREATE INDEX IF NOT EXISTS idx_resumes_active_salary "
+        "ON resumes (is_active, salary_expectation)",
+    ],
+    # 7: журнал изменений вакансий для инкрементального обновления кэша
+    # векторов рекомендаций. На каждую вакансию хранится одна строка с
+    # номером последнего изменения, поэтому журнал не растет без предела
+    [
+        """
+        CREATE TABLE IF NOT EXISTS vacancy_changes (
+            vacancy_id INTEGER PRIMARY KEY,
+            seq INTEGER NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_vacancy_changes_seq ON vacancy_changes (seq)",
+        *VACANCY_CHANGE_TRIGGERS.values(),
+    ],
+    # 8: избранные вакансии
+    [
+        """
+        CREATE TABLE IF NOT EXISTS favorites (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            vacancy_id INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users (id),
+            FOREIGN KEY (vacancy_id) REFERENCES vacancies (id)
+        )
+        """,
+        # Одна запись на пару и проверка состояния по (user_id, vacancy_id)
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_favorites_user_vacancy "
+        "ON favorites (user_id, vacancy_id)",
+        # Страницы избранного: user_id = ? ORDER BY id DESC (id входит в индекс)
+        "CREATE INDEX IF NOT EXISTS idx_favorites_user ON favorites (user_id)",
+    ],
+    # 9: один отклик резюме на вакансию. Накопившиеся повторы удаляются
+    # (остается первый отклик; счетчики поправит триггер удаления)
+    [
+        """
+        DELETE FROM applications
+        WHERE id NOT IN (SELECT MIN(id) FROM applications GROUP BY resume_id, vacancy_id)
+        """,
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_applications_resume_vacancy "
+        "ON applications (resume_id, vacancy_id)",
+    ],
+    # 10: отметки просмотренного для значков новых записей в меню
+    [
+        """
+        CREATE TABLE IF NOT EXISTS seen_marks (
+            user_id INTEGER NOT NULL,
+            screen TEXT NOT NULL,
+            mark INTEGER NOT NULL,
+            PRIMARY KEY (user_id, screen),
+            FOREIGN KEY (user_id) REFERENCES users (id)
+        )
+        """,
+        # Новые отклики: vacancy_id = ? AND id > ? (rowid входит в индекс)
+        "CREATE INDEX IF NOT EXISTS idx_applications_vacancy ON applications (vacancy_id)",
+    ],
+    # 11: отпечаток файла импорта — контрольная точка действует, только
+    # пока по тому же пути лежит тот же файл
+    [
+        "ALTER TABLE import_checkpoints ADD COLUMN fingerprint TEXT",
+    ],
+    # 12: вакансия, переданная другому работодателю, переносит к нему и
+    # счетчики своих откликов (employer_stats_vacancy_update переносит
+    # только счетчики вакансий)
+    [
+        "DROP TRIGGER IF EXISTS employer_stats_vacancy_move",
+        """
+        CREATE TRIGGER employer_stats_vacancy_move
+        AFTER UPDATE OF employer_id ON vacancies
+        WHEN old.employer_id IS NOT new.employer_id BEGIN
+            INSERT INTO employer_stats (employer_id)
+            SELECT new.employer_id
+            WHERE NOT EXISTS (SELECT 1 FROM employer_stats WHERE employer_id = new.employer_id);
+            UPDATE employer_stats
+            SET
+                applications_total = applications_total - moved.total,
+                applications_pending = applications_pending - moved.pending,
+                applications_viewed = applications_viewed - moved.viewed,
+                applications_interview = applications_interview - moved.interview,
+                applications_rejected = applications_rejected - moved.rejected,
+                applications_hired = applications_hired - moved.hired
+            FROM (SELECT COUNT(*) AS total,
+                         TOTAL(status = 'pending') AS pending,
+                         TOTAL(status = 'viewed') AS viewed,
+                         TOTAL(status = 'interview') AS interview,
+                         TOTAL(status = 'rejected') AS rejected,
+                         TOTAL(status = 'hired') AS hired
+                  FROM applications WHERE vacancy_id = new.id) AS moved
+            WHERE employer_id = old.employer_id;
+            UPDATE employer_stats
+            SET
+                applications_total = applications_total + moved.total,
+                applications_pending = applications_pending + moved.pending,
+                applications_viewed = applications_viewed + moved.viewed,
+                applications_interview = applications_interview + moved.interview,
+                applications_rejected = applications_rejected + moved.rejected,
+                applications_hired = applications_hired + moved.hired
+            FROM (SELECT COUNT(*) AS total,
+                         TOTAL(status = 'pending') AS pending,
+                         TOTAL(status = 'viewed') AS viewed,
+                         TOTAL(status = 'interview') AS interview,
+                         TOTAL(status = 'rejected') AS rejected,
+                         TOTAL(status = 'hired') AS hired
+                  FROM applications WHERE vacancy_id = new.id) AS moved
+            WHERE employer_id = new.employer_id;
+        END
+        """,
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Веса bm25 для столбцов title, description, requirements
+SEARCH_WEIGHTS = (10.0, 1.0, 3.0)
+
+# Маркеры подсветки совпадений в результатах поиска
+HIGHLIGHT_OPEN = '['
+HIGHLIGHT_CLOSE = ']'
+
+
+def build_fts_query(text):
+    """Преобразовать строку пользователя в запрос FTS5.
+
+    Каждое слово становится термом в кавычках, поэтому служебный синтаксис
+    FTS5 во вводе не интерпретируется; термы объединяются по И. Последнее
+    слово (от трех символов) ищется по префиксу, чтобы поиск работал во время
+    набора: более короткие префиксы совпадают с большей частью базы.
+    """
+    words = [''.join(ch for ch in word if ch.isalnum()) for word in text.split()]
+    words = [word for word in words if word]
+    terms = [f'"{word}"' for word in words]
+    if words and len(words[-1]) >= 3:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def build_search_sql(keywords=False, city=False, salary_from=False, salary_to=False,
+                     employment_type=False):
+    """SQL поиска вакансий для заданного набора фильтров.
+
+    Строки результата совпадают с лентой (первые 9 столбцов) и дополнены
+    подсвеченным заголовком и фрагментом описания.
+    """
+    conditions = ["v.is_active = 1"]
+    if city:
+        conditions.append("v.city = ?")
+    if employment_type:
+        conditions.append("v.employment_type = ?")
+    if salary_from:
+        # Вакансия подходит, если верхняя граница не ниже желаемой
+        conditions.append("v.salary_to >= ?")
+    if salary_to:
+        conditions.append("v.salary_from <= ?")
+
+    columns = """v.id, v.title, substr(v.description, 1, 201),
+               v.salary_from, v.salary_to, v.city, v.employment_type, u.company_name,
+               v.created_at"""
+    if keywords:
+        weights = ', '.join(str(w) for w in SEARCH_WEIGHTS)
+        return f"""
+            SELECT {columns},
+                   highlight(vacancies_fts, 0, '{HIGHLIGHT_OPEN}', '{HIGHLIGHT_CLOSE}'),
+                   snippet(vacancies_fts, 1, '{HIGHLIGHT_OPEN}', '{HIGHLIGHT_CLOSE}', '...', 24)
+            FROM vacancies_fts
+            JOIN vacancies v ON v.id = vacancies_fts.rowid
+            JOIN users u ON v.employer_id = u.id
+            WHERE vacancies_fts MATCH ? AND {' AND '.join(conditions)}
+            ORDER BY bm25(vacancies_fts, {weights})
+            LIMIT ?
+        """
+    return f"""
+        SELECT {columns}, v.title, substr(v.description, 1, 200)
+        FROM vacancies v
+        JOIN users u ON v.employer_id = u.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY v.created_at DESC
+        LIMIT ?
+    """
+
+
+# Пороги фасета «Зарплата от»: число вакансий с верхней границей зарплаты
+# не ниже порога — то же условие, что у фильтра поиска
+SALARY_FACETS = (50000, 100000, 150000, 200000, 300000)
+
+
+def build_facets_sql(keywords=False):
+    """SQL фасетов поиска: один проход по найденным вакансиям с группировкой.
+
+    Строка группы — (город, тип занятости, корзина зарплаты, подходит ли
+    под «зарплату от» ?1, число вакансий); корзина — число порогов
+    SALARY_FACETS, не превышающих верхнюю границу зарплаты. «Зарплата до» ?2
+    и ключевые слова ?3 отбирают строки. Город и тип занятости в запрос не
+    входят, их применяет facet_counts: при выборе значения фасета группы
+    берутся из кэша.
+    """
+    buckets = ' '.join(f"WHEN v.salary_to >= {threshold} THEN {bucket}"
+                       for bucket, threshold in reversed(list(enumerate(SALARY_FACETS, 1))))
+    conditions = ["v.is_active = 1", "(?2 IS NULL OR v.salary_from <= ?2)"]
+    source = "vacancies v"
+    if keywords:
+        conditions.insert(0, "vacancies_fts MATCH ?3")
+        source = "vacancies_fts JOIN vacancies v ON v.id = vacancies_fts.rowid"
+    return f"""
+        SELECT v.city, v.employment_type, CASE {buckets} ELSE 0 END,
+               COALESCE(?1 IS NULL OR v.salary_to >= ?1, 0), COUNT(*)
+        FROM {source}
+        WHERE {' AND '.join(conditions)}
+        GROUP BY 1, 2, 3, 4
+    """
+
+
+def facet_counts(groups, city=None, employment_type=None):
+    """Фасеты поиска из групп build_facets_sql.
+
+    Счетчики фасета учитывают все фильтры, кроме его собственного, чтобы
+    рядом с выбранным значением были видны остальные. Возвращает (всего
+    найдено, [(город, число)], [(тип занятости, число)], [(порог зарплаты,
+    число)]): города и типы по убыванию числа, пороги по возрастанию.
+    """
+    total = 0
+    cities, employment_types, buckets = Counter(), Counter(), Counter()
+    for group_city, group_type, bucket, salary_ok, count in groups:
+        in_city = city is None or group_city == city
+        in_type = employment_type is None or group_type == employment_type
+        if in_type and salary_ok:
+            cities[group_city] += count
+        if in_city and salary_ok:
+            employment_types[group_type] += count
+        if in_city and in_type:
+            buckets[bucket] += count
+            total += count if salary_ok else 0
+
+    # Порог считает все корзины не ниже своей
+    salaries = []
+    above = 0
+    for bucket in range(len(SALARY_FACETS), 0, -1):
+        above += buckets[bucket]
+        if above:
+            salaries.append((SALARY_FACETS[bucket - 1], above))
+    salaries.reverse()
+    return (total,
+            [(value, count) for value, count in cities.most_common() if value and count],
+            [(value, count) for value, count in employment_types.most_common()
+             if value and count],
+            salaries)
+
+
+# Веса bm25 для столбцов skills, desired_position, experience: совпадение в
+# навыках весит больше всего, поэтому выше оказываются резюме, в навыках
+# которых совпало больше термов запроса (с учетом редкости навыка)
+RESUME_SEARCH_WEIGHTS = (10.0, 3.0, 1.0)
+
+RESUME_OPERATORS = {
+    'AND': 'AND', 'И': 'AND',
+    'OR': 'OR', 'ИЛИ': 'OR',
+    'NOT': 'NOT', 'НЕ': 'NOT',
+}
+
+
+def _tokenize_resume_query(text):
+    tokens = []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if ch.isspace():
+            i += 1
+        elif ch in '()':
+            tokens.append(ch)
+            i += 1
+        elif ch == '"':
+            end = text.find('"', i + 1)
+            end = len(text) if end == -1 else end
+            tokens.append(('phrase', text[i + 1:end]))
+            i = end + 1
+        else:
+            start = i
+            while i < len(text) and not text[i].isspace() and text[i] not in '()"':
+                i += 1
+            word = text[start:i]
+            operator = RESUME_OPERATORS.get(word.upper())
+            tokens.append(operator if operator and word.isupper() else ('word', word))
+    return tokens
+
+
+def build_resume_query(text):
+    """Преобразовать запрос работодателя в выражение FTS5.
+
+    Поддерживаются AND, OR, NOT (и И, ИЛИ, НЕ) заглавными буквами, скобки,
+    фразы в кавычках и префикс «слово*». Слова без оператора объединяются по
+    И; NOT исключает правую часть из левой. Возвращает пару (выражение,
+    ranked): ranked истинно, если в запросе есть OR и найденные резюме
+    различаются числом совпавших навыков. Выражение всегда синтаксически
+    корректно для FTS5, при ошибке в запросе выбрасывается ValueError.
+    """
+    tokens = _tokenize_resume_query(text)
+    pos = 0
+    ranked = False
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def take():
+        nonlocal pos
+        pos += 1
+        return tokens[pos - 1]
+
+    def term(token):
+        kind, value = token
+        prefix = kind == 'word' and value.endswith('*')
+        value = value.rstrip('*') if prefix else value
+        if not any(ch.isalnum() for ch in value):
+            return None
+        quoted = '"' + value.replace('"', '""') + '"'
+        return quoted + '*' if prefix and len(value) >= 2 else quoted
+
+    def primary():
+        token = peek()
+        if token == '(':
+            take()
+            expr = or_expr()
+            if take_if(')') is None:
+                raise ValueError("Не закрыта скобка")
+            return expr
+        if isinstance(token, tuple):
+            take()
+            return term(token)
+        raise ValueError("Ожидался навык или фраза" if token is None
+                         else f"Неожиданный оператор {token}")
+
+    def take_if(expected):
+        if peek() == expected:
+            return take()
+        return None
+
+    def not_expr():
+        left = primary()
+        while take_if('NOT') is not None:
+            right = primary()
+            if left is None:
+                raise ValueError("NOT должен стоять после навыка, который он уточняет")
+            if right is not None:
+                left = f"({left} NOT {right})"
+        return left
+
+    def and_expr():
+        parts = [not_expr()]
+        while peek() not in (None, ')', 'OR'):
+            take_if('AND')
+            parts.append(not_expr())
+        parts = [part for part in parts if part is not None]
+        if not parts:
+            return None
+        return parts[0] if len(parts) == 1 else '(' + ' AND '.join(parts) + ')'
+
+    def or_expr():
+        nonlocal ranked
+        parts = [and_expr()]
+        while take_if('OR') is not None:
+            parts.append(and_expr())
+        parts = [part for part in parts if part is not None]
+        if not parts:
+            return None
+        if len(parts) == 1:
+            return parts[0]
+        ranked = True
+        return '(' + ' OR '.join(parts) + ')'
+
+    if not tokens:
+        return '', False
+    expr = or_expr()
+    if pos < len(tokens):
+        raise ValueError("Лишняя закрывающая скобка")
+    return expr or '', ranked
+
+
+def build_resume_search_sql(query=False, salary_from=False, salary_to=False,
+                            ranked=False):
+    """SQL поиска резюме для заданного набора фильтров.
+
+    Строка результата: id резюме, имя, фамилия, город, email, заголовок,
+    желаемая должность, зарплатные ожидания, навыки (с подсветкой при поиске
+    по запросу) и фрагмент опыта.
+
+    Ранжирование bm25 требует оценить каждое совпадение, поэтому применяется
+    только при ranked. Без OR все найденные резюме содержат все термы
+    запроса, и они выдаются от новых к старым: FTS5 отдает rowid по убыванию
+    прямо из индекса и останавливается на LIMIT.
+    """
+    conditions = ["r.is_active = 1"]
+    if salary_from:
+        conditions.append("r.salary_expectation >= ?")
+    if salary_to:
+        conditions.append("r.salary_expectation <= ?")
+
+    columns = """r.id, u.first_name, u.last_name, u.city, u.email, r.title,
+               r.desired_position, r.salary_expectation"""
+    if query:
+        weights = ', '.join(str(w) for w in RESUME_SEARCH_WEIGHTS)
+        order = f"bm25(resumes_fts, {weights})" if ranked else "resumes_fts.rowid DESC"
+        return f"""
+            SELECT {columns},
+                   highlight(resumes_fts, 0, '{HIGHLIGHT_OPEN}', '{HIGHLIGHT_CLOSE}'),
+                   snippet(resumes_fts, 2, '{HIGHLIGHT_OPEN}', '{HIGHLIGHT_CLOSE}', '...', 24)
+            FROM resumes_fts
+            JOIN resumes r ON r.id = resumes_fts.rowid
+            JOIN users u ON r.user_id = u.id
+            WHERE resumes_fts MATCH ? AND {' AND '.join(conditions)}
+            ORDER BY {order}
+            LIMIT ?
+        """
+    return f"""
+        SELECT {columns}, r.skills, substr(r.experience, 1, 200)
+        FROM resumes r
+        JOIN users u ON r.user_id = u.id
+        WHERE {' AND '.join(conditions)}
+        ORDER BY r.salary_expectation DESC
+        LIMIT ?
+    """
+
+
+# Экраны с отслеживанием новых записей: (последний id или номер изменения,
+# число новых записей, новые записи). Запросы принимают :user_id, :since, :mark
+CHANGE_FEEDS = {
+    'employer_applications': (SQL_LAST_APPLICATION, SQL_COUNT_NEW_EMPLOYER_APPLICATIONS,
+                              SQL_NEW_EMPLOYER_APPLICATIONS),
+    'feed': (SQL_LAST_VACANCY_CHANGE, SQL_COUNT_CHANGED_FEED_VACANCIES,
+             SQL_CHANGED_FEED_VACANCIES),
+}
+
+
+# Запросы, которые не должны выполняться полным просмотром таблицы
+HOT_QUERIES = {
+    'login': (SQL_FIND_USER, ('employer@test.com', '')),
+    'vacancy_feed': (SQL_VACANCY_FEED, (20,)),
+    'vacancy_feed_after': (SQL_VACANCY_FEED_AFTER, ('2024-01-01 00:00:00', 1000, 20)),
+    'employer_vacancies': (SQL_EMPLOYER_VACANCIES, (1,)),
+    'seeker_applications': (SQL_SEEKER_APPLICATIONS, (1,)),
+    'employer_applications': (SQL_EMPLOYER_APPLICATIONS, (1,)),
+    'export_employer_applications': (SQL_EXPORT_EMPLOYER_APPLICATIONS, (1,)),
+    'export_employer_vacancies': (SQL_EXPORT_EMPLOYER_VACANCIES, (1,)),
+    'seeker_profile': (SQL_SEEKER_PROFILE, (1,)),
+    'active_resume': (SQL_ACTIVE_RESUME, (1,)),
+    'resume_id': (SQL_RESUME_ID, (1,)),
+    'recommendation_profile': (SQL_RECOMMENDATION_PROFILE, (1,)),
+    'applied_employment_types': (SQL_APPLIED_EMPLOYMENT_TYPES, (1,)),
+    'last_vacancy_change': (SQL_LAST_VACANCY_CHANGE, ()),
+    'changed_vacancies': (SQL_CHANGED_VACANCIES, (1000,)),
+    'vacancies_by_ids': (SQL_VACANCIES_BY_IDS, ('[1, 2, 3]',)),
+    'employer_stats': (SQL_EMPLOYER_STATS, (1,)),
+    'applied_vacancies': (SQL_APPLIED_VACANCIES, (1, '[1, 2, 3]')),
+    'application_statuses': (SQL_APPLICATION_STATUSES, ('[1, 2, 3]', 1)),
+    'seen_mark': (SQL_SEEN_MARK, (1, 'feed')),
+    'new_employer_applications': (SQL_NEW_EMPLOYER_APPLICATIONS,
+                                  {'user_id': 1, 'since': 1000, 'mark': 2000}),
+    'count_new_employer_applications': (SQL_COUNT_NEW_EMPLOYER_APPLICATIONS,
+                                        {'user_id': 1, 'since': 1000, 'mark': 2000}),
+    'changed_feed_vacancies': (SQL_CHANGED_FEED_VACANCIES, {'since': 1000, 'mark': 2000}),
+    'count_changed_feed_vacancies': (SQL_COUNT_CHANGED_FEED_VACANCIES,
+                                     {'since': 1000, 'mark': 2000}),
+    'favorite_ids': (SQL_FAVORITE_IDS, (1,)),
+    'favorites': (SQL_FAVORITES, (1, 20)),
+    'favorites_after': (SQL_FAVORITES_AFTER, (1, 1000, 20)),
+    'search_city_salary': (build_search_sql(city=True, salary_from=True), ('Москва', 100000, 50)),
+    'search_salary': (build_search_sql(salary_from=True), (100000, 50)),
+    'search_keywords': (build_search_sql(keywords=True, city=True), ('"python"*', 'Москва', 50)),
+    'search_type': (build_search_sql(employment_type=True), ('remote', 50)),
+    'matching_vacancy_ids': (SQL_MATCHING_VACANCY_IDS, ('"python"*',)),
+    'search_facets_keywords': (build_facets_sql(keywords=True), (100000, None, '"python"*')),
+    'resume_search': (build_resume_search_sql(query=True, salary_to=True),
+                      ('"python" AND "sql"', 200000, 50)),
+    'resume_search_ranked': (build_resume_search_sql(query=True, ranked=True),
+                             ('"go" OR "rust"', 50)),
+    'resume_search_salary': (build_resume_search_sql(salary_from=True, salary_to=True),
+                             (100000, 200000, 50)),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def schema_triggers():
+    """Триггеры текущей схемы {имя: SQL} — миграции, примененные к пустой базе"""
+    conn = sqlite3.connect(':memory:')
+    try:
+        migrate(conn)
+        return dict(conn.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger'").fetchall())
+    finally:
+        conn.close()
+
+
+def missing_triggers(conn):
+    """Имена триггеров схемы, которых нет в базе"""
+    existing = {name for name, in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+    return [name for name in schema_triggers() if name not in existing]
+
+
+def restore_triggers(conn):
+    """Создать недостающие триггеры схемы, вернуть их имена.
+
+    Загрузка данных снимает триггеры на время записи; если процесс был
+    остановлен принудительно, они восстанавливаются здесь.
+    """
+    missing = missing_triggers(conn)
+    triggers = schema_triggers()
+    with conn:
+        for name in missing:
+            conn.execute(triggers[name])
+    return missing
+
+
+def migrate(conn):
+    """Привести схему к SCHEMA_VERSION, вернуть (старая, новая) версия.
+
+    При обновлении существующей базы недостающие триггеры (их могла
+    потерять прерванная загрузка прежних версий генератора) создаются
+    заново, а поддерживаемые ими таблицы пересчитываются. Если версия
+    текущая, триггеры не проверяются: запуск остается дешевым.
+    """
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    for version in range(current, SCHEMA_VERSION):
+        # DDL не открывает транзакцию неявно, поэтому начинаем ее сами:
+        # миграция применяется целиком или не применяется вовсе
+        conn.execute("BEGIN")
+        try:
+            for statement in MIGRATIONS[version]:
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {version + 1}")
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+    if current == 0 or current >= SCHEMA_VERSION:
+        # Новая база (триггеры созданы миграциями) или схема уже текущая
+        return current, max(current, SCHEMA_VERSION)
+    if restore_triggers(conn):
+        with conn:
+            for statement in SQL_REBUILD_TRIGGERED:
+                conn.execute(statement)
+    return current, max(current, SCHEMA_VERSION)
+
+
+def find_full_scans(conn, queries=None):
+    """Запросы из HOT_QUERIES, план которых содержит SCAN по таблице.
+
+    Возвращает список (имя запроса, строка плана); пустой список означает,
+    что все горячие запросы используют индексы.
+    """
+    scans = []
+    for name, (sql, params) in (queries or HOT_QUERIES).items():
+        for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+            detail = row[-1]
+            # Обход виртуальной FTS-таблицы по MATCH — это поиск по индексу
+            if detail.startswith('SCAN') and 'VIRTUAL TABLE' not in detail:
+                scans.append((name, detail))
+    return scans
+
+
+class QueryCache:
+    """LRU-кэш результатов чтения с ограничением размера и временем жизни.
+
+    Ключ — текст запроса и параметры. Каждая запись помнит таблицы, из
+    которых прочитана, и удаляется при записи в любую из них
+    (invalidate); TTL ограничивает срок жизни записей на случай изменений из
+    других процессов. Результаты отдаются без копирования, поэтому
+    изменять их нельзя.
+    """
+
+    def __init__(self, max_entries=256, ttl=60.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # key -> (срок годности, таблицы, результат)
+        self._entries = OrderedDict()
+        self._keys_by_table = {}
+        # Счетчики инвалидаций по таблицам: результат запроса, во время
+        # которого таблица изменилась, в кэш не кладется
+        self._generations = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, tables):
+        """(True, результат) при попадании, иначе (False, метка для put)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[2]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return False, tuple(self._generations.get(table, 0) for table in tables)
+
+    def put(self, key, tables, result, token):
+        """Сохранить результат, если таблицы не менялись с момента get"""
+        with self._lock:
+            if token != tuple(self._generations.get(table, 0) for table in tables):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, tables, result)
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tables):
+        """Удалить результаты, прочитанные из tables"""
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+                for key in list(self._keys_by_table.get(table, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """Удалить все записи"""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def stats(self):
+        """Счетчики попаданий, промахов и удалений для настройки размера и TTL"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def _remove(self, key):
+        _, tables, _ = self._entries.pop(key)
+        for table in tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+
+
+# Методы репозитория, которые не замеряются в режиме профилирования
+UNTRACED_METHODS = {'connection', 'close', 'release', 'mark_changed', 'table_versions', 'version_map',
+                    'facet_index'}
+
+
+class JobFinderRepository:
+    """Доступ к базе данных JobFinder.
+
+    Каждый поток получает собственное соединение, поэтому интерфейс Tk и
+    фоновые обработчики могут выполнять запросы одновременно, не разделяя
+    общий курсор.
+    """
+
+    def __init__(self, db_path=DB_PATH, cached_statements=256, cache_size=256,
+                 cache_ttl=60.0, tracer=None):
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._versions = {}
+        self.cache = QueryCache(cache_size, cache_ttl)
+        # Индекс фасетов поиска создается при первом обращении
+        self._facets = None
+        # Режим профилирования: каждый публичный метод замеряется
+        # (jobfinder_trace.Tracer), а выполненные им SQL-выражения
+        # записываются в аргументы замера
+        self.tracer = tracer
+        if tracer is not None:
+            from jobfinder_trace import count_rows
+            names = [name for name in dir(type(self))
+                     if not name.startswith('_') and name not in UNTRACED_METHODS
+                     and callable(getattr(type(self), name))]
+            tracer.instrument(self, names, 'sql', count_rows)
+
+    def connection(self):
+        """Соединение текущего потока (создается при первом обращении)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30,
+                                   cached_statements=self.cached_statements)
+            # WAL позволяет читателям не ждать писателя
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            if self.tracer is not None:
+                conn.set_trace_callback(self.tracer.statement)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        """Закрыть все соединения пула"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Соединение принадлежит другому потоку и закроется вместе с ним
+                pass
+        self._local = threading.local()
+
+    def release(self):
+        """Закрыть соединение текущего потока (перед завершением потока).
+
+        close() не может закрыть соединения других потоков, поэтому
+        короткоживущие потоки (выгрузка, потоки сервиса) освобождают свое
+        соединение сами.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+        conn.close()
+
+    def mark_changed(self, *tables):
+        """Отметить запись в таблицы (и в таблицы, обновляемые их триггерами)"""
+        names = {name for table in tables
+                 for name in (table, *TRIGGERED_TABLES.get(table, ()))}
+        with self._lock:
+            for name in names:
+                self._versions[name] = self._versions.get(name, 0) + 1
+        self.cache.invalidate(names)
+
+    def table_versions(self, tables):
+        """Версии таблиц: число записей в них через этот репозиторий"""
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def version_map(self):
+        """Версии всех таблиц, в которые была запись (для клиентов сервиса)"""
+        with self._lock:
+            return dict(self._versions)
+
+    def _fetchall(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchall()
+
+    def _fetchone(self, sql, params=()):
+        return self.connection().execute(sql, params).fetchone()
+
+    def _cached(self, fetch, sql, params, tables):
+        # fetch — _fetchall или _fetchone, tables — таблицы запроса
+        key = (sql, tuple(params))
+        found, result = self.cache.get(key, tables)
+        if found:
+            return result
+        token = result
+        result = fetch(sql, params)
+        self.cache.put(key, tables, result, token)
+        return result
+
+    def _stream(self, sql, params=(), batch_size=500):
+        # Курсор принадлежит соединению текущего потока, поэтому генератор
+        # нужно перебирать в том же потоке, где он был начат
+        cursor = self.connection().execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            cursor.close()
+
+    # Схема
+
+    def migrate(self):
+        """Обновить схему базы до текущей версии"""
+        return migrate(self.connection())
+
+    def needs_migration(self):
+        """Отстает ли схема базы от SCHEMA_VERSION"""
+        return self.schema_version() < SCHEMA_VERSION
+
+    def schema_version(self):
+        """Версия схемы, записанная в базе"""
+        return self._fetchone("PRAGMA user_version")[0]
+
+    def count_vacancies(self):
+        """Количество вакансий"""
+        return self._fetchone(SQL_COUNT_VACANCIES)[0]
+
+    def has_vacancies(self):
+        """Есть ли в базе хотя бы одна вакансия"""
+        return bool(self._fetchone(SQL_HAS_VACANCIES)[0])
+
+    # Пользователи
+
+    def find_user(self, email, password_hash):
+        """Пользователь по email и хешу пароля"""
+        return self._fetchone(SQL_FIND_USER, (email, password_hash))
+
+    def create_seeker(self, email, password_hash, first_name, last_name):
+        """Регистрация соискателя (sqlite3.IntegrityError при повторе email)"""
+        conn = self.connection()
+        with conn:
+            user_id = conn.execute(SQL_INSERT_SEEKER, (email, password_hash, 'seeker',
+                                                       first_name, last_name)).lastrowid
+        self.mark_changed('users')
+        return user_id
+
+    def create_employer(self, email, password_hash, company_name):
+        """Регистрация работодателя (sqlite3.IntegrityError при повторе email)"""
+        conn = self.connection()
+        with conn:
+            user_id = conn.execute(SQL_INSERT_EMPLOYER, (email, password_hash, 'employer',
+                                                         company_name)).lastrowid
+        self.mark_changed('users')
+        return user_id
+
+    def get_seeker_profile(self, user_id):
+        """Профиль соискателя"""
+        return self._cached(self._fetchone, SQL_SEEKER_PROFILE, (user_id,), ('users',))
+
+    def get_employer_profile(self, user_id):
+        """Профиль компании"""
+        return self._cached(self._fetchone, SQL_EMPLOYER_PROFILE, (user_id,), ('users',))
+
+    # Вакансии
+
+    def get_vacancy_feed(self, after=None, limit=20):
+        """Страница ленты активных вакансий.
+
+        after — ключ (created_at, id) последней строки предыдущей страницы,
+        None для первой страницы.
+        """
+        if after is None:
+            return self._cached(self._fetchall, SQL_VACANCY_FEED, (limit,), FEED_TABLES)
+        return self._cached(self._fetchall, SQL_VACANCY_FEED_AFTER, (*after, limit),
+                            FEED_TABLES)
+
+    def get_vacancies_by_ids(self, vacancy_ids):
+        """Строки ленты для вакансий из vacancy_ids в том же порядке"""
+        rows = self._fetchall(SQL_VACANCIES_BY_IDS, (json.dumps(list(vacancy_ids)),))
+        by_id = {row[0]: row for row in rows}
+        return [by_id[vacancy_id] for vacancy_id in vacancy_ids if vacancy_id in by_id]
+
+    def search_vacancies(self, keywords='', city=None, salary_from=None,
+                         salary_to=None, limit=50, employment_type=None):
+        """Полнотекстовый поиск вакансий с фильтрами по городу, типу занятости и зарплате"""
+        match = build_fts_query(keywords or '')
+        sql = build_search_sql(bool(match), city is not None,
+                               salary_from is not None, salary_to is not None,
+                               employment_type is not None)
+        params = [match] if match else []
+        params += [value for value in (city, employment_type, salary_from, salary_to)
+                   if value is not None]
+        params.append(limit)
+        return self._cached(self._fetchall, sql, params, FEED_TABLES)
+
+    def get_search_facets(self, keywords='', city=None, salary_from=None,
+                          salary_to=None, employment_type=None):
+        """Число найденных вакансий по городам, типам занятости и порогам
+        зарплаты (см. facet_counts).
+
+        Группы считаются по индексу фасетов в памяти, а без NumPy — одним
+        запросом build_facets_sql.
+        """
+        match = build_fts_query(keywords or '')
+        index = self.facet_index()
+        if index is not None:
+            groups = index.groups(match, salary_from, salary_to)
+        else:
+            params = [salary_from, salary_to] + ([match] if match else [])
+            groups = self._cached(self._fetchall, build_facets_sql(bool(match)),
+                                  params, FEED_TABLES)
+        return facet_counts(groups, city, employment_type)
+
+    def facet_index(self):
+        """Индекс фасетов (jobfinder_facets) или None, если NumPy не установлен"""
+        if self._facets is None:
+            try:
+                from jobfinder_facets import FacetIndex
+            except ImportError:
+                self._facets = False
+            else:
+                self._facets = FacetIndex(self)
+        return self._facets or None
+
+    def optimize_search_index(self):
+        """Слить сегменты FTS-индекса (после массовой загрузки вакансий)"""
+        conn = self.connection()
+        with conn:
+            conn.execute("INSERT INTO vacancies_fts (vacancies_fts) VALUES ('optimize')")
+
+    def search_resumes(self, query='', salary_from=None, salary_to=None, limit=50):
+        """Поиск активных резюме по навыкам (см. build_resume_query) и зарплате"""
+        match, ranked = build_resume_query(query or '')
+        sql = build_resume_search_sql(bool(match), salary_from is not None,
+                                      salary_to is not None, ranked)
+        params = [match] if match else []
+        params += [value for value in (salary_from, salary_to) if value is not None]
+        params.append(limit)
+        return self._cached(self._fetchall, sql, params, ('resumes', 'users'))
+
+    def get_employer_vacancies(self, employer_id):
+        """Вакансии работодателя"""
+        return self._cached(self._fetchall, SQL_EMPLOYER_VACANCIES, (employer_id,),
+                            ('vacancies',))
+
+    # Резюме
+
+    def get_active_resume(self, user_id):
+        """Активное резюме пользователя"""
+        return self._cached(self._fetchone, SQL_ACTIVE_RESUME, (user_id,), ('resumes',))
+
+    def get_recommendation_profile(self, user_id):
+        """(навыки, желаемая должность, зарплата, город) соискателя или None"""
+        return self._cached(self._fetchone, SQL_RECOMMENDATION_PROFILE, (user_id,),
+                            ('resumes', 'users'))
+
+    def get_applied_employment_types(self, user_id):
+        """Число откликов соискателя по типам занятости: {тип: число}"""
+        return dict(self._cached(self._fetchall, SQL_APPLIED_EMPLOYMENT_TYPES, (user_id,),
+                                 ('applications', 'resumes', 'vacancies')))
+
+    def get_resume_id(self, user_id):
+        """Идентификатор резюме пользователя или None"""
+        row = self._cached(self._fetchone, SQL_RESUME_ID, (user_id,), ('resumes',))
+        return row[0] if row else None
+
+    def create_resume(self, user_id, title, desired_position, salary_expectation,
+                      experience, education, skills):
+        """Создание резюме"""
+        conn = self.connection()
+        with conn:
+            resume_id = conn.execute(SQL_INSERT_RESUME, (user_id, title, desired_position,
+                                                         salary_expectation, experience,
+                                                         education, skills)).lastrowid
+        self.mark_changed('resumes')
+        return resume_id
+
+    def delete_resume(self, resume_id):
+        """Удаление резюме"""
+        conn = self.connection()
+        with conn:
+            conn.execute(SQL_DELETE_RESUME, (resume_id,))
+        self.mark_changed('resumes')
+
+    # Отклики
+
+    def create_application(self, resume_id, vacancy_id, cover_letter):
+        """Создание отклика"""
+        conn = self.connection()
+        with conn:
+            application_id = conn.execute(SQL_INSERT_APPLICATION,
+                                          (resume_id, vacancy_id, cover_letter)).lastrowid
+        self.mark_changed('applications')
+        return application_id
+
+    # Новые записи с последнего просмотра
+
+    def get_seen_mark(self, user_id, screen):
+        """Отметка просмотренного экрана или None, если экран еще не открывался"""
+        row = self._fetchone(SQL_SEEN_MARK, (user_id, screen))
+        return row[0] if row else None
+
+    def mark_seen(self, user_id, screen, mark=None):
+        """Считать просмотренным все до mark (по умолчанию — до последней записи)"""
+        if mark is None:
+            mark = self._fetchone(CHANGE_FEEDS[screen][0])[0]
+        conn = self.connection()
+        with conn:
+            conn.execute(SQL_SET_SEEN_MARK, (user_id, screen, mark))
+        return mark
+
+    def count_unseen(self, user_id, screen):
+        """Число записей экрана, добавленных или измененных после отметки.
+
+        Стоимость зависит от числа новых записей, а не от размера таблиц. При
+        первом вызове отметка ставится на последнюю запись.
+        """
+        last_sql, count_sql, _ = CHANGE_FEEDS[screen]
+        mark = self._fetchone(last_sql)[0]
+        since = self.get_seen_mark(user_id, screen)
+        if since is None:
+            self.mark_seen(user_id, screen, mark)
+            return 0
+        return self._fetchone(count_sql, {'user_id': user_id, 'since': since,
+                                          'mark': mark})[0]
+
+    def take_unseen(self, user_id, screen):
+        """Записи экрана после отметки; отметка переносится на последнюю запись"""
+        last_sql, _, rows_sql = CHANGE_FEEDS[screen]
+        mark = self._fetchone(last_sql)[0]
+        since = self.get_seen_mark(user_id, screen)
+        rows = []
+        if since is not None:
+            rows = self._fetchall(rows_sql, {'user_id': user_id, 'since': since,
+                                             'mark': mark})
+        self.mark_seen(user_id, screen, mark)
+        return rows
+
+    # Избранное
+
+    def get_favorite_ids(self, user_id):
+        """Множество id избранных вакансий пользователя"""
+        return {row[0] for row in self._cached(self._fetchall, SQL_FAVORITE_IDS,
+                                               (user_id,), ('favorites',))}
+
+    def add_favorite(self, user_id, vacancy_id):
+        """Добавить вакансию в избранное (повторное добавление ничего не меняет)"""
+        conn = self.connection()
+        with conn:
+            conn.execute(SQL_ADD_FAVORITE, (user_id, vacancy_id))
+        self.mark_changed('favorites')
+
+    def remove_favorite(self, user_id, vacancy_id):
+        """Убрать вакансию из избранного"""
+        conn = self.connection()
+        with conn:
+            conn.execute(SQL_REMOVE_FAVORITE, (user_id, vacancy_id))
+        self.mark_changed('favorites')
+
+    def get_favorites(self, user_id, before=None, limit=20):
+        """Страница избранного, новые сверху.
+
+        Строки — столбцы ленты и id записи избранного, который передается
+        в before для следующей страницы.
+        """
+        if before is None:
+            return self._fetchall(SQL_FAVORITES, (user_id, limit))
+        return self._fetchall(SQL_FAVORITES_AFTER, (user_id, before, limit))
+
+    def create_applications(self, resume_id, vacancy_ids, cover_letter):
+        """Откликнуться на несколько вакансий одной транзакцией.
+
+        Возвращает id вакансий, отклики на которые созданы сейчас (в порядке
+        vacancy_ids); вакансии с уже существующим откликом пропускаются.
+        """
+        vacancy_ids = list(dict.fromkeys(vacancy_ids))
+        conn = self.connection()
+        # IMMEDIATE: между проверкой и вставкой никто не добавит отклик
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            existing = {row[0] for row in conn.execute(
+                SQL_APPLIED_VACANCIES, (resume_id, json.dumps(vacancy_ids)))}
+            conn.executemany(SQL_APPLY_IF_NEW, [(resume_id, vacancy_id, cover_letter)
+                                                for vacancy_id in vacancy_ids])
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        self.mark_changed('applications')
+        return [vacancy_id for vacancy_id in vacancy_ids if vacancy_id not in existing]
+
+    def set_application_statuses(self, employer_id, expected, status):
+        """Перевести отклики работодателя в статус status одной транзакцией.
+
+        expected — {id отклика: статус, который видел пользователь} (или
+        пары id и статуса). Отклик меняется, только если его статус в базе
+        все еще равен ожидаемому и переход разрешен STATUS_TRANSITIONS.
+        Возвращает (список измененных id, {id: (причина, текущий статус)}
+        для остальных). Причина — STATUS_CONFLICT (отклик изменен кем-то
+        еще; статус None — отклик удален или принадлежит другому
+        работодателю) или STATUS_NOT_ALLOWED.
+        """
+        expected = dict(expected)
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            current = dict(conn.execute(SQL_APPLICATION_STATUSES,
+                                        (json.dumps(list(expected)), employer_id)))
+            updated = []
+            rejected = {}
+            for app_id, seen in expected.items():
+                if current.get(app_id) != seen:
+                    rejected[app_id] = (STATUS_CONFLICT, current.get(app_id))
+                elif status not in STATUS_TRANSITIONS.get(seen, ()):
+                    rejected[app_id] = (STATUS_NOT_ALLOWED, seen)
+                elif conn.execute(SQL_SET_APPLICATION_STATUS,
+                                  (status, app_id, seen)).rowcount:
+                    updated.append(app_id)
+                else:
+                    rejected[app_id] = (STATUS_CONFLICT, current.get(app_id))
+        except Exception:
+            conn.rollback()
+            raise
+        conn.commit()
+        if updated:
+            self.mark_changed('applications')
+        return updated, rejected
+
+    def get_seeker_applications(self, user_id):
+        """Отклики соискателя"""
+        return self._fetchall(SQL_SEEKER_APPLICATIONS, (user_id,))
+
+    def get_employer_applications(self, employer_id):
+        """Отклики на вакансии работодателя"""
+        return self._fetchall(SQL_EMPLOYER_APPLICATIONS, (employer_id,))
+
+    def get_employer_stats(self, employer_id):
+        """Счетчики работодателя из employer_stats.
+
+        Порядок: всего и активных вакансий, всего и новых откликов,
+        приглашено на собеседование, отклонено, принято.
+        """
+        return (self._cached(self._fetchone, SQL_EMPLOYER_STATS, (employer_id,),
+                             ('employer_stats',))
+                or (0,) * 7)
+
+    def stream_seeker_applications(self, user_id, batch_size=500):
+        """Отклики соискателя пачками по batch_size строк"""
+        return self._stream(SQL_SEEKER_APPLICATIONS, (user_id,), batch_size)
+
+    def stream_employer_applications(self, employer_id, batch_size=500):
+        """Отклики на вакансии работодателя пачками по batch_size строк"""
+        return self._stream(SQL_EMPLOYER_APPLICATIONS, (employer_id,), batch_size)
+
+    def stream_application_export(self, employer_id, batch_size=1000):
+        """Отклики работодателя для выгрузки (EXPORT_APPLICATION_COLUMNS)"""
+        return self._stream(SQL_EXPORT_EMPLOYER_APPLICATIONS, (employer_id,), batch_size)
+
+    def stream_vacancy_export(self, employer_id, batch_size=1000):
+        """Вакансии работодателя для выгрузки (EXPORT_VACANCY_COLUMNS)"""
+        return self._stream(SQL_EXPORT_EMPLOYER_VACANCIES, (employer_id,), batch_size)
+
+
+
+class FeedPager:
+    """Постраничная загрузка ленты с упреждающей выборкой следующей страницы.
+
+    Пока пользователь читает текущую страницу, следующая загружается в
+    executor (concurrent.futures), и к моменту прокрутки обычно уже готова.
+    fetch(cursor, limit) и cursor_of(rows) позволяют листать так же другие
+    списки (по умолчанию — лента, get_vacancy_feed).
+    """
+
+    def __init__(self, repo, executor, page_size=20, fetch=None, cursor_of=None):
+        self.repo = repo
+        self.executor = executor
+        self.page_size = page_size
+        self.fetch = fetch or repo.get_vacancy_feed
+        self.cursor_of = cursor_of or (lambda rows: (rows[-1][8], rows[-1][0]))
+        self.cursor = None
+        self.exhausted = False
+        self._next = None
+
+    def first_page(self):
+        """Загрузить первую страницу синхронно (заново, с начала списка)"""
+        self.cancel()
+        self.cursor = None
+        self.exhausted = False
+        rows = self.fetch(None, self.page_size)
+        self._advance(rows)
+        return rows
+
+    def prefetch(self):
+        """Начать загрузку следующей страницы в фоне"""
+        if self._next is None and not self.exhausted:
+            self._next = self.executor.submit(self.fetch, self.cursor, self.page_size)
+
+    def next_ready(self):
+        """Готова ли загруженная заранее страница"""
+        return self._next is not None and self._next.done()
+
+    def take_next(self):
+        """Забрать загруженную страницу (вызывать после next_ready())"""
+        rows = self._next.result()
+        self._next = None
+        self._advance(rows)
+        return rows
+
+    def cancel(self):
+        """Отменить незавершенную загрузку"""
+        if self._next is not None:
+            self._next.cancel()
+            self._next = None
+
+    def _advance(self, rows):
+        if len(rows) < self.page_size:
+            self.exhausted = True
+        if rows:
+            self.cursor = self.cursor_of(rows)
+
+
+if __name__ == "__main__":
+    # python jobfinder_db.py [путь к базе] — обновить схему и проверить планы
+    import sys
+    repo = JobFinderRepository(sys.argv[1] if len(sys.argv) > 1 else DB_PATH)
+    old_version, new_version = repo.migrate()
+    print(f"Версия схемы: {old_version} -> {new_version}")
+    scans = find_full_scans(repo.connection())
+    for name, detail in scans:
+        print(f"{name}: {detail}")
+    repo.close()
+    sys.exit(1 if scans else 0)
@@ -0,0 +1,160 @@
+import threading
+
+import numpy as np
+
+from jobfinder_db import (SALARY_FACETS, SQL_CHANGED_VACANCIES, SQL_FACET_VACANCIES,
+                          SQL_LAST_VACANCY_CHANGE, SQL_MATCHING_VACANCY_IDS)
+
+# Зарплата вместо NULL: условия фильтров поиска для нее не выполняются
+NO_SALARY_FROM = np.iinfo(np.int64).max
+NO_SALARY_TO = -1
+
+SALARY_THRESHOLDS = np.array(SALARY_FACETS, dtype=np.int64)
+
+
+class FacetIndex:
+    """Значения фасетов поиска для всех активных вакансий в памяти.
+
+    Массивы индексируются id вакансии: коды города и типа занятости
+    (-1 — вакансии нет или она снята с публикации) и границы зарплаты.
+    Группы фасетов (как у build_facets_sql) считаются одним проходом
+    np.bincount по id, найденным FTS-индексом, или по всем активным
+    вакансиям, если ключевых слов нет. Изменения вакансий подхватываются
+    из журнала vacancy_changes, как в RecommendationEngine.
+    """
+
+    def __init__(self, repo):
+        self.repo = repo
+        self._lock = threading.Lock()
+        self.seq = None
+        # Значения городов и типов занятости по коду и коды по значению
+        self.cities, self.city_codes = [], {}
+        self.types, self.type_codes = [], {}
+        self.city = np.full(0, -1, dtype=np.int32)
+        self.employment = np.full(0, -1, dtype=np.int32)
+        self.salary_from = np.zeros(0, dtype=np.int64)
+        self.salary_to = np.zeros(0, dtype=np.int64)
+
+    # Загрузка и обновление
+
+    def refresh(self):
+        """Привести индекс в соответствие с базой (полностью или по журналу)"""
+        with self._lock:
+            if self.seq is None:
+                self._build()
+            else:
+                self._apply_changes()
+
+    def _build(self):
+        conn = self.repo.connection()
+        # Журнал и вакансии читаем в одной транзакции, чтобы изменения,
+        # сделанные во время загрузки, не потерялись и не учлись дважды
+        conn.execute("BEGIN")
+        try:
+            seq = conn.execute(SQL_LAST_VACANCY_CHANGE).fetchone()[0]
+            cursor = conn.execute(SQL_FACET_VACANCIES)
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                self._set(rows)
+        finally:
+            conn.commit()
+        self.seq = seq
+
+    def _apply_changes(self):
+        conn = self.repo.connection()
+        conn.execute("BEGIN")
+        try:
+            seq = conn.execute(SQL_LAST_VACANCY_CHANGE).fetchone()[0]
+            changed = conn.execute(SQL_CHANGED_VACANCIES, (self.seq,)).fetchall()
+        finally:
+            conn.commit()
+        if not changed:
+            return
+
+        # Строки с NULL вместо заголовка — удаленные или скрытые вакансии
+        removed = [row[0] for row in changed if row[1] is None and row[0] < len(self.city)]
+        self.city[removed] = -1
+        self.employment[removed] = -1
+        self._set([(vacancy_id, salary_from, salary_to, city, employment_type)
+                   for vacancy_id, title, _, salary_from, salary_to, city, employment_type
+                   in changed if title is not None])
+        self.seq = seq
+
+    def _set(self, rows):
+        # rows — (id, salary_from, salary_to, city, employment_type)
+        if not rows:
+            return
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        self._grow(int(ids.max()) + 1)
+        self.salary_from[ids] = [NO_SALARY_FROM if row[1] is None else row[1] for row in rows]
+        self.salary_to[ids] = [NO_SALARY_TO if row[2] is None else row[2] for row in rows]
+        self.city[ids] = [self._code(self.cities, self.city_codes, row[3]) for row in rows]
+        self.employment[ids] = [self._code(self.types, self.type_codes, row[4]) for row in rows]
+
+    def _grow(self, size):
+        if size <= len(self.city):
+            return
+        # Запас, чтобы новые вакансии не копировали массивы каждый раз
+        size = max(size, len(self.city) + len(self.city) // 4)
+        extra = size - len(self.city)
+        self.city = np.concatenate([self.city, np.full(extra, -1, dtype=np.int32)])
+        self.employment = np.concatenate(
+            [self.employment, np.full(extra, -1, dtype=np.int32)])
+        self.salary_from = np.concatenate(
+            [self.salary_from, np.full(extra, NO_SALARY_FROM, dtype=np.int64)])
+        self.salary_to = np.concatenate(
+            [self.salary_to, np.full(extra, NO_SALARY_TO, dtype=np.int64)])
+
+    @staticmethod
+    def _code(values, codes, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(values)
+            values.append(value)
+        return code
+
+    # Фасеты
+
+    def matching_ids(self, match):
+        """id вакансий, совпавших с запросом FTS (в том числе неактивных).
+
+        id читаются из курсора прямо в массив, без промежуточной строки
+        или списка строк.
+        """
+        cursor = self.repo.connection().execute(SQL_MATCHING_VACANCY_IDS, (match,))
+        return np.fromiter((row[0] for row in cursor), dtype=np.int64)
+
+    def groups(self, match='', salary_from=None, salary_to=None):
+        """Группы (город, тип занятости, корзина зарплаты, подходит ли под
+        salary_from, число вакансий) — те же, что у build_facets_sql"""
+        self.refresh()
+        ids = self.matching_ids(match) if match else None
+        with self._lock:
+            if ids is None:
+                ids = np.flatnonzero(self.city >= 0)
+            else:
+                ids = ids[ids < len(self.city)]
+                ids = ids[self.city[ids] >= 0]
+            if salary_to is not None:
+                ids = ids[self.salary_from[ids] <= salary_to]
+            upper = self.salary_to[ids]
+            buckets = np.searchsorted(SALARY_THRESHOLDS, upper, side='right')
+            salary_ok = (upper >= salary_from if salary_from is not None
+                         else np.ones(len(ids), dtype=bool))
+
+            # Группа — одно число: ((город * типов + тип) * корзин + корзина) * 2 + флаг
+            bucket_count = len(SALARY_FACETS) + 1
+            keys = (self.city[ids].astype(np.int64) * len(self.types) + self.employment[ids])
+            keys = (keys * bucket_count + buckets) * 2 + salary_ok
+            counts = np.bincount(keys, minlength=len(self.cities) * len(self.types)
+                                 * bucket_count * 2)
+            groups = []
+            for key in np.flatnonzero(counts):
+                rest, ok = divmod(int(key), 2)
+                rest, bucket = divmod(rest, bucket_count)
+                city, employment = divmod(rest, len(self.types))
+                groups.append((self.cities[city], self.types[employment], bucket, ok,
+                               int(counts[key])))
+            return groups
@@ -0,0 +1,447 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+
+from jobfinder_db import FTS_TRIGGERS
+
+# Коды типа занятости и допустимые варианты написания во входных файлах
+EMPLOYMENT_TYPES = {
+    'full_time': 'full_time',
+    'full-time': 'full_time',
+    'fulltime': 'full_time',
+    'полная занятость': 'full_time',
+    'part_time': 'part_time',
+    'part-time': 'part_time',
+    'parttime': 'part_time',
+    'частичная занятость': 'part_time',
+    'remote': 'remote',
+    'удаленная работа': 'remote',
+    'удаленно': 'remote',
+    'hybrid': 'hybrid',
+    'гибридный формат': 'hybrid',
+    'project': 'project',
+    'проектная работа': 'project',
+}
+
+SQL_UPSERT_VACANCY = """
+    INSERT INTO vacancies (external_id, employer_id, title, description, requirements,
+                           salary_from, salary_to, employment_type, city, is_active)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (external_id) WHERE external_id IS NOT NULL DO UPDATE SET
+        title = excluded.title,
+        description = excluded.description,
+        requirements = excluded.requirements,
+        salary_from = excluded.salary_from,
+        salary_to = excluded.salary_to,
+        employment_type = excluded.employment_type,
+        city = excluded.city,
+        is_active = excluded.is_active
+"""
+
+SQL_CREATE_BATCH_KEYS = """
+    CREATE TEMP TABLE IF NOT EXISTS import_batch_keys (external_id TEXT PRIMARY KEY)
+"""
+
+SQL_INSERT_BATCH_KEY = "INSERT OR IGNORE INTO temp.import_batch_keys (external_id) VALUES (?)"
+
+# Удаление из FTS-индекса старых версий вакансий, которые пачка обновит
+SQL_FTS_DELETE_UPDATED = """
+    INSERT INTO vacancies_fts (vacancies_fts, rowid, title, description, requirements)
+    SELECT 'delete', id, title, description, requirements
+    FROM vacancies
+    WHERE external_id IN (SELECT external_id FROM temp.import_batch_keys)
+"""
+
+# Индексация новых и обновленных вакансий пачки одним запросом
+SQL_FTS_INDEX_BATCH = """
+    INSERT INTO vacancies_fts (rowid, title, description, requirements)
+    SELECT id, title, description, requirements
+    FROM vacancies
+    WHERE id > ? OR external_id IN (SELECT external_id FROM temp.import_batch_keys)
+"""
+
+# Триггеры, которые снимаются на время записи пачки
+BATCH_FTS_TRIGGERS = ('vacancies_fts_insert', 'vacancies_fts_update')
+
+SQL_GET_CHECKPOINT = "SELECT position, fingerprint FROM import_checkpoints WHERE source = ?"
+
+SQL_SAVE_CHECKPOINT = """
+    INSERT INTO import_checkpoints (source, position, fingerprint, updated_at)
+    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT (source) DO UPDATE SET
+        position = excluded.position,
+        fingerprint = excluded.fingerprint,
+        updated_at = excluded.updated_at
+"""
+
+SQL_DELETE_CHECKPOINT = "DELETE FROM import_checkpoints WHERE source = ?"
+
+# Работодатели, которым можно импортировать вакансии
+SQL_EMPLOYER_IDS = "SELECT id FROM users WHERE user_type = 'employer'"
+
+# Сколько байт начала файла входит в его отпечаток
+FINGERPRINT_BYTES = 1 << 16
+
+
+class ImportResult:
+    """Итог импорта"""
+
+    def __init__(self):
+        self.processed = 0
+        self.imported = 0
+        self.skipped = 0
+        self.resumed_from = 0
+        self.errors = []
+
+    def __repr__(self):
+        return (f"ImportResult(processed={self.processed}, imported={self.imported}, "
+                f"skipped={self.skipped}, resumed_from={self.resumed_from})")
+
+
+def detect_format(path):
+    """Формат файла по расширению: csv, json или ndjson"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    if extension == '.json':
+        return 'json'
+    raise ValueError(f"Неизвестный формат файла: {path}")
+
+
+def iter_json_array(f, chunk_size=1 << 16):
+    """Объекты JSON-массива по одному, без чтения всего файла в память"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+
+    def fill():
+        nonlocal buffer, pos
+        chunk = f.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return bool(chunk)
+
+    # Открывающая скобка массива
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos < len(buffer):
+            break
+        if not fill():
+            return
+    if buffer[pos] != '[':
+        raise ValueError("Ожидался JSON-массив")
+    pos += 1
+
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ','):
+            pos += 1
+        if pos >= len(buffer):
+            if not fill():
+                raise ValueError("Неожиданный конец JSON-массива")
+            continue
+        if buffer[pos] == ']':
+            return
+        try:
+            obj, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # Объект не поместился в буфер целиком — дочитываем
+            if not fill():
+                raise
+            continue
+        pos = end
+        yield obj
+
+
+def iter_records(path, fmt=None):
+    """Записи файла импорта в виде словарей"""
+    fmt = fmt or detect_format(path)
+    with open(path, encoding='utf-8', newline='') as f:
+        if fmt == 'csv':
+            yield from csv.DictReader(f)
+        elif fmt == 'ndjson':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif fmt == 'json':
+            yield from iter_json_array(f)
+        else:
+            raise ValueError(f"Неизвестный формат: {fmt}")
+
+
+def file_fingerprint(path):
+    """Размер, время изменения и хеш начала файла: по нему контрольная
+    точка отличает прерванный файл от нового, лежащего по тому же пути"""
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        head = hashlib.sha256(f.read(FINGERPRINT_BYTES)).hexdigest()
+    return f"{stat.st_size}:{stat.st_mtime_ns}:{head}"
+
+
+def _to_int(value, field):
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field}: ожидалось целое число, получено {value!r}")
+
+
+def validate_vacancy(record, default_employer_id=None, employers=None):
+    """Проверить запись и привести ее к кортежу для SQL_UPSERT_VACANCY.
+
+    employers — множество id работодателей; если задано, запись с другим
+    employer_id отклоняется.
+    """
+    title = (record.get('title') or '').strip()
+    if not title:
+        raise ValueError("title: обязательное поле")
+
+    employer_id = _to_int(record.get('employer_id'), 'employer_id') or default_employer_id
+    if employer_id is None:
+        raise ValueError("employer_id: не указан работодатель")
+    if employers is not None and employer_id not in employers:
+        raise ValueError(f"employer_id: нет работодателя с id {employer_id}")
+
+    salary_from = _to_int(record.get('salary_from'), 'salary_from')
+    salary_to = _to_int(record.get('salary_to'), 'salary_to')
+    if salary_from is not None and salary_to is not None and salary_from > salary_to:
+        raise ValueError("salary_from больше salary_to")
+
+    employment_type = record.get('employment_type') or 'full_time'
+    code = EMPLOYMENT_TYPES.get(str(employment_type).strip().lower())
+    if code is None:
+        raise ValueError(f"employment_type: неизвестный тип {employment_type!r}")
+
+    is_active = record.get('is_active', 1)
+    if isinstance(is_active, str):
+        is_active = is_active.strip().lower() not in ('0', 'false', 'no', 'нет', '')
+
+    external_id = record.get('external_id')
+    return (str(external_id) if external_id not in (None, '') else None,
+            employer_id,
+            title,
+            record.get('description') or '',
+            record.get('requirements') or '',
+            salary_from,
+            salary_to,
+            code,
+            record.get('city') or '',
+            1 if is_active else 0)
+
+
+def import_vacancies(repo, path, employer_id=None, fmt=None, batch_size=20000,
+                     resume=True, on_progress=None, max_errors=1000):
+    """Потоковый импорт вакансий из CSV, JSON-массива или NDJSON.
+
+    Записи читаются по одной и пишутся пачками через executemany, каждая
+    пачка — отдельная транзакция вместе с контрольной точкой. При повторном
+    запуске с resume=True уже записанные пачки пропускаются, если файл тот
+    же (file_fingerprint); контрольная точка другого файла по тому же пути
+    сбрасывается. Запись с тем же external_id обновляет существующую
+    вакансию; записи работодателей, которых нет в базе, пропускаются.
+    """
+    conn = repo.connection()
+    source = os.path.abspath(path)
+    fingerprint = file_fingerprint(path)
+    result = ImportResult()
+
+    employers = {row[0] for row in conn.execute(SQL_EMPLOYER_IDS)}
+    if employer_id is not None and employer_id not in employers:
+        raise ValueError(f"Нет работодателя с id {employer_id}")
+
+    row = conn.execute(SQL_GET_CHECKPOINT, (source,)).fetchone()
+    if row and resume and row[1] == fingerprint:
+        result.resumed_from = row[0]
+
+    # Надежность записи на время импорта снижаем: при сбое импорт
+    # продолжится с последней контрольной точки. Большой кэш страниц ускоряет
+    # обновление индексов при вставке в случайном порядке ключей
+    cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -200000")
+    try:
+        batch = []
+        for position, record in enumerate(iter_records(path, fmt), start=1):
+            result.processed = position
+            if position <= result.resumed_from:
+                continue
+            try:
+                batch.append(validate_vacancy(record, employer_id, employers))
+            except (ValueError, AttributeError) as error:
+                result.skipped += 1
+                if len(result.errors) < max_errors:
+                    result.errors.append((position, str(error)))
+            if position % batch_size == 0:
+                _write_batch(conn, batch, source, position, fingerprint)
+                result.imported += len(batch)
+                batch = []
+                if on_progress is not None:
+                    on_progress(result)
+
+        _write_batch(conn, batch, source, result.processed, fingerprint)
+        result.imported += len(batch)
+        with conn:
+            conn.execute(SQL_DELETE_CHECKPOINT, (source,))
+    finally:
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = {cache_size}")
+        # Часть пачек могла записаться и при ошибке
+        repo.mark_changed('vacancies')
+
+    repo.optimize_search_index()
+    if on_progress is not None:
+        on_progress(result)
+    return result
+
+
+def _write_batch(conn, batch, source, position, fingerprint):
+    # Построчная индексация из триггеров в несколько раз медленнее, чем
+    # INSERT ... SELECT по всей пачке, поэтому FTS-триггеры снимаются на время
+    # записи. Все происходит в одной транзакции: другие соединения не видят
+    # таблицу без триггеров, а при сбое откатывается и удаление триггеров.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        max_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM vacancies").fetchone()[0]
+        conn.execute(SQL_CREATE_BATCH_KEYS)
+        conn.execute("DELETE FROM temp.import_batch_keys")
+        conn.executemany(SQL_INSERT_BATCH_KEY,
+                         [(row[0],) for row in batch if row[0] is not None])
+        conn.execute(SQL_FTS_DELETE_UPDATED)
+        for name in BATCH_FTS_TRIGGERS:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+        conn.executemany(SQL_UPSERT_VACANCY, batch)
+
+        conn.execute(SQL_FTS_INDEX_BATCH, (max_id,))
+        for name in BATCH_FTS_TRIGGERS:
+            conn.execute(FTS_TRIGGERS[name])
+        conn.execute(SQL_SAVE_CHECKPOINT, (source, position, fingerprint))
+    except Exception:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+class ExportCancelled(Exception):
+    """Выгрузка прервана пользователем"""
+
+
+def export_rows(batches, columns, path, fmt=None, should_stop=None, on_progress=None):
+    """Записать пачки строк в CSV или NDJSON, вернуть число строк.
+
+    batches — итератор пачек (например, JobFinderRepository._stream), поэтому
+    в памяти одновременно находится только одна пачка. Запись идет во
+    временный файл, который заменяет path лишь после успешного завершения:
+    прерванная выгрузка не оставляет неполного файла.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in ('csv', 'ndjson'):
+        raise ValueError(f"Выгрузка в формат {fmt} не поддерживается")
+
+    partial = path + '.part'
+    count = 0
+    try:
+        # utf-8-sig — чтобы Excel распознал кодировку CSV
+        with open(partial, 'w', encoding='utf-8-sig' if fmt == 'csv' else 'utf-8',
+                  newline='') as f:
+            if fmt == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                write_batch = writer.writerows
+            else:
+                def write_batch(rows):
+                    f.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + '\n'
+                                 for row in rows)
+            for rows in batches:
+                if should_stop is not None and should_stop():
+                    raise ExportCancelled()
+                write_batch(rows)
+                count += len(rows)
+                if on_progress is not None:
+                    on_progress(count)
+        os.replace(partial, path)
+    except BaseException:
+        if os.path.exists(partial):
+            os.remove(partial)
+        raise
+    return count
+
+
+class ExportJob:
+    """Выгрузка в отдельном потоке с отменой.
+
+    Поток интерфейса опрашивает count, done и error (например, через
+    root.after); cancel() останавливает запись после текущей пачки.
+    release вызывается в конце потока — закрыть его соединение с базой
+    (JobFinderRepository.release).
+    """
+
+    def __init__(self, stream, args, columns, path, fmt=None, release=None):
+        self.count = 0
+        self.done = False
+        self.cancelled = False
+        self.error = None
+        self._stop = threading.Event()
+        self._release = release
+        self._thread = threading.Thread(target=self._run, name='jobfinder-export',
+                                        args=(stream, args, columns, path, fmt),
+                                        daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Прервать выгрузку"""
+        self._stop.set()
+
+    def _run(self, stream, args, columns, path, fmt):
+        try:
+            export_rows(stream(*args), columns, path, fmt,
+                        should_stop=self._stop.is_set,
+                        on_progress=self._set_count)
+        except ExportCancelled:
+            self.cancelled = True
+        except Exception as error:
+            self.error = error
+        finally:
+            if self._release is not None:
+                self._release()
+            self.done = True
+
+    def _set_count(self, count):
+        self.count = count
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+    from jobfinder_db import JobFinderRepository, DB_PATH
+
+    parser = argparse.ArgumentParser(description="Импорт вакансий в JobFinder")
+    parser.add_argument('path', help="файл .csv, .json или .ndjson")
+    parser.add_argument('--db', default=DB_PATH, help="путь к базе данных")
+    parser.add_argument('--employer-id', type=int,
+                        help="работодатель для записей без employer_id")
+    parser.add_argument('--format', choices=('csv', 'json', 'ndjson'))
+    parser.add_argument('--batch-size', type=int, default=20000)
+    parser.add_argument('--restart', action='store_true',
+                        help="начать заново, игнорируя контрольную точку")
+    args = parser.parse_args()
+
+    repo = JobFinderRepository(args.db)
+    repo.migrate()
+    started = time.perf_counter()
+    result = import_vacancies(repo, args.path, args.employer_id, args.format,
+                              args.batch_size, resume=not args.restart,
+                              on_progress=lambda r: print(f"\r{r.processed:,}", end=''))
+    elapsed = time.perf_counter() - started
+    print(f"\n{result} за {elapsed:.1f} с ({result.processed / max(elapsed, 1e-9):,.0f} строк/с)")
+    for position, message in result.errors[:20]:
+        print(f"  запись {position}: {message}")
+    repo.close()
@@ -0,0 +1,344 @@
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from jobfinder_db import (SQL_LAST_VACANCY_CHANGE, SQL_RECOMMENDATION_VACANCIES,
+                          SQL_CHANGED_VACANCIES)
+
+# Вклад составляющих в итоговую оценку вакансии
+RECOMMEND_WEIGHTS = {
+    'skills': 0.6,
+    'salary': 0.2,
+    'city': 0.1,
+    'employment': 0.1,
+}
+
+# Термы хэшируются в фиксированное число корзин, поэтому словарь не нужно
+# хранить и пополнять, а кэш векторов остается валидным между запусками
+HASH_BUCKETS = 1 << 20
+
+TOKEN_RE = re.compile(r'[\w+#]+')
+
+EMPLOYMENT_CODES = {'full_time': 1, 'part_time': 2, 'remote': 3, 'hybrid': 4, 'project': 5}
+
+# Города хранятся кодами (crc32 нижнего регистра), 0 — город не указан
+REMOTE_CITY = 'удаленно'
+
+# Доля «мертвых» строк, после которой массивы уплотняются
+COMPACT_RATIO = 0.25
+
+# Сколько изменений накопить, прежде чем перезаписать кэш на диске
+SAVE_EVERY = 10000
+
+# Доля измененных строк, после которой idf пересчитывается по всему корпусу.
+# До этого idf не меняется, а нормы считаются только для новых строк
+IDF_REFRESH_RATIO = 0.01
+
+
+def term_ids(text):
+    """Хэши термов текста (с повторами)"""
+    return [zlib.crc32(token.encode('utf-8')) % HASH_BUCKETS
+            for token in TOKEN_RE.findall((text or '').lower())
+            if len(token) > 1 or token in ('c', 'r')]
+
+
+def city_code(city):
+    city = (city or '').strip().lower()
+    return zlib.crc32(city.encode('utf-8')) if city else 0
+
+
+class RecommendationEngine:
+    """Персональные рекомендации вакансий по активному резюме.
+
+    Векторы всех активных вакансий хранятся в памяти в виде столбцов NumPy:
+    термы требований и заголовка — разреженной матрицей в формате COO
+    (строка, терм, частота), зарплата, город и тип занятости — отдельными
+    массивами. Оценка всех вакансий для одного резюме считается одним
+    векторным проходом. Изменения вакансий подхватываются из журнала
+    vacancy_changes: измененная строка помечается мертвой и добавляется
+    заново, поэтому обновление стоит пропорционально числу изменений.
+    """
+
+    def __init__(self, repo, cache_path=None):
+        self.repo = repo
+        self.cache_path = cache_path
+        self._lock = threading.Lock()
+        self.seq = None
+        self._unsaved = 0
+        self._clear()
+
+    def _clear(self):
+        self.vacancy_ids = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.salary_from = np.zeros(0, dtype=np.float32)
+        self.salary_to = np.zeros(0, dtype=np.float32)
+        self.cities = np.zeros(0, dtype=np.uint32)
+        self.employment = np.zeros(0, dtype=np.int8)
+        self.term_rows = np.zeros(0, dtype=np.int32)
+        self.term_ids = np.zeros(0, dtype=np.int32)
+        self.term_freqs = np.zeros(0, dtype=np.float32)
+        self.rows_by_id = {}
+        self._idf = None
+        self._norms = None
+        self._changed_rows = 0
+
+    # Загрузка и обновление
+
+    def refresh(self):
+        """Привести векторы в соответствие с базой (полностью или по журналу)"""
+        with self._lock:
+            if self.seq is None and not self._load_cache():
+                self._build()
+            else:
+                self._apply_changes()
+
+    def _build(self):
+        conn = self.repo.connection()
+        # Журнал и вакансии читаем в одной транзакции, чтобы изменения,
+        # сделанные во время загрузки, не потерялись и не учлись дважды
+        conn.execute("BEGIN")
+        try:
+            seq = conn.execute(SQL_LAST_VACANCY_CHANGE).fetchone()[0]
+            self._clear()
+            cursor = conn.execute(SQL_RECOMMENDATION_VACANCIES)
+            while True:
+                rows = cursor.fetchmany(10000)
+                if not rows:
+                    break
+                self._append(rows)
+        finally:
+            conn.commit()
+        self.seq = seq
+        self._save()
+
+    def _apply_changes(self):
+        conn = self.repo.connection()
+        conn.execute("BEGIN")
+        try:
+            seq = conn.execute(SQL_LAST_VACANCY_CHANGE).fetchone()[0]
+            changed = conn.execute(SQL_CHANGED_VACANCIES, (self.seq,)).fetchall()
+        finally:
+            conn.commit()
+        if not changed:
+            return
+
+        for row in changed:
+            old = self.rows_by_id.pop(row[0], None)
+            if old is not None:
+                self.alive[old] = False
+        # Строки с NULL вместо заголовка — удаленные или скрытые вакансии
+        self._append([row for row in changed if row[1] is not None])
+        self.seq = seq
+
+        if (~self.alive).sum() > COMPACT_RATIO * len(self.alive):
+            self._compact()
+        self._unsaved += len(changed)
+        if self._unsaved >= SAVE_EVERY:
+            self._save()
+
+    def _append(self, rows):
+        if not rows:
+            return
+        start = len(self.vacancy_ids)
+        term_rows, term_list, term_freqs = [], [], []
+        for offset, (vacancy_id, title, requirements, *_rest) in enumerate(rows):
+            counts = {}
+            for term in term_ids(title) + term_ids(requirements):
+                counts[term] = counts.get(term, 0) + 1
+            term_rows.extend([start + offset] * len(counts))
+            term_list.extend(counts.keys())
+            term_freqs.extend(counts.values())
+            self.rows_by_id[vacancy_id] = start + offset
+
+        def column(index, default=0):
+            return [row[index] if row[index] is not None else default for row in rows]
+
+        self.vacancy_ids = np.concatenate([self.vacancy_ids, np.array(column(0), dtype=np.int64)])
+        self.alive = np.concatenate([self.alive, np.ones(len(rows), dtype=bool)])
+        self.salary_from = np.concatenate(
+            [self.salary_from, np.array(column(3), dtype=np.float32)])
+        self.salary_to = np.concatenate(
+            [self.salary_to, np.array(column(4), dtype=np.float32)])
+        self.cities = np.concatenate(
+            [self.cities, np.array([city_code(row[5]) for row in rows], dtype=np.uint32)])
+        self.employment = np.concatenate(
+            [self.employment, np.array([EMPLOYMENT_CODES.get(row[6], 0) for row in rows],
+                                       dtype=np.int8)])
+        self.term_rows = np.concatenate([self.term_rows, np.array(term_rows, dtype=np.int32)])
+        self.term_ids = np.concatenate([self.term_ids, np.array(term_list, dtype=np.int32)])
+        self.term_freqs = np.concatenate(
+            [self.term_freqs, np.array(term_freqs, dtype=np.float32)])
+        self._changed_rows += len(rows)
+
+    def _compact(self):
+        keep = self.alive
+        new_index = np.cumsum(keep, dtype=np.int64) - 1
+        entries = keep[self.term_rows]
+        self.term_rows = new_index[self.term_rows[entries]].astype(np.int32)
+        self.term_ids = self.term_ids[entries]
+        self.term_freqs = self.term_freqs[entries]
+        for name in ('vacancy_ids', 'salary_from', 'salary_to', 'cities', 'employment'):
+            setattr(self, name, getattr(self, name)[keep])
+        if self._norms is not None:
+            # Уже посчитанные нормы переносятся, новые досчитаются при оценке
+            self._norms = self._norms[keep[:len(self._norms)]]
+        self.alive = np.ones(len(self.vacancy_ids), dtype=bool)
+        self.rows_by_id = {int(vacancy_id): row
+                           for row, vacancy_id in enumerate(self.vacancy_ids)}
+
+    # Кэш на диске
+
+    def _save(self):
+        if self.cache_path is None:
+            return
+        if not self.alive.all():
+            self._compact()
+        partial = self.cache_path + '.part.npz'
+        np.savez(partial, seq=np.int64(self.seq), vacancy_ids=self.vacancy_ids,
+                 salary_from=self.salary_from, salary_to=self.salary_to,
+                 cities=self.cities, employment=self.employment,
+                 term_rows=self.term_rows, term_ids=self.term_ids,
+                 term_freqs=self.term_freqs)
+        os.replace(partial, self.cache_path)
+        self._unsaved = 0
+
+    def _load_cache(self):
+        if self.cache_path is None or not os.path.exists(self.cache_path):
+            return False
+        try:
+            with np.load(self.cache_path) as data:
+                seq = int(data['seq'])
+                self._clear()
+                for name in ('vacancy_ids', 'salary_from', 'salary_to', 'cities',
+                             'employment', 'term_rows', 'term_ids', 'term_freqs'):
+                    setattr(self, name, data[name])
+        except (OSError, KeyError, ValueError):
+            # Поврежденный или устаревший кэш просто строится заново
+            return False
+        # Журнал мог быть очищен вместе с базой — тогда кэшу доверять нельзя
+        last = self.repo.connection().execute(SQL_LAST_VACANCY_CHANGE).fetchone()[0]
+        if seq > last:
+            return False
+        self.alive = np.ones(len(self.vacancy_ids), dtype=bool)
+        self.rows_by_id = {int(vacancy_id): row
+                           for row, vacancy_id in enumerate(self.vacancy_ids)}
+        self.seq = seq
+        self._apply_changes()
+        return True
+
+    def save(self):
+        """Сохранить кэш векторов, если есть несохраненные изменения"""
+        with self._lock:
+            if self.seq is not None and self._unsaved:
+                self._save()
+
+    # Оценка
+
+    def _weights(self):
+        # idf зависит от всего корпуса, поэтому пересчитывается, только когда
+        # изменилась заметная доля строк
+        if self._idf is None or self._changed_rows > IDF_REFRESH_RATIO * len(self.alive):
+            entries = self.alive[self.term_rows]
+            df = np.bincount(self.term_ids[entries], minlength=HASH_BUCKETS)
+            documents = self.alive.sum()
+            self._idf = (np.log((1 + documents) / (1 + df)) + 1).astype(np.float32)
+            self._norms = np.zeros(0, dtype=np.float32)
+            self._changed_rows = 0
+        if len(self._norms) < len(self.alive):
+            # Строки добавляются в конец, и term_rows не убывает, поэтому
+            # записи новых строк — хвост массивов термов
+            first_row = len(self._norms)
+            start = np.searchsorted(self.term_rows, first_row)
+            weights = self.term_freqs[start:] * self._idf[self.term_ids[start:]]
+            norms = np.sqrt(np.bincount(self.term_rows[start:] - first_row,
+                                        weights=weights * weights,
+                                        minlength=len(self.alive) - first_row))
+            norms[norms == 0] = 1
+            self._norms = np.concatenate([self._norms, norms.astype(np.float32)])
+        return self._idf, self._norms
+
+    def score(self, skills, salary, city, employment_types):
+        """Оценки всех строк для резюме (неактивные строки получают -1)"""
+        idf, norms = self._weights()
+        scores = np.zeros(len(self.alive), dtype=np.float32)
+
+        # Косинусная близость TF-IDF навыков резюме и требований вакансии
+        counts = {}
+        for term in term_ids(skills):
+            counts[term] = counts.get(term, 0) + 1
+        if counts:
+            query_terms = np.array(list(counts), dtype=np.int32)
+            query_weights = np.array(list(counts.values()), dtype=np.float32)
+            query_weights *= idf[query_terms]
+            query_weights /= np.linalg.norm(query_weights) or 1
+            # Таблица «терм -> вес запроса * idf» заменяет поиск термов
+            # запроса среди всех записей одним обращением по индексу
+            lookup = np.zeros(HASH_BUCKETS, dtype=np.float32)
+            lookup[query_terms] = query_weights * idf[query_terms]
+            entry_weights = lookup[self.term_ids]
+            entries = np.flatnonzero(entry_weights)
+            contribution = self.term_freqs[entries] * entry_weights[entries]
+            similarity = np.bincount(self.term_rows[entries], weights=contribution,
+                                     minlength=len(scores)).astype(np.float32)
+            scores += RECOMMEND_WEIGHTS['skills'] * similarity / norms
+
+        # Зарплата: 1, если верхняя граница вакансии не ниже ожиданий,
+        # иначе убывает с долей ожиданий, которую вакансия покрывает
+        if salary:
+            upper = np.where(self.salary_to > 0, self.salary_to, self.salary_from)
+            fit = np.clip(upper / salary, 0, 1) ** 2
+            fit[upper == 0] = 0.5
+            scores += RECOMMEND_WEIGHTS['salary'] * fit
+        else:
+            scores += RECOMMEND_WEIGHTS['salary'] * 0.5
+
+        # Город: совпадение с городом соискателя или удаленная работа
+        remote = (self.employment == EMPLOYMENT_CODES['remote']) | \
+                 (self.cities == city_code(REMOTE_CITY))
+        if city:
+            scores += RECOMMEND_WEIGHTS['city'] * ((self.cities == city_code(city)) | remote)
+        else:
+            scores += RECOMMEND_WEIGHTS['city'] * 0.5
+
+        # Тип занятости: доля откликов соискателя на вакансии этого типа
+        total = sum(employment_types.values())
+        if total:
+            share = np.zeros(len(EMPLOYMENT_CODES) + 1, dtype=np.float32)
+            for code_name, count in employment_types.items():
+                share[EMPLOYMENT_CODES.get(code_name, 0)] += count / total
+            scores += RECOMMEND_WEIGHTS['employment'] * share[self.employment] / share.max()
+        else:
+            scores += RECOMMEND_WEIGHTS['employment'] * 0.5
+
+        scores[~self.alive] = -1
+        return scores
+
+    def recommend(self, user_id, limit=50):
+        """id лучших вакансий для активного резюме соискателя (по убыванию).
+
+        Возвращает пустой список, если у соискателя нет активного резюме.
+        """
+        profile = self.repo.get_recommendation_profile(user_id)
+        if profile is None:
+            return []
+        skills, desired_position, salary, city = profile
+        employment_types = self.repo.get_applied_employment_types(user_id)
+
+        self.refresh()
+        with self._lock:
+            scores = self.score(f"{skills or ''} {desired_position or ''}", salary,
+                                city, employment_types)
+            limit = min(limit, int(self.alive.sum()))
+            if limit <= 0:
+                return []
+            top = np.argpartition(-scores, limit - 1)[:limit]
+            # При равной оценке выше более новая вакансия
+            top = top[np.lexsort((-self.vacancy_ids[top], -scores[top]))]
+            return [int(vacancy_id) for vacancy_id in self.vacancy_ids[top]]
+
+    def recommend_vacancies(self, user_id, limit=50):
+        """Строки ленты (как get_vacancy_feed) для рекомендованных вакансий"""
+        return self.repo.get_vacancies_by_ids(self.recommend(user_id, limit))
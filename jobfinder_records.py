@@ -0,0 +1,217 @@
+import sys
+from array import array
+from datetime import datetime
+
+# Значение array('q') вместо отсутствующего числа (NULL): зарплаты или даты
+MISSING = -1
+
+
+def date_key(created_at):
+    """'2024-05-01 12:30:00' -> 20240501123000: число с тем же порядком, что у дат.
+
+    Принимает и ISO-формат ('2024-05-01T12:30:00.123'), доли секунды
+    отбрасываются. Нет даты — MISSING: такие строки старше любых датированных.
+    """
+    if not created_at:
+        return MISSING
+    moment = datetime.fromisoformat(created_at)
+    return int(moment.strftime('%Y%m%d%H%M%S'))
+
+
+def date_text(key):
+    """Обратное к date_key; для MISSING — None"""
+    if key == MISSING:
+        return None
+    text = f"{key:014d}"
+    return f"{text[:4]}-{text[4:6]}-{text[6:8]} {text[8:10]}:{text[10:12]}:{text[12:14]}"
+
+
+def salary_text(salary_from, salary_to):
+    """Вилка зарплаты для карточек; любая граница может быть не указана (None)"""
+    if salary_from is not None and salary_to is not None:
+        return f"💰 {salary_from:,} - {salary_to:,} руб."
+    if salary_from is not None:
+        return f"💰 от {salary_from:,} руб."
+    if salary_to is not None:
+        return f"💰 до {salary_to:,} руб."
+    return "💰 Зарплата не указана"
+
+
+class Vacancy:
+    """Вакансия на экранах: лента, поиск, избранное, вакансии работодателя.
+
+    summary — начало описания: запросы ленты отдают первые 201 символ
+    (карточке нужно 200 и признак, что текст длиннее), полный текст
+    загружается при открытии деталей. highlight и snippet есть только у
+    результатов поиска — заголовок и фрагмент описания с подсветкой.
+    """
+
+    __slots__ = ('id', 'title', 'summary', 'salary_from', 'salary_to', 'city',
+                 'employment_type', 'company_name', 'created_at', 'is_active',
+                 'highlight', 'snippet')
+
+    def __init__(self, vacancy_id, title, summary, salary_from, salary_to, city,
+                 employment_type, company_name, created_at, is_active=True,
+                 highlight=None, snippet=None):
+        self.id = vacancy_id
+        self.title = title
+        self.summary = summary
+        self.salary_from = salary_from
+        self.salary_to = salary_to
+        self.city = city
+        self.employment_type = employment_type
+        self.company_name = company_name
+        self.created_at = created_at
+        self.is_active = is_active
+        self.highlight = highlight
+        self.snippet = snippet
+
+    @classmethod
+    def from_row(cls, row):
+        """Из строки ленты (первые 9 столбцов, за ними может быть курсор)"""
+        return cls(*row[:9])
+
+    @classmethod
+    def from_search_row(cls, row):
+        """Из строки search_vacancies: столбцы ленты, заголовок и фрагмент"""
+        return cls(*row[:9], highlight=row[9], snippet=row[10])
+
+    @classmethod
+    def from_employer_row(cls, row):
+        """Из строки get_employer_vacancies (без описания и компании)"""
+        vacancy_id, title, salary_from, salary_to, city, employment_type, is_active, created_at = row
+        return cls(vacancy_id, title, None, salary_from, salary_to, city,
+                   employment_type, None, created_at, bool(is_active))
+
+    def astuple(self):
+        """Строка в порядке столбцов ленты"""
+        return (self.id, self.title, self.summary, self.salary_from, self.salary_to,
+                self.city, self.employment_type, self.company_name, self.created_at)
+
+    def __repr__(self):
+        return f"Vacancy({self.id}, {self.title!r})"
+
+
+class VacancyColumns:
+    """Большой список вакансий, хранящийся по столбцам.
+
+    id, зарплаты и дата публикации (date_key) лежат в array('q') — 8 байт
+    на значение вместо отдельного объекта, отсутствующие — как MISSING.
+    Города и типы занятости интернируются: их немного, и каждое значение
+    хранится один раз; названия и описания почти все разные.
+    Vacancy создается только при обращении по индексу: виртуализированному
+    списку нужны лишь видимые строки. filter и sort возвращают
+    представления — массив номеров строк над теми же столбцами.
+    """
+
+    NUMBER_COLUMNS = ('id', 'salary_from', 'salary_to', 'created_at')
+    TEXT_COLUMNS = ('title', 'summary', 'city', 'employment_type', 'company_name')
+
+    def __init__(self, rows=(), columns=None, order=None):
+        if columns is None:
+            columns = {name: array('q') for name in self.NUMBER_COLUMNS}
+            columns.update({name: [] for name in self.TEXT_COLUMNS})
+        self.columns = columns
+        # Номера строк представления; None — все строки по порядку
+        self.order = order
+        self.extend(rows)
+
+    def __len__(self):
+        return len(self.order if self.order is not None else self.columns['id'])
+
+    def __getitem__(self, index):
+        row = self.order[index] if self.order is not None else index
+        columns = self.columns
+        salary_from = columns['salary_from'][row]
+        salary_to = columns['salary_to'][row]
+        return Vacancy(columns['id'][row], columns['title'][row], columns['summary'][row],
+                       None if salary_from == MISSING else salary_from,
+                       None if salary_to == MISSING else salary_to,
+                       columns['city'][row], columns['employment_type'][row],
+                       columns['company_name'][row], date_text(columns['created_at'][row]))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, row):
+        """Добавить строку ленты (кортеж из 9 и более столбцов) или Vacancy"""
+        if isinstance(row, Vacancy):
+            row = row.astuple()
+        columns = self.columns
+        if self.order is not None:
+            self.order.append(len(columns['id']))
+        columns['id'].append(row[0])
+        columns['title'].append(row[1])
+        columns['summary'].append(row[2])
+        columns['salary_from'].append(MISSING if row[3] is None else row[3])
+        columns['salary_to'].append(MISSING if row[4] is None else row[4])
+        columns['city'].append(_intern(row[5]))
+        columns['employment_type'].append(_intern(row[6]))
+        columns['company_name'].append(row[7])
+        columns['created_at'].append(date_key(row[8]))
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def positions(self):
+        """Номера строк представления в столбцах"""
+        return self.order if self.order is not None else range(len(self.columns['id']))
+
+    def filter(self, city=None, employment_type=None, salary_from=None, salary_to=None):
+        """Представление со строками, подходящими под фильтры.
+
+        Условия по зарплате те же, что в поиске: верхняя граница вакансии не
+        ниже salary_from, нижняя не выше salary_to.
+        """
+        columns = self.columns
+        rows = self.positions()
+        if city is not None:
+            values = columns['city']
+            rows = [row for row in rows if values[row] == city]
+        if employment_type is not None:
+            values = columns['employment_type']
+            rows = [row for row in rows if values[row] == employment_type]
+        if salary_from is not None:
+            values = columns['salary_to']
+            rows = [row for row in rows if values[row] >= salary_from]
+        if salary_to is not None:
+            values = columns['salary_from']
+            rows = [row for row in rows if values[row] != MISSING and values[row] <= salary_to]
+        return VacancyColumns(columns=columns, order=array('q', rows))
+
+    def without(self, vacancy_id):
+        """Представление без строк вакансии vacancy_id"""
+        ids = self.columns['id']
+        rows = [row for row in self.positions() if ids[row] != vacancy_id]
+        return VacancyColumns(columns=self.columns, order=array('q', rows))
+
+    def sort(self, column, reverse=False):
+        """Представление, упорядоченное по столбцу (при равенстве — по id).
+
+        Строки без значения (None или MISSING) идут в конце при любом
+        направлении, по возрастанию id.
+        """
+        values = self.columns[column]
+        ids = self.columns['id']
+        empty = None if column in self.TEXT_COLUMNS else MISSING
+        present, missing = [], []
+        for row in self.positions():
+            (missing if values[row] == empty else present).append(row)
+        present.sort(key=lambda row: (values[row], ids[row]), reverse=reverse)
+        missing.sort(key=lambda row: ids[row])
+        return VacancyColumns(columns=self.columns, order=array('q', present + missing))
+
+    def memory_size(self):
+        """Примерный объем памяти столбцов в байтах (строки — по разу)"""
+        size = sum(sys.getsizeof(values) for values in self.columns.values())
+        if self.order is not None:
+            size += sys.getsizeof(self.order)
+        strings = {id(value): value for name in self.TEXT_COLUMNS
+                   for value in self.columns[name] if value is not None}
+        return size + sum(sys.getsizeof(value) for value in strings.values())
+
+
+def _intern(value):
+    return sys.intern(value) if value is not None else None
@@ -0,0 +1,465 @@
+import argparse
+import bisect
+import hashlib
+import itertools
+import math
+import random
+import time
+from datetime import datetime, timezone
+
+from jobfinder_db import DB_PATH, JobFinderRepository
+
+# Пароль всех сгенерированных пользователей
+DEMO_PASSWORD = '123'
+DEMO_PASSWORD_HASH = hashlib.sha256(DEMO_PASSWORD.encode()).hexdigest()
+
+# Учетные записи для входа в демонстрационной базе
+DEMO_EMPLOYER_EMAIL = 'employer@test.com'
+DEMO_SEEKER_EMAIL = 'seeker@test.com'
+
+# Город, доля вакансий и соискателей, коэффициент зарплаты относительно Москвы
+CITIES = [
+    ('Москва', 0.34, 1.0),
+    ('Санкт-Петербург', 0.16, 0.9),
+    ('Новосибирск', 0.06, 0.7),
+    ('Екатеринбург', 0.06, 0.72),
+    ('Казань', 0.05, 0.68),
+    ('Нижний Новгород', 0.04, 0.65),
+    ('Ростов-на-Дону', 0.04, 0.62),
+    ('Краснодар', 0.04, 0.63),
+    ('Самара', 0.03, 0.6),
+    ('Удаленно', 0.18, 0.85),
+]
+
+# Должность, доля, медианная зарплата в Москве, описание, навыки
+POSITIONS = [
+    ('Python Developer', 0.10, 200000, "Разработка backend-части веб-приложений",
+     ('Python', 'Django', 'Flask', 'PostgreSQL', 'Docker', 'Redis')),
+    ('Frontend Developer', 0.10, 180000, "Создание пользовательских интерфейсов",
+     ('JavaScript', 'TypeScript', 'React', 'Vue.js', 'CSS', 'Webpack')),
+    ('Backend Developer', 0.08, 210000, "Разработка серверной логики",
+     ('Java', 'Go', 'Node.js', 'PostgreSQL', 'Kafka', 'Docker')),
+    ('Data Analyst', 0.08, 140000, "Анализ данных, построение отчетов",
+     ('SQL', 'Python', 'Excel', 'Power BI', 'Tableau', 'Pandas')),
+    ('Data Scientist', 0.04, 230000, "Построение ML-моделей",
+     ('Python', 'Pandas', 'scikit-learn', 'PyTorch', 'SQL', 'Statistics')),
+    ('QA Engineer', 0.09, 120000, "Тестирование программного обеспечения",
+     ('Selenium', 'Python', 'Postman', 'SQL', 'Jira', 'TestRail')),
+    ('DevOps Engineer', 0.05, 250000, "Настройка и поддержка инфраструктуры",
+     ('Docker', 'Kubernetes', 'AWS', 'Terraform', 'Linux', 'Ansible')),
+    ('Mobile Developer', 0.05, 200000, "Разработка мобильных приложений",
+     ('Kotlin', 'Swift', 'Flutter', 'React Native', 'Android', 'iOS')),
+    ('UX/UI Designer', 0.05, 150000, "Дизайн интерфейсов мобильных и веб-приложений",
+     ('Figma', 'Adobe XD', 'Sketch', 'Photoshop', 'Прототипирование')),
+    ('Project Manager', 0.06, 190000, "Управление IT-проектами",
+     ('Jira', 'Scrum', 'Agile', 'Confluence', 'Kanban')),
+    ('System Administrator', 0.07, 100000, "Администрирование IT-инфраструктуры",
+     ('Linux', 'Windows Server', 'Bash', 'Active Directory', 'Nginx')),
+    ('Marketing Manager', 0.06, 130000, "Разработка и реализация маркетинговых стратегий",
+     ('SMM', 'SEO', 'Google Analytics', 'Яндекс.Директ', 'Копирайтинг')),
+    ('HR Specialist', 0.06, 100000, "Подбор IT-персонала",
+     ('Рекрутинг', 'HeadHunter', 'Собеседования', 'Onboarding', 'Excel')),
+    ('Content Manager', 0.04, 80000, "Создание и редактирование контента",
+     ('Копирайтинг', 'Редактура', 'SMM', 'WordPress', 'Photoshop')),
+    ('1C Developer', 0.07, 170000, "Разработка и сопровождение конфигураций 1С",
+     ('1С', 'SQL', 'БСП', 'Интеграции', 'ERP')),
+]
+
+EMPLOYMENT_WEIGHTS = {'full_time': 0.70, 'hybrid': 0.12, 'remote': 0.10, 'part_time': 0.08}
+
+# Статусы откликов старше недели; более свежие еще не разобраны
+STATUS_WEIGHTS = {'pending': 0.35, 'viewed': 0.28, 'interview': 0.14,
+                  'rejected': 0.19, 'hired': 0.04}
+RECENT_STATUS_WEIGHTS = {'pending': 0.7, 'viewed': 0.25, 'interview': 0.05}
+
+MALE_NAMES = ['Александр', 'Дмитрий', 'Максим', 'Сергей', 'Андрей', 'Алексей',
+              'Артем', 'Илья', 'Кирилл', 'Михаил', 'Никита', 'Иван', 'Егор', 'Павел']
+FEMALE_NAMES = ['Анна', 'Мария', 'Елена', 'Ольга', 'Наталья', 'Екатерина', 'Анастасия',
+                'Татьяна', 'Дарья', 'Юлия', 'Ирина', 'Полина', 'Виктория', 'Ксения']
+# Фамилии в мужской форме; женская образуется добавлением «а»
+LAST_NAMES = ['Иванов', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Петров',
+              'Соколов', 'Михайлов', 'Новиков', 'Федоров', 'Морозов', 'Волков',
+              'Алексеев', 'Лебедев', 'Семенов', 'Егоров', 'Павлов', 'Козлов']
+COMPANY_PREFIXES = ['ООО', 'АО', 'ПАО', 'ГК']
+COMPANY_ROOTS = ['Альфа', 'Вектор', 'Горизонт', 'Сигма', 'Технософт', 'Дата', 'Код',
+                 'Инфо', 'Нева', 'Урал', 'Сибирь', 'Север', 'Лидер', 'Прогресс']
+COMPANY_SUFFIXES = ['Софт', 'Системс', 'Лаб', 'Тех', 'Групп', 'Digital', 'Solutions']
+EDUCATION = ['Высшее техническое', 'Высшее', 'Неоконченное высшее',
+             'Среднее специальное', 'Магистратура']
+
+# Период, за который создаются записи, в днях до даты end
+HISTORY_DAYS = 365
+
+SQL_SEED_USER = """
+    INSERT INTO users (id, email, password_hash, user_type, first_name, last_name,
+                       phone, city, company_name, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_SEED_RESUME = """
+    INSERT INTO resumes (id, user_id, title, desired_position, salary_expectation,
+                         experience, education, skills, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_SEED_VACANCY = """
+    INSERT INTO vacancies (id, employer_id, title, description, requirements,
+                           salary_from, salary_to, employment_type, city,
+                           is_active, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_SEED_APPLICATION = """
+    INSERT INTO applications (resume_id, vacancy_id, cover_letter, status, applied_at)
+    VALUES (?, ?, ?, ?, ?)
+"""
+
+# На время загрузки триггеры снимаются; то, что они поддерживают, затем
+# заполняется одним запросом для всех новых строк
+SQL_TABLE_TRIGGERS = """
+    SELECT name, sql FROM sqlite_master
+    WHERE type = 'trigger'
+      AND tbl_name IN ('users', 'resumes', 'vacancies', 'applications')
+"""
+
+SQL_SEED_VACANCIES_FTS = """
+    INSERT INTO vacancies_fts (rowid, title, description, requirements)
+    SELECT id, title, description, requirements FROM vacancies WHERE id >= ?
+"""
+
+SQL_SEED_RESUMES_FTS = """
+    INSERT INTO resumes_fts (rowid, skills, desired_position, experience)
+    SELECT id, skills, desired_position, experience FROM resumes WHERE id >= ?
+"""
+
+# Сгенерированные работодатели новые, поэтому их счетчики только добавляются
+SQL_SEED_EMPLOYER_STATS = """
+    INSERT INTO employer_stats (employer_id, vacancies_total, vacancies_active,
+                                applications_total, applications_pending,
+                                applications_viewed, applications_interview,
+                                applications_rejected, applications_hired)
+    SELECT v.employer_id, v.total, v.active,
+           COALESCE(a.total, 0), COALESCE(a.pending, 0), COALESCE(a.viewed, 0),
+           COALESCE(a.interview, 0), COALESCE(a.rejected, 0), COALESCE(a.hired, 0)
+    FROM (SELECT employer_id, COUNT(*) AS total, SUM(is_active = 1) AS active
+          FROM vacancies WHERE employer_id >= ?1 GROUP BY employer_id) v
+    LEFT JOIN (SELECT v.employer_id, COUNT(*) AS total,
+                      SUM(a.status = 'pending') AS pending,
+                      SUM(a.status = 'viewed') AS viewed,
+                      SUM(a.status = 'interview') AS interview,
+                      SUM(a.status = 'rejected') AS rejected,
+                      SUM(a.status = 'hired') AS hired
+               FROM vacancies v JOIN applications a ON a.vacancy_id = v.id
+               WHERE v.employer_id >= ?1
+               GROUP BY v.employer_id) a ON a.employer_id = v.employer_id
+"""
+
+# Журнал изменений для кэша рекомендаций: новые вакансии после seq
+SQL_SEED_VACANCY_CHANGES = """
+    INSERT INTO vacancy_changes (vacancy_id, seq)
+    SELECT id, ?2 + id - ?1 + 1 FROM vacancies WHERE id >= ?1
+"""
+
+
+def _distribution(weights):
+    """(значения, накопленные доли) для _pick"""
+    total = sum(weights.values())
+    return list(weights), list(itertools.accumulate(w / total for w in weights.values()))
+
+
+def _pick(rnd, distribution):
+    # То же, что rnd.choices(..., cum_weights)[0], но без лишних списков
+    values, cumulative = distribution
+    return values[min(bisect.bisect(cumulative, rnd.random()), len(values) - 1)]
+
+
+class SyntheticData:
+    """Детерминированный генератор строк: одинаковый seed и размеры дают
+    одинаковые данные (даты отсчитываются от end).
+
+    Идентификаторы назначаются явно, начиная с first_ids, поэтому внешние
+    ключи известны без обращения к базе.
+    """
+
+    def __init__(self, employers, seekers, vacancies, applications, first_ids,
+                 seed=42, end=None, demo_accounts=False):
+        self.employers = employers
+        self.seekers = seekers
+        self.vacancies = vacancies
+        self.applications = applications
+        self.first_user, self.first_resume, self.first_vacancy = first_ids
+        self.seed = seed
+        # Даты в UTC, как CURRENT_TIMESTAMP у строк, созданных приложением
+        end = end or datetime.now(timezone.utc).date()
+        self.end = int(datetime.combine(end, datetime.min.time(), timezone.utc).timestamp())
+        self.start = self.end - HISTORY_DAYS * 86400
+        self.demo_accounts = demo_accounts
+
+        self.cities = _distribution({city: share for city, share, _ in CITIES})
+        self.city_salary = {city: factor for city, _, factor in CITIES}
+        self.positions = _distribution({position: position[1] for position in POSITIONS})
+        self.employment = _distribution(EMPLOYMENT_WEIGHTS)
+        self.statuses = _distribution(STATUS_WEIGHTS)
+        self.recent_statuses = _distribution(RECENT_STATUS_WEIGHTS)
+
+    def _random(self, table):
+        # Отдельный поток случайных чисел на таблицу: строки одной таблицы не
+        # зависят от размеров других
+        return random.Random(f'{self.seed}:{table}')
+
+    def _timestamp(self, seconds):
+        return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(seconds))
+
+    def _city(self, rnd):
+        return _pick(rnd, self.cities)
+
+    def _position(self, rnd):
+        return _pick(rnd, self.positions)
+
+    def _salary(self, rnd, median, city):
+        # Логнормальное распределение вокруг медианы с поправкой на город
+        value = rnd.lognormvariate(math.log(median * self.city_salary[city]), 0.3)
+        return max(20000, int(value / 5000) * 5000)
+
+    def employer_id(self, index):
+        return self.first_user + index
+
+    def seeker_id(self, index):
+        return self.first_user + self.employers + index
+
+    def vacancy_created(self, index):
+        # Вакансии создаются равномерно по периоду в порядке id
+        return self.start + (self.end - self.start) * index // max(1, self.vacancies)
+
+    def employer_rows(self):
+        rnd = self._random('employers')
+        for index in range(self.employers):
+            user_id = self.employer_id(index)
+            email = (DEMO_EMPLOYER_EMAIL if self.demo_accounts and index == 0
+                     else f'employer{user_id}@example.com')
+            city = self._city(rnd)
+            if city == 'Удаленно':
+                city = 'Москва'
+            company = (f'{rnd.choice(COMPANY_PREFIXES)} «{rnd.choice(COMPANY_ROOTS)}'
+                       f'{rnd.choice(COMPANY_SUFFIXES)}»')
+            yield (user_id, email, DEMO_PASSWORD_HASH, 'employer', None, None,
+                   f'+7 495 {rnd.randrange(10 ** 7):07d}', city, company,
+                   self._timestamp(rnd.randrange(self.start, self.end)))
+
+    def seeker_rows(self):
+        rnd = self._random('seekers')
+        for index in range(self.seekers):
+            user_id = self.seeker_id(index)
+            email = (DEMO_SEEKER_EMAIL if self.demo_accounts and index == 0
+                     else f'seeker{user_id}@example.com')
+            if rnd.random() < 0.5:
+                first_name, last_name = rnd.choice(MALE_NAMES), rnd.choice(LAST_NAMES)
+            else:
+                first_name, last_name = rnd.choice(FEMALE_NAMES), rnd.choice(LAST_NAMES) + 'а'
+            yield (user_id, email, DEMO_PASSWORD_HASH, 'seeker', first_name, last_name,
+                   f'+7 9{rnd.randrange(10 ** 9):09d}', self._city(rnd), None,
+                   self._timestamp(rnd.randrange(self.start, self.end)))
+
+    def resume_rows(self):
+        # Одно резюме на соискателя
+        rnd = self._random('resumes')
+        for index in range(self.seekers):
+            title, _, median, _, skills = self._position(rnd)
+            years = min(20, int(rnd.expovariate(1 / 4)))
+            city = self._city(rnd)
+            salary = self._salary(rnd, median * (0.7 + 0.05 * min(years, 10)), city)
+            chosen = rnd.sample(skills, rnd.randint(min(3, len(skills)), len(skills)))
+            yield (self.first_resume + index, self.seeker_id(index), title, title, salary,
+                   f'Опыт работы {years} лет' if years else 'Без опыта',
+                   rnd.choice(EDUCATION), ', '.join(chosen),
+                   self._timestamp(rnd.randrange(self.start, self.end)))
+
+    def vacancy_rows(self):
+        rnd = self._random('vacancies')
+        for index in range(self.vacancies):
+            title, _, median, description, skills = self._position(rnd)
+            # Крупные работодатели публикуют большую часть вакансий
+            employer = self.employer_id(int(self.employers * rnd.random() ** 2))
+            city = self._city(rnd)
+            employment = ('remote' if city == 'Удаленно' else
+                          _pick(rnd, self.employment))
+            salary_from = self._salary(rnd, median * 0.85, city)
+            salary_to = int(salary_from * rnd.uniform(1.2, 1.7) / 5000) * 5000
+            chosen = rnd.sample(skills, rnd.randint(min(2, len(skills)), min(4, len(skills))))
+            years = rnd.choice((1, 1, 2, 3, 3, 5))
+            created = self.vacancy_created(index)
+            # Старые вакансии чаще закрыты
+            age = (self.end - created) / (self.end - self.start)
+            is_active = 0 if rnd.random() < 0.3 * age else 1
+            yield (self.first_vacancy + index, employer, title, description,
+                   f"{', '.join(chosen)}, опыт от {years} лет",
+                   salary_from, salary_to, employment, city, is_active,
+                   self._timestamp(created))
+
+    def application_counts(self, rnd):
+        """Число откликов каждого резюме; в сумме ровно applications"""
+        cap = self.vacancies
+        if not self.seekers or not cap:
+            return [0] * self.seekers
+        mean = self.applications / self.seekers
+        counts = [min(cap, int(rnd.expovariate(1 / mean) + 0.5)) if mean else 0
+                  for _ in range(self.seekers)]
+        difference = min(self.applications, self.seekers * cap) - sum(counts)
+        step = 1 if difference > 0 else -1
+        while difference:
+            index = rnd.randrange(self.seekers)
+            if 0 <= counts[index] + step <= cap:
+                counts[index] += step
+                difference -= step
+        return counts
+
+    def application_rows(self):
+        rnd = self._random('applications')
+        for index, count in enumerate(self.application_counts(rnd)):
+            resume_id = self.first_resume + index
+            if count > self.vacancies // 2:
+                # Выборка без возвращения: отбор со смещением к свежим вакансиям
+                # почти не находил бы новых, когда выбрано почти все
+                chosen = rnd.sample(range(self.vacancies), count)
+            else:
+                # Свежие вакансии собирают больше откликов. Свободна хотя бы
+                # половина вакансий, а с ней не меньше трети вероятности,
+                # поэтому отбор заканчивается в среднем за три попытки на отклик
+                chosen = set()
+                while len(chosen) < count:
+                    chosen.add(int(self.vacancies * (1 - rnd.random() ** 1.5)))
+            for vacancy in chosen:
+                created = self.vacancy_created(vacancy)
+                applied = created + int(rnd.random() * min(30 * 86400, self.end - created))
+                status = _pick(rnd, self.recent_statuses if self.end - applied < 7 * 86400
+                               else self.statuses)
+                letter = (None if rnd.random() < 0.6 else
+                          'Здравствуйте! Заинтересовала ваша вакансия, готов обсудить детали.')
+                yield (resume_id, self.first_vacancy + vacancy, letter, status,
+                       self._timestamp(applied))
+
+
+def dataset_sizes(vacancies, applications=None, seekers=None, employers=None):
+    """Размеры набора по числу вакансий: откликов столько же, соискателей в
+    10 раз меньше, работодателей в 100 раз меньше"""
+    return (employers if employers is not None else max(1, vacancies // 100),
+            seekers if seekers is not None else max(1, vacancies // 10),
+            vacancies,
+            applications if applications is not None else vacancies)
+
+
+def _load(conn, sql, rows, count, batch_size, table, on_progress):
+    done = 0
+    while done < count:
+        size = min(batch_size, count - done)
+        conn.executemany(sql, itertools.islice(rows, size))
+        done += size
+        if on_progress is not None:
+            on_progress(table, done, count)
+
+
+def generate_dataset(repo, vacancies, applications=None, seekers=None, employers=None,
+                     seed=42, end=None, demo_accounts=False, batch_size=200000,
+                     on_progress=None):
+    """Сгенерировать и загрузить синтетические данные, вернуть размеры набора.
+
+    Данные добавляются к существующим. Вся загрузка — одна транзакция
+    BEGIN IMMEDIATE при synchronous = OFF: строки пишутся executemany
+    пачками, триггеры на это время снимаются, а полнотекстовые индексы,
+    счетчики работодателей и журнал изменений вакансий заполняются для
+    новых строк одним запросом перед фиксацией. Другие соединения не видят
+    таблиц без триггеров, а писатели ждут конца загрузки; при ошибке или
+    остановке процесса база остается прежней.
+    """
+    employers, seekers, vacancies, applications = dataset_sizes(
+        vacancies, applications, seekers, employers)
+    conn = repo.connection()
+
+    def next_id(table):
+        return conn.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}").fetchone()[0]
+
+    cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -500000")
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Первые id и номер изменения читаются под блокировкой записи: до
+        # фиксации никто не добавит строк, поэтому все id от первых — наши
+        first_ids = (next_id('users'), next_id('resumes'), next_id('vacancies'))
+        if demo_accounts:
+            # Повторный запуск не должен упасть на уникальности email
+            demo_accounts = not conn.execute(
+                "SELECT 1 FROM users WHERE email IN (?, ?)",
+                (DEMO_EMPLOYER_EMAIL, DEMO_SEEKER_EMAIL)).fetchone()
+        data = SyntheticData(employers, seekers, vacancies, applications, first_ids,
+                             seed, end, demo_accounts)
+        last_change = conn.execute(
+            "SELECT COALESCE(MAX(seq), 0) FROM vacancy_changes").fetchone()[0]
+
+        triggers = conn.execute(SQL_TABLE_TRIGGERS).fetchall()
+        for name, _ in triggers:
+            conn.execute(f"DROP TRIGGER {name}")
+
+        _load(conn, SQL_SEED_USER, data.employer_rows(), employers, batch_size,
+              'employers', on_progress)
+        _load(conn, SQL_SEED_USER, data.seeker_rows(), seekers, batch_size,
+              'seekers', on_progress)
+        _load(conn, SQL_SEED_RESUME, data.resume_rows(), seekers, batch_size,
+              'resumes', on_progress)
+        _load(conn, SQL_SEED_VACANCY, data.vacancy_rows(), vacancies, batch_size,
+              'vacancies', on_progress)
+        _load(conn, SQL_SEED_APPLICATION, data.application_rows(),
+              min(applications, seekers * vacancies), batch_size,
+              'applications', on_progress)
+
+        conn.execute(SQL_SEED_VACANCIES_FTS, (data.first_vacancy,))
+        conn.execute(SQL_SEED_RESUMES_FTS, (data.first_resume,))
+        conn.execute(SQL_SEED_EMPLOYER_STATS, (data.first_user,))
+        conn.execute(SQL_SEED_VACANCY_CHANGES, (data.first_vacancy, last_change))
+        for _, sql in triggers:
+            conn.execute(sql)
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+        repo.mark_changed('users', 'resumes', 'vacancies', 'applications')
+    finally:
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute(f"PRAGMA cache_size = {cache_size}")
+
+    conn.execute("ANALYZE")
+    return {'employers': employers, 'seekers': seekers,
+            'vacancies': vacancies, 'applications': applications}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Синтетические данные для JobFinder")
+    parser.add_argument('db', nargs='?', default=DB_PATH)
+    parser.add_argument('--vacancies', type=int, default=100000)
+    parser.add_argument('--applications', type=int)
+    parser.add_argument('--seekers', type=int)
+    parser.add_argument('--employers', type=int)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--demo-accounts', action='store_true',
+                        help=f"создать {DEMO_EMPLOYER_EMAIL} и {DEMO_SEEKER_EMAIL}")
+    args = parser.parse_args()
+
+    repo = JobFinderRepository(args.db)
+    repo.migrate()
+    started = time.perf_counter()
+
+    def progress(table, done, count):
+        print(f"\r{table}: {done}/{count} ({time.perf_counter() - started:.0f} с)",
+              end='\n' if done == count else '', flush=True)
+
+    sizes = generate_dataset(repo, args.vacancies, args.applications, args.seekers,
+                             args.employers, seed=args.seed,
+                             demo_accounts=args.demo_accounts, on_progress=progress)
+    repo.close()
+    print(f"Готово за {time.perf_counter() - started:.0f} с: {sizes}. "
+          f"Пароль пользователей: {DEMO_PASSWORD}")
+
+
+if __name__ == "__main__":
+    main()
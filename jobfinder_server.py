@@ -0,0 +1,696 @@
+import argparse
+import asyncio
+import collections
+import functools
+import hmac
+import http.client
+import json
+import os
+import random
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from jobfinder_db import DB_PATH, JobFinderRepository
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Ключ доступа к сервису: создается при первом запуске serve и читается
+# тонким клиентом того же пользователя (JOBFINDER_TOKEN — явное значение)
+TOKEN_PATH = os.path.join(os.path.expanduser('~'), '.jobfinder', 'token')
+TOKEN_HEADER = 'X-JobFinder-Token'
+
+# Сервис принимает запросы только на эти имена (защита от DNS rebinding)
+LOOPBACK_HOSTS = {'127.0.0.1', 'localhost', '::1'}
+
+# Сколько последних ключей идемпотентности записей помнит сервис
+IDEMPOTENCY_KEYS = 10000
+
+# Операции сервиса — методы JobFinderRepository. Чтения выполняются пулом
+# потоков параллельно (у каждого потока свое соединение, WAL не блокирует
+# чтение записью), записи — по очереди одним потоком-писателем, поэтому
+# клиенты не конкурируют за блокировку записи SQLite
+READ_METHODS = {
+    'find_user', 'get_seeker_profile', 'get_employer_profile', 'has_vacancies',
+    'count_vacancies', 'schema_version',
+    # Лента и поиск
+    'get_vacancy_feed', 'get_vacancies_by_ids', 'search_vacancies', 'search_resumes',
+    'get_employer_vacancies', 'get_active_resume', 'get_resume_id', 'get_favorite_ids',
+    'get_favorites', 'get_recommendation_profile', 'get_applied_employment_types',
+    'get_search_facets',
+    # Отклики и статистика
+    'get_seeker_applications', 'get_employer_applications', 'get_employer_stats',
+    'stream_seeker_applications', 'stream_employer_applications',
+    'stream_application_export', 'stream_vacancy_export', 'get_seen_mark',
+}
+
+# Чтения-генераторы (пачки строк): ответ передается по частям (chunked) в
+# виде NDJSON — строка {"rows": [...]} на пачку и в конце {"versions": ...}
+# или {"error": ...}, поэтому ни сервис, ни клиент не держат весь результат
+STREAM_METHODS = {name for name in READ_METHODS if name.startswith('stream_')}
+
+WRITE_METHODS = {
+    'create_seeker', 'create_employer', 'create_resume', 'delete_resume',
+    'create_application', 'create_applications', 'set_application_statuses',
+    'add_favorite', 'remove_favorite',
+    # Отметки просмотренного (count_unseen ставит отметку при первом вызове)
+    'mark_seen', 'count_unseen', 'take_unseen',
+}
+
+# Ошибки, которые клиент получает как исключения того же типа
+CLIENT_ERRORS = {'IntegrityError': sqlite3.IntegrityError}
+
+REASONS = {200: 'OK', 400: 'Bad Request', 401: 'Unauthorized', 403: 'Forbidden',
+           404: 'Not Found', 409: 'Conflict', 415: 'Unsupported Media Type',
+           500: 'Internal Server Error'}
+
+
+class ServiceError(Exception):
+    """Ошибка, возвращенная сервисом (HTTP-статус и текст)"""
+
+    def __init__(self, status, message):
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+def load_token(path=TOKEN_PATH, create=False):
+    """Ключ доступа к сервису из JOBFINDER_TOKEN или файла path.
+
+    create=True — создать файл (доступный только владельцу), если его нет.
+    """
+    token = os.environ.get('JOBFINDER_TOKEN')
+    if token:
+        return token
+    try:
+        with open(path, encoding='ascii') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        if not create:
+            raise
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    token = secrets.token_urlsafe(32)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        # Файл создал другой процесс одновременно с нами
+        return load_token(path)
+    with os.fdopen(fd, 'w', encoding='ascii') as f:
+        f.write(token)
+    return token
+
+
+def host_name(value):
+    """Имя хоста из заголовка Host или адреса Origin (без порта и схемы)"""
+    if '://' in value:
+        return urlsplit(value).hostname or ''
+    return urlsplit('//' + value).hostname or ''
+
+
+def encode(payload):
+    # Множества (get_favorite_ids) передаются списками
+    return json.dumps(payload, ensure_ascii=False, default=list).encode('utf-8')
+
+
+class JobFinderService:
+    """HTTP/JSON-сервис над одной базой для многих клиентов.
+
+    POST /api/<метод> с телом {"args": [...], "kwargs": {...}} вызывает
+    метод репозитория и возвращает {"result": ..., "versions": {...}};
+    versions — версии таблиц репозитория сервиса, по ним клиенты узнают,
+    что данные экранов устарели. GET /health — проверка, GET /stats —
+    счетчики сервиса и кэша запросов. Соединения HTTP/1.1 keep-alive.
+
+    Запросы принимаются только с Host на loopback-адрес, без Origin
+    (браузер) и, кроме /health, с ключом token в заголовке TOKEN_HEADER;
+    тело /api — только application/json. Запись с заголовком
+    Idempotency-Key выполняется один раз: повтор с тем же ключом
+    получает результат первого вызова.
+    """
+
+    def __init__(self, repo, token, readers=4, max_queue=1000):
+        self.repo = repo
+        self.token = token
+        self.readers = ThreadPoolExecutor(max_workers=readers,
+                                          thread_name_prefix='jobfinder-read')
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='jobfinder-write')
+        self.max_queue = max_queue
+        self.writes = None
+        self.server = None
+        # Ключ идемпотентности -> future результата записи
+        self.idempotent = collections.OrderedDict()
+        self.counters = {'requests': 0, 'reads': 0, 'writes': 0, 'errors': 0,
+                         'rejected': 0}
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Начать прием соединений; возвращает фактический порт"""
+        self.writes = asyncio.Queue(maxsize=self.max_queue)
+        self._writer_task = asyncio.create_task(self._write_loop())
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """Закрыть сервер и дождаться записей из очереди"""
+        self.server.close()
+        await self.server.wait_closed()
+        await self.writes.join()
+        self._writer_task.cancel()
+        self.readers.shutdown()
+        self.writer.shutdown()
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            call, future = await self.writes.get()
+            try:
+                result = await loop.run_in_executor(self.writer, call)
+            except Exception as error:
+                if not future.cancelled():
+                    future.set_exception(error)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+            finally:
+                self.writes.task_done()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                # Чужой запрос отклоняется до чтения тела, соединение закрывается
+                rejected = self._reject(method, path, headers)
+                if rejected is not None:
+                    self.counters['rejected'] += 1
+                    status, message = rejected
+                    data = encode({'error': message})
+                    writer.write(
+                        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                        f"Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: close\r\n\r\n".encode('latin-1') + data)
+                    await writer.drain()
+                    break
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, data = await self._dispatch(method, path, headers, body)
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                if isinstance(data, bytes):
+                    writer.write(
+                        f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                        f"Content-Type: application/json; charset=utf-8\r\n"
+                        f"Content-Length: {len(data)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                        .encode('latin-1') + data)
+                    await writer.drain()
+                else:
+                    await self._write_chunked(writer, data, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def _reject(self, method, path, headers):
+        # (статус, текст), если запрос не принимается, иначе None
+        if host_name(headers.get('host', '')) not in LOOPBACK_HOSTS:
+            return 403, "Недопустимый Host"
+        if 'origin' in headers:
+            return 403, "Запросы из браузера не принимаются"
+        if path == '/health':
+            return None
+        if not hmac.compare_digest(headers.get(TOKEN_HEADER.lower(), '').encode('utf-8'),
+                                   self.token.encode('utf-8')):
+            return 401, "Нет ключа доступа или ключ неверный"
+        if method == 'POST':
+            content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+            if content_type != 'application/json':
+                return 415, "Тело запроса должно быть application/json"
+        return None
+
+    async def _dispatch(self, method, path, headers, body):
+        self.counters['requests'] += 1
+        if method == 'GET' and path == '/health':
+            return 200, encode({'status': 'ok'})
+        if method == 'GET' and path == '/stats':
+            return 200, encode(self.stats())
+
+        name = path[len('/api/'):] if path.startswith('/api/') else None
+        if method != 'POST' or name not in READ_METHODS | WRITE_METHODS:
+            return 404, encode({'error': f"Нет операции {method} {path}"})
+        try:
+            request = json.loads(body or b'{}')
+            args = list(request.get('args', []))
+            kwargs = dict(request.get('kwargs', {}))
+        except (ValueError, TypeError, AttributeError) as error:
+            return 400, encode({'error': f"Некорректный запрос: {error}"})
+
+        if name in STREAM_METHODS:
+            self.counters['reads'] += 1
+            return 200, self._stream(name, args, kwargs)
+
+        call = functools.partial(self._call, name, args, kwargs)
+        try:
+            if name in WRITE_METHODS:
+                return 200, await self._write(call, headers.get('idempotency-key'))
+            self.counters['reads'] += 1
+            return 200, await asyncio.get_running_loop().run_in_executor(self.readers, call)
+        except Exception as error:
+            self.counters['errors'] += 1
+            error_type = type(error).__name__
+            status = 409 if error_type in CLIENT_ERRORS else 400 if error_type == 'TypeError' else 500
+            return status, encode({'error': str(error), 'type': error_type})
+
+    async def _write(self, call, key):
+        # Повтор записи с известным ключом ждет результат первого вызова
+        future = self.idempotent.get(key) if key else None
+        if future is None:
+            self.counters['writes'] += 1
+            future = asyncio.get_running_loop().create_future()
+            if key:
+                self.idempotent[key] = future
+                if len(self.idempotent) > IDEMPOTENCY_KEYS:
+                    self.idempotent.popitem(last=False)
+            await self.writes.put((call, future))
+        # shield: отключение одного клиента не отменяет общий результат
+        return await asyncio.shield(future)
+
+    def _call(self, name, args, kwargs):
+        # Выполняется в потоке пула; JSON тоже кодируется здесь, а не в цикле
+        # событий, чтобы большие ответы не задерживали остальных клиентов
+        result = getattr(self.repo, name)(*args, **kwargs)
+        return encode({'result': result, 'versions': self.repo.version_map()})
+
+    async def _stream(self, name, args, kwargs):
+        # Курсор генератора принадлежит соединению потока, поэтому весь
+        # генератор перебирается в одном отдельном потоке; следующая пачка
+        # читается, только когда предыдущая отправлена клиенту
+        loop = asyncio.get_running_loop()
+        thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='jobfinder-stream')
+        batches = None
+        try:
+            batches = await loop.run_in_executor(
+                thread, lambda: iter(getattr(self.repo, name)(*args, **kwargs)))
+            while True:
+                line = await loop.run_in_executor(thread, self._next_line, batches)
+                if line is None:
+                    break
+                yield line
+            yield encode({'versions': self.repo.version_map()}) + b'\n'
+        except Exception as error:
+            self.counters['errors'] += 1
+            yield encode({'error': str(error), 'type': type(error).__name__}) + b'\n'
+        finally:
+            await loop.run_in_executor(thread, self._finish_stream, batches)
+            thread.shutdown(wait=False)
+
+    @staticmethod
+    def _next_line(batches):
+        batch = next(batches, None)
+        return None if batch is None else encode({'rows': batch}) + b'\n'
+
+    def _finish_stream(self, batches):
+        if batches is not None:
+            batches.close()
+        self.repo.release()
+
+    async def _write_chunked(self, writer, lines, keep_alive):
+        writer.write(
+            f"HTTP/1.1 200 OK\r\n"
+            f"Content-Type: application/x-ndjson; charset=utf-8\r\n"
+            f"Transfer-Encoding: chunked\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            .encode('latin-1'))
+        try:
+            async for line in lines:
+                writer.write(f"{len(line):X}\r\n".encode('latin-1') + line + b"\r\n")
+                await writer.drain()
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            # Клиент мог отключиться посреди ответа — генератор закрывается сразу
+            await lines.aclose()
+
+    def stats(self):
+        """Счетчики запросов, длина очереди записи и статистика кэша"""
+        return {**self.counters,
+                'write_queue': self.writes.qsize() if self.writes is not None else 0,
+                'cache': self.repo.cache.stats()}
+
+
+class LoopbackServer:
+    """Сервис в отдельном потоке на свободном порту (для проверок и замеров)"""
+
+    def __init__(self, db_path, readers=4, host=DEFAULT_HOST, port=0):
+        self.repo = JobFinderRepository(db_path)
+        self.repo.migrate()
+        # Ключ только для этого процесса
+        self.token = secrets.token_urlsafe(32)
+        self.service = JobFinderService(self.repo, self.token, readers)
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.port = self.loop.run_until_complete(self.service.start(host, port))
+            started.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, name='jobfinder-service', daemon=True)
+        self.thread.start()
+        started.wait()
+        self.url = f"http://{host}:{self.port}"
+
+    def stop(self):
+        asyncio.run_coroutine_threadsafe(self.service.stop(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.repo.close()
+
+
+class RemoteRepository:
+    """Репозиторий тонкого клиента: те же методы, что у JobFinderRepository
+    (READ_METHODS и WRITE_METHODS), вызываются в сервисе по HTTP.
+
+    Как и у JobFinderRepository, у каждого потока свое соединение
+    (keep-alive). table_versions возвращает версии таблиц сервиса из
+    последнего ответа, поэтому экраны видят и записи других клиентов.
+    token — ключ доступа (по умолчанию load_token()).
+    """
+
+    db_path = None
+
+    def __init__(self, url, token=None, timeout=30, tracer=None):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or DEFAULT_PORT
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json',
+                        TOKEN_HEADER: token or load_token()}
+        self._local = threading.local()
+        self._versions = {}
+        if tracer is not None:
+            from jobfinder_trace import count_rows
+            tracer.instrument(self, sorted(READ_METHODS | WRITE_METHODS), 'rpc', count_rows)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port,
+                                                                 timeout=self.timeout)
+        return conn
+
+    def call(self, name, *args, **kwargs):
+        """Вызвать операцию сервиса name"""
+        body = json.dumps({'args': args, 'kwargs': kwargs}, ensure_ascii=False).encode('utf-8')
+        headers = self.headers
+        if name in WRITE_METHODS:
+            # Сервис выполнит запись один раз, даже если ответ потерялся и
+            # запрос будет повторен
+            headers = {**headers, 'Idempotency-Key': uuid.uuid4().hex}
+        conn = self._connection()
+        try:
+            conn.request('POST', f'/api/{name}', body, headers)
+            response = conn.getresponse()
+        except (ConnectionError, http.client.HTTPException):
+            # Сервис закрыл простаивающее соединение — повторяем один раз
+            conn.close()
+            conn.request('POST', f'/api/{name}', body, headers)
+            response = conn.getresponse()
+        payload = json.loads(response.read())
+        if response.status != 200:
+            error = CLIENT_ERRORS.get(payload.get('type'))
+            if error is not None:
+                raise error(payload['error'])
+            raise ServiceError(response.status, payload.get('error'))
+        self._versions = payload['versions']
+        return payload['result']
+
+    def stream(self, name, *args, **kwargs):
+        """Вызвать потоковую операцию name: генератор пачек строк.
+
+        Пачки читаются по мере прихода по отдельному соединению, которое
+        закрывается, когда генератор исчерпан или закрыт.
+        """
+        body = json.dumps({'args': args, 'kwargs': kwargs}, ensure_ascii=False).encode('utf-8')
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            conn.request('POST', f'/api/{name}', body, self.headers)
+            response = conn.getresponse()
+            if response.status != 200:
+                raise ServiceError(response.status, json.loads(response.read()).get('error'))
+            for line in response:
+                message = json.loads(line)
+                if 'rows' in message:
+                    yield message['rows']
+                elif 'error' in message:
+                    error = CLIENT_ERRORS.get(message.get('type'))
+                    if error is not None:
+                        raise error(message['error'])
+                    raise ServiceError(400 if message.get('type') == 'TypeError' else 500,
+                                       message['error'])
+                else:
+                    self._versions = message['versions']
+        finally:
+            conn.close()
+
+    def table_versions(self, tables):
+        versions = self._versions
+        return tuple(versions.get(table, 0) for table in tables)
+
+    def get_favorite_ids(self, user_id):
+        return set(self.call('get_favorite_ids', user_id))
+
+    def set_application_statuses(self, employer_id, expected, status):
+        # Ключи JSON-объектов — строки, поэтому пары передаются списком
+        updated, rejected = self.call('set_application_statuses', employer_id,
+                                      list(expected.items()), status)
+        return updated, {int(app_id): tuple(reason)
+                         for app_id, reason in rejected.items()}
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # У тонкого клиента соединение потока — HTTP-соединение с сервисом
+    release = close
+
+
+def _remote_method(name):
+    if name in STREAM_METHODS:
+        def method(self, *args, **kwargs):
+            return self.stream(name, *args, **kwargs)
+    else:
+        def method(self, *args, **kwargs):
+            return self.call(name, *args, **kwargs)
+    method.__name__ = name
+    return method
+
+
+for _name in sorted(READ_METHODS | WRITE_METHODS):
+    if not hasattr(RemoteRepository, _name):
+        setattr(RemoteRepository, _name, _remote_method(_name))
+
+
+def load_apply(repo, rnd, bounds):
+    """Отклик со случайного резюме на три случайные вакансии; возвращает
+    число созданных откликов"""
+    return len(repo.create_applications(
+        rnd.randint(*bounds['resumes']),
+        [rnd.randint(*bounds['vacancies']) for _ in range(3)], LOAD_COVER_LETTER))
+
+
+# Нагрузка: операция, доля запросов и (repo, random, bounds) -> результат
+LOAD_OPERATIONS = [
+    ('feed', 0.30, lambda repo, rnd, b: repo.get_vacancy_feed(None, 20)),
+    ('search', 0.25, lambda repo, rnd, b: repo.search_vacancies(
+        rnd.choice(('python', 'менеджер', 'аналитик')), rnd.choice(b['cities']))),
+    ('applications', 0.15, lambda repo, rnd, b: repo.get_seeker_applications(
+        rnd.randint(*b['seekers']))),
+    ('statistics', 0.10, lambda repo, rnd, b: repo.get_employer_stats(
+        rnd.randint(*b['employers']))),
+    ('apply', 0.20, load_apply),
+]
+
+# Сопроводительное письмо откликов нагрузочного теста. Если сервис запущен
+# тестом (без --url), после теста эти отклики удаляются
+LOAD_COVER_LETTER = 'Load test'
+
+
+def run_load(url, bounds, clients=20, requests=100, seed=1, token=None):
+    """Нагрузочный клиент: clients потоков по requests запросов.
+
+    Возвращает задержки по операциям (jobfinder_bench.summarize), общее
+    число запросов в секунду, число созданных откликов (applied) и
+    ошибки по типам.
+    """
+    from jobfinder_bench import summarize
+
+    names = [name for name, _, _ in LOAD_OPERATIONS]
+    weights = [share for _, share, _ in LOAD_OPERATIONS]
+    operations = {name: operation for name, _, operation in LOAD_OPERATIONS}
+    latencies = {name: [] for name in names}
+    errors = {}
+    applied = []
+    lock = threading.Lock()
+
+    def client(number):
+        repo = RemoteRepository(url, token)
+        rnd = random.Random(seed * 1000 + number)
+        for _ in range(requests):
+            name = rnd.choices(names, weights)[0]
+            started = time.perf_counter()
+            try:
+                result = operations[name](repo, rnd, bounds)
+            except Exception as error:
+                with lock:
+                    key = f"{name}: {type(error).__name__}"
+                    errors[key] = errors.get(key, 0) + 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies[name].append(elapsed)
+                if name == 'apply':
+                    applied.append(result)
+        repo.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(number,)) for number in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'clients': clients,
+        'requests': clients * requests,
+        'seconds': round(elapsed, 2),
+        'requests_per_s': round(clients * requests / elapsed),
+        'operations': {name: summarize(values, len(values))
+                       for name, values in latencies.items() if values},
+        'applied': sum(applied),
+        'errors': errors,
+    }
+
+
+def load_bounds(db_path):
+    """Диапазоны id и города набора данных для нагрузки"""
+    from jobfinder_bench import dataset_bounds
+
+    conn = sqlite3.connect(db_path)
+    try:
+        bounds = dataset_bounds(conn)
+        bounds['cities'] = [row[0] for row in conn.execute(
+            "SELECT DISTINCT city FROM vacancies WHERE city IS NOT NULL LIMIT 20")]
+    finally:
+        conn.close()
+    return bounds
+
+
+def last_application_id(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COALESCE(MAX(id), 0) FROM applications").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def serve(db_path, host, port, readers):
+    """Запустить сервис и работать до Ctrl+C"""
+    repo = JobFinderRepository(db_path)
+    repo.migrate()
+    service = JobFinderService(repo, load_token(create=True), readers)
+
+    async def run():
+        actual_port = await service.start(host, port)
+        print(f"JobFinder: http://{host}:{actual_port} (база {db_path}, "
+              f"ключ доступа в {TOKEN_PATH})", flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await service.stop()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        repo.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервис JobFinder на localhost")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = commands.add_parser('serve', help="запустить сервис")
+    serve_parser.add_argument('db', nargs='?', default=DB_PATH)
+    serve_parser.add_argument('--host', default=DEFAULT_HOST)
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--readers', type=int, default=4,
+                              help="потоков чтения")
+
+    load_parser = commands.add_parser(
+        'load', help="нагрузочный тест (без --url — на сервисе в этом процессе)")
+    load_parser.add_argument('db', nargs='?', default=DB_PATH,
+                             help="база сервиса (из нее берутся диапазоны id)")
+    load_parser.add_argument('--url', help="адрес запущенного сервиса")
+    load_parser.add_argument('--clients', type=int, default=20)
+    load_parser.add_argument('--requests', type=int, default=100,
+                             help="запросов на клиента")
+    load_parser.add_argument('--readers', type=int, default=4)
+    load_parser.add_argument('--seed', type=int, default=1)
+    load_parser.add_argument('--out', help="записать результаты в JSON")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.db, args.host, args.port, args.readers)
+        return
+
+    bounds = load_bounds(args.db)
+    loopback = None if args.url else LoopbackServer(args.db, args.readers)
+    url = args.url or loopback.url
+    token = None if args.url else loopback.token
+    last_id = last_application_id(args.db)
+    try:
+        report = run_load(url, bounds, args.clients, args.requests, args.seed, token)
+    finally:
+        if loopback is not None:
+            loopback.stop()
+            # Отклики теста удаляются, если сервис был запущен здесь
+            with sqlite3.connect(args.db) as conn:
+                conn.execute("DELETE FROM applications WHERE id > ? AND cover_letter = ?",
+                             (last_id, LOAD_COVER_LETTER))
+
+    print(f"{report['requests']} запросов, {report['clients']} клиентов: "
+          f"{report['seconds']} с, {report['requests_per_s']} запросов/с")
+    for name, stats in report['operations'].items():
+        print(f"  {name:14} p50 {stats['p50_ms']:9.3f} мс  p95 {stats['p95_ms']:9.3f} мс  "
+              f"p99 {stats['p99_ms']:9.3f} мс")
+    for name, count in report['errors'].items():
+        print(f"  ошибка {name}: {count}")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Kurs rab PI.py')
+
+# Допустимое время до первого кадра, мс (как STARTUP_BUDGET_MS приложения)
+DEFAULT_BUDGET_MS = 500
+
+# Строка -X importtime: "import time: self | cumulative | module"
+IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(text):
+    """Модули верхнего уровня и их суммарное время импорта, мс"""
+    modules = {}
+    for line in text.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:
+            modules[match.group(4)] = int(match.group(2)) / 1000
+    return modules
+
+
+def run_once(app_args):
+    """Один запуск приложения с --startup-benchmark: (замеры, время импорта)"""
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', APP_PATH, '--startup-benchmark', *app_args],
+        capture_output=True, text=True, cwd=os.path.dirname(APP_PATH))
+    lines = [line for line in completed.stdout.splitlines() if line.startswith('{')]
+    if not lines:
+        raise RuntimeError(f"Приложение не вывело замеров (код {completed.returncode}):\n"
+                           f"{completed.stderr[-2000:]}")
+    return json.loads(lines[-1]), parse_importtime(completed.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Замер запуска JobFinder: время до первого кадра и импорты "
+                    "(нужен дисплей)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_MS,
+                        help="допустимая медиана первого кадра, мс")
+    parser.add_argument('--top', type=int, default=10,
+                        help="сколько самых долгих импортов показать")
+    parser.add_argument('--out', help="записать результаты в JSON")
+    parser.add_argument('app_args', nargs=argparse.REMAINDER,
+                        help="аргументы приложения (например, --server URL)")
+    args = parser.parse_args()
+
+    runs = [run_once(args.app_args) for _ in range(args.runs)]
+    names = [name for name in runs[0][0] if name != 'modules_before_first_frame']
+    medians = {name: statistics.median(times[name] for times, _ in runs) for name in names}
+    early = sorted({name for times, _ in runs for name in times['modules_before_first_frame']})
+    imports = runs[-1][1]
+
+    for name, value in medians.items():
+        print(f"{name:14} {value:9.1f} мс (медиана {args.runs} запусков)")
+    print("Самые долгие импорты (последний запуск):")
+    for name, value in sorted(imports.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:28} {value:9.1f} мс")
+    if early:
+        print(f"До первого кадра загружены модули приложения: {', '.join(early)}")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump({'runs': [times for times, _ in runs], 'median_ms': medians,
+                       'imports_ms': imports}, f, ensure_ascii=False, indent=2)
+
+    if medians['first_frame'] > args.budget or early:
+        print(f"Первый кадр медленнее {args.budget} мс или загружает модули приложения",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
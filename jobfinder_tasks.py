@@ -0,0 +1,92 @@
+import queue
+
+
+class Task:
+    """Фоновая задача: интерфейс совместим с concurrent.futures.Future"""
+
+    def __init__(self, future, generation, on_success=None, on_error=None):
+        self.future = future
+        self.generation = generation
+        self.on_success = on_success
+        self.on_error = on_error
+        self.cancelled = False
+
+    def done(self):
+        return self.future.done()
+
+    def result(self):
+        return self.future.result()
+
+    def cancel(self):
+        """Отменить задачу; ее результат не будет доставлен"""
+        self.cancelled = True
+        self.future.cancel()
+
+
+class BackgroundExecutor:
+    """Пул потоков для запросов к базе вне главного цикла Tk.
+
+    Результаты доставляются в поток интерфейса опросом очереди через
+    root.after, поэтому обработчики on_success/on_error могут работать с
+    виджетами. cancel_all() вызывается при смене экрана: задачи, созданные до
+    этого, считаются устаревшими, и их результаты отбрасываются.
+    Пул (и concurrent.futures) создается при первой задаче, чтобы не
+    задерживать запуск приложения.
+    """
+
+    def __init__(self, root, max_workers=4, poll_interval=20):
+        self.root = root
+        self.poll_interval = poll_interval
+        self.max_workers = max_workers
+        self._pool = None
+        self._finished = queue.Queue()
+        self._pending = set()
+        self._generation = 0
+        self._polling = False
+
+    def submit(self, fn, *args, on_success=None, on_error=None):
+        """Выполнить fn(*args) в фоне (вызывать из потока интерфейса)"""
+        if self._pool is None:
+            from concurrent.futures import ThreadPoolExecutor
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix='jobfinder-db')
+        future = self._pool.submit(fn, *args)
+        task = Task(future, self._generation, on_success, on_error)
+        self._pending.add(task)
+        future.add_done_callback(lambda f: self._finished.put(task))
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_interval, self._poll)
+        return task
+
+    def cancel_all(self):
+        """Отменить все текущие задачи и отбросить их результаты"""
+        self._generation += 1
+        for task in self._pending:
+            task.cancel()
+
+    def shutdown(self):
+        """Остановить пул, не дожидаясь незапущенных задач"""
+        self.cancel_all()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        while True:
+            try:
+                task = self._finished.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.discard(task)
+            if task.cancelled or task.generation != self._generation:
+                continue
+            if task.future.exception() is not None:
+                if task.on_error is not None:
+                    task.on_error(task.future.exception())
+            elif task.on_success is not None:
+                task.on_success(task.future.result())
+
+        if self._pending:
+            self.root.after(self.poll_interval, self._poll)
+        else:
+            self._polling = False
@@ -0,0 +1,144 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Сколько SQL-выражений запоминать в одном замере
+MAX_STATEMENTS = 20
+
+
+class Tracer:
+    """Журнал замеров для режима профилирования.
+
+    Замер (span) — имя, категория ('sql', 'screen', 'tk'), поток, начало и
+    длительность и произвольные аргументы (число строк, виджетов, тексты
+    SQL). Замеры одного потока вкладываются друг в друга, поэтому в трассе
+    видно, сколько времени экрана ушло на запросы и сколько на Tk. Хранятся
+    последние max_events замеров.
+    """
+
+    def __init__(self, max_events=100000):
+        self.started = time.perf_counter()
+        self.events = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._threads = {}
+
+    @contextmanager
+    def span(self, name, category, **args):
+        """Замерить блок; args можно дополнить внутри блока"""
+        stack = self._stack()
+        stack.append(args)
+        started = time.perf_counter()
+        try:
+            yield args
+        finally:
+            duration = time.perf_counter() - started
+            stack.pop()
+            thread = threading.current_thread()
+            with self._lock:
+                self._threads[thread.ident] = thread.name
+                self.events.append((name, category, thread.ident,
+                                    started - self.started, duration, args))
+
+    def statement(self, sql):
+        """Добавить текст SQL к текущему замеру потока (set_trace_callback)"""
+        stack = self._stack()
+        # Выражения триггеров и FTS-таблиц SQLite сообщает с префиксом «--»
+        if not stack or sql.startswith('--'):
+            return
+        statements = stack[-1].setdefault('sql', [])
+        text = ' '.join(sql.split())[:300]
+        if len(statements) < MAX_STATEMENTS and (not statements or statements[-1] != text):
+            statements.append(text)
+
+    def instrument(self, obj, names, category, measure=None):
+        """Заменить методы obj из names на замеряемые обертки.
+
+        measure(result, args) дополняет аргументы замера по результату.
+        Генераторы замеряются по шагам: каждая выдача — отдельный замер.
+        """
+        for name in names:
+            setattr(obj, name, self._wrap(getattr(obj, name), name, category, measure))
+
+    def _wrap(self, method, name, category, measure):
+        @functools.wraps(method)
+        def traced(*args, **kwargs):
+            with self.span(name, category) as info:
+                result = method(*args, **kwargs)
+                if hasattr(result, '__next__'):
+                    return self._iterate(result, name, category, measure)
+                if measure is not None:
+                    measure(result, info)
+            return result
+        return traced
+
+    def _iterate(self, iterator, name, category, measure):
+        while True:
+            with self.span(name, category) as info:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                if measure is not None:
+                    measure(item, info)
+            yield item
+
+    def _stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
+    def slowest(self, limit=20, category=None):
+        """Самые долгие замеры: (имя, категория, длительность, аргументы)"""
+        with self._lock:
+            events = [event for event in self.events
+                      if category is None or event[1] == category]
+        events.sort(key=lambda event: event[4], reverse=True)
+        return [(name, cat, duration, args)
+                for name, cat, _, _, duration, args in events[:limit]]
+
+    def summary(self):
+        """Итоги по именам: {(имя, категория): (число, сумма, максимум)}"""
+        totals = {}
+        with self._lock:
+            events = list(self.events)
+        for name, category, _, _, duration, _ in events:
+            count, total, longest = totals.get((name, category), (0, 0.0, 0.0))
+            totals[(name, category)] = (count + 1, total + duration, max(longest, duration))
+        return totals
+
+    def export(self, path):
+        """Записать трассу в формате Chrome Trace Event (chrome://tracing, Perfetto)"""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self._threads)
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': ident,
+                  'args': {'name': name}} for ident, name in threads.items()]
+        for name, category, ident, start, duration, args in events:
+            trace.append({'name': name, 'cat': category, 'ph': 'X', 'pid': pid,
+                          'tid': ident, 'ts': round(start * 1e6, 1),
+                          'dur': round(duration * 1e6, 1), 'args': args})
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms'}, f,
+                      ensure_ascii=False, default=str)
+        return len(events)
+
+
+def count_rows(result, args):
+    """measure для методов репозитория: число строк результата"""
+    if isinstance(result, (list, dict)):
+        args['rows'] = len(result)
+    elif isinstance(result, tuple):
+        args['rows'] = 1
+    elif result is None:
+        args['rows'] = 0
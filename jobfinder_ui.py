@@ -0,0 +1,569 @@
+import queue
+import threading
+import time
+import tkinter as tk
+from collections import OrderedDict, deque
+from tkinter import ttk
+
+from jobfinder_records import VacancyColumns, salary_text
+
+
+class VacancyCard(tk.Frame):
+    """Карточка вакансии (Vacancy), которую можно перепривязать к другой"""
+
+    def __init__(self, parent, colors, format_employment, on_details, on_apply,
+                 on_favorite=None, is_favorite=None, selection=None, on_select=None):
+        super().__init__(parent, bg=colors['white'], relief='groove', borderwidth=1)
+        self.vacancy = None
+        self.colors = colors
+        self.format_employment = format_employment
+        self.on_details = on_details
+        self.on_apply = on_apply
+        # on_favorite(id) переключает избранное, is_favorite(id) — его состояние
+        self.on_favorite = on_favorite
+        self.is_favorite = is_favorite
+        # selection — общее множество id отмеченных вакансий списка,
+        # on_select() вызывается после изменения отметки
+        self.selection = selection
+        self.on_select = on_select
+        self.selected = tk.BooleanVar(value=False)
+
+        # Заголовок и зарплата
+        title_frame = tk.Frame(self, bg=colors['white'])
+        title_frame.pack(fill='x', padx=20, pady=(10, 5))
+
+        self.title_label = tk.Label(title_frame,
+                                    font=('Segoe UI', 16, 'bold'),
+                                    fg=colors['dark'],
+                                    bg=colors['white'],
+                                    anchor='w')
+        self.title_label.pack(side='left')
+
+        self.salary_label = tk.Label(title_frame,
+                                     font=('Segoe UI', 14),
+                                     fg=colors['success'],
+                                     bg=colors['white'])
+        self.salary_label.pack(side='right')
+
+        # Компания и локация
+        info_frame = tk.Frame(self, bg=colors['white'])
+        info_frame.pack(fill='x', padx=20, pady=5)
+
+        self.company_label = tk.Label(info_frame,
+                                      font=('Segoe UI', 12),
+                                      fg=colors['gray'],
+                                      bg=colors['white'])
+        self.company_label.pack(side='left')
+
+        self.location_label = tk.Label(info_frame,
+                                       font=('Segoe UI', 12),
+                                       fg=colors['gray'],
+                                       bg=colors['white'])
+        self.location_label.pack(side='right')
+
+        # Описание
+        self.description_label = tk.Label(self,
+                                          font=('Segoe UI', 11),
+                                          fg=colors['dark'],
+                                          bg=colors['white'],
+                                          wraplength=800,
+                                          justify='left',
+                                          anchor='w')
+        self.description_label.pack(fill='x', padx=20, pady=10)
+
+        # Кнопки действий
+        button_frame = tk.Frame(self, bg=colors['white'])
+        button_frame.pack(fill='x', padx=20, pady=(5, 10))
+
+        if selection is not None:
+            tk.Checkbutton(button_frame, text="Выбрать",
+                           font=('Segoe UI', 10),
+                           bg=colors['white'],
+                           variable=self.selected,
+                           command=self._toggle_selected).pack(side='left', padx=5)
+
+        tk.Button(button_frame, text="Подробнее",
+                  font=('Segoe UI', 10),
+                  bg=colors['primary'],
+                  fg='white',
+                  cursor='hand2',
+                  command=lambda: self.on_details(self.vacancy)).pack(side='left', padx=5)
+
+        tk.Button(button_frame, text="Откликнуться",
+                  font=('Segoe UI', 10, 'bold'),
+                  bg=colors['success'],
+                  fg=colors['dark'],
+                  cursor='hand2',
+                  command=lambda: self.on_apply(self.vacancy.id)).pack(side='left', padx=5)
+
+        self.favorite_btn = tk.Button(button_frame, text="⭐ В избранное",
+                                      font=('Segoe UI', 10),
+                                      bg=colors['accent'],
+                                      fg='white',
+                                      cursor='hand2',
+                                      command=self._toggle_favorite)
+        if on_favorite is not None:
+            self.favorite_btn.pack(side='left', padx=5)
+
+    def _toggle_favorite(self):
+        self.on_favorite(self.vacancy.id)
+        self.update_favorite()
+
+    def _toggle_selected(self):
+        if self.selected.get():
+            self.selection.add(self.vacancy.id)
+        else:
+            self.selection.discard(self.vacancy.id)
+        if self.on_select is not None:
+            self.on_select()
+
+    def update_selection(self):
+        """Показать отметку вакансии по множеству selection"""
+        if self.selection is not None and self.vacancy is not None:
+            self.selected.set(self.vacancy.id in self.selection)
+
+    def update_favorite(self):
+        """Показать на кнопке, в избранном ли вакансия"""
+        if self.is_favorite is None or self.vacancy is None:
+            return
+        if self.is_favorite(self.vacancy.id):
+            self.favorite_btn.config(text="★ В избранном", bg=self.colors['secondary'])
+        else:
+            self.favorite_btn.config(text="⭐ В избранное", bg=self.colors['accent'])
+
+    def show(self, vacancy):
+        """Показать в карточке вакансию (jobfinder_records.Vacancy).
+
+        У результатов поиска подсвеченные заголовок и фрагмент описания
+        выводятся вместо исходных.
+        """
+        self.vacancy = vacancy
+        title = vacancy.highlight or vacancy.title
+        if vacancy.snippet is not None:
+            description = vacancy.snippet
+        else:
+            summary = vacancy.summary or ""
+            description = summary[:200] + "..." if len(summary) > 200 else summary
+
+        self.title_label.config(text=title)
+        self.salary_label.config(text=salary_text(vacancy.salary_from, vacancy.salary_to))
+        self.company_label.config(text=f"🏢 {vacancy.company_name}")
+        self.location_label.config(
+            text=f"📍 {vacancy.city} • {self.format_employment(vacancy.employment_type)}")
+        self.description_label.config(text=description)
+        self.update_favorite()
+        self.update_selection()
+
+
+class ResumeCard(tk.Frame):
+    """Карточка резюме в результатах поиска (строка search_resumes)"""
+
+    def __init__(self, parent, colors):
+        super().__init__(parent, bg=colors['white'], relief='groove', borderwidth=1)
+
+        title_frame = tk.Frame(self, bg=colors['white'])
+        title_frame.pack(fill='x', padx=20, pady=(10, 5))
+
+        self.position_label = tk.Label(title_frame,
+                                       font=('Segoe UI', 16, 'bold'),
+                                       fg=colors['dark'],
+                                       bg=colors['white'],
+                                       anchor='w')
+        self.position_label.pack(side='left')
+
+        self.salary_label = tk.Label(title_frame,
+                                     font=('Segoe UI', 14),
+                                     fg=colors['success'],
+                                     bg=colors['white'])
+        self.salary_label.pack(side='right')
+
+        info_frame = tk.Frame(self, bg=colors['white'])
+        info_frame.pack(fill='x', padx=20, pady=5)
+
+        self.name_label = tk.Label(info_frame,
+                                   font=('Segoe UI', 12),
+                                   fg=colors['gray'],
+                                   bg=colors['white'])
+        self.name_label.pack(side='left')
+
+        self.contact_label = tk.Label(info_frame,
+                                      font=('Segoe UI', 12),
+                                      fg=colors['gray'],
+                                      bg=colors['white'])
+        self.contact_label.pack(side='right')
+
+        self.skills_label = tk.Label(self,
+                                     font=('Segoe UI', 11, 'bold'),
+                                     fg=colors['primary'],
+                                     bg=colors['white'],
+                                     wraplength=800,
+                                     justify='left',
+                                     anchor='w')
+        self.skills_label.pack(fill='x', padx=20, pady=(5, 0))
+
+        self.experience_label = tk.Label(self,
+                                         font=('Segoe UI', 11),
+                                         fg=colors['dark'],
+                                         bg=colors['white'],
+                                         wraplength=800,
+                                         justify='left',
+                                         anchor='w')
+        self.experience_label.pack(fill='x', padx=20, pady=(5, 10))
+
+    def show(self, resume):
+        """Показать в карточке данные резюме"""
+        name = f"{resume[1] or ''} {resume[2] or ''}".strip() or "Не указано"
+        salary = f"💰 от {resume[7]:,} руб." if resume[7] else ""
+        self.position_label.config(text=resume[6] or resume[5])
+        self.salary_label.config(text=salary)
+        self.name_label.config(text=f"👤 {name}")
+        self.contact_label.config(text=f"📍 {resume[3] or 'Не указано'} • ✉ {resume[4]}")
+        self.skills_label.config(text=f"🛠 {resume[8] or 'Навыки не указаны'}")
+        self.experience_label.config(text=resume[9] or "")
+
+
+class VirtualCardList:
+    """Виртуализированный список карточек на tk.Canvas.
+
+    Создаются только карточки, попадающие в видимую область, и небольшой
+    запас сверху и снизу. При прокрутке те же виджеты перепривязываются к
+    новым строкам, поэтому число виджетов и расход памяти не зависят от
+    количества строк. Все карточки имеют одинаковую высоту row_height.
+    """
+
+    def __init__(self, parent, create_card, bind_card, row_height=220, buffer=2,
+                 bg=None, on_near_end=None):
+        self.create_card = create_card
+        self.bind_card = bind_card
+        self.row_height = row_height
+        self.buffer = buffer
+        self.on_near_end = on_near_end
+        self.rows = []
+        # Пул карточек: [карточка, id окна на канве, индекс привязанной строки]
+        self.pool = []
+
+        self.canvas = tk.Canvas(parent, bg=bg, highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(parent, orient='vertical', command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.canvas.bind('<Configure>', lambda e: self._update())
+        self._bind_wheel(self.canvas)
+
+    def pack(self):
+        """Разместить канву и полосу прокрутки"""
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+    def set_rows(self, rows, keep_position=False):
+        """Заменить все строки списка (keep_position — не прокручивать в начало).
+
+        VacancyColumns используется как есть, остальные строки копируются в
+        список (результаты кэша запросов изменять нельзя).
+        """
+        self.rows = rows if isinstance(rows, VacancyColumns) else list(rows)
+        for slot in self.pool:
+            slot[2] = None
+        if not keep_position:
+            self.canvas.yview_moveto(0)
+        self._update()
+
+    def extend(self, rows):
+        """Добавить строки в конец списка"""
+        self.rows.extend(rows)
+        self._update()
+
+    def _update(self):
+        width = max(self.canvas.winfo_width(), 1)
+        self.canvas.configure(scrollregion=(0, 0, width, len(self.rows) * self.row_height))
+        self._render()
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self._render()
+        if self.on_near_end is not None and float(last) > 0.8:
+            self.on_near_end()
+
+    def _render(self):
+        top = self.canvas.canvasy(0)
+        height = self.canvas.winfo_height()
+        width = max(self.canvas.winfo_width() - 20, 1)
+        first = max(0, int(top // self.row_height) - self.buffer)
+        last = min(len(self.rows), int((top + height) // self.row_height) + 1 + self.buffer)
+
+        while len(self.pool) < last - first:
+            card = self.create_card(self.canvas)
+            window = self.canvas.create_window(10, -self.row_height * 2, window=card,
+                                               anchor='nw')
+            self._bind_wheel(card)
+            self.pool.append([card, window, None])
+
+        # Строка index всегда попадает в ячейку пула index % len(pool), поэтому
+        # при прокрутке на одну строку перепривязывается только одна карточка
+        visible = set()
+        for index in range(first, last):
+            slot = self.pool[index % len(self.pool)]
+            card, window, bound = slot
+            if bound != index:
+                self.bind_card(card, self.rows[index])
+                slot[2] = index
+            self.canvas.coords(window, 10, index * self.row_height + 10)
+            self.canvas.itemconfigure(window, width=width, height=self.row_height - 20)
+            visible.add(id(slot))
+
+        for slot in self.pool:
+            if id(slot) not in visible:
+                # Лишняя карточка уводится за пределы видимой области
+                self.canvas.coords(slot[1], 10, -self.row_height * 2)
+                slot[2] = None
+
+    def _bind_wheel(self, widget):
+        widget.bind('<MouseWheel>', self._on_wheel)
+        widget.bind('<Button-4>', self._on_wheel)
+        widget.bind('<Button-5>', self._on_wheel)
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
+
+    def _on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.canvas.yview_scroll(-1, 'units')
+        else:
+            self.canvas.yview_scroll(1, 'units')
+
+
+class ChunkedTreeLoader:
+    """Постепенное заполнение Treeview большим результатом запроса.
+
+    Фоновый поток читает строки пачками (fetchmany) и кладет их в очередь
+    ограниченного размера, поэтому в памяти одновременно находится лишь
+    несколько пачек. Поток интерфейса вставляет строки порциями через
+    root.after, тратя на каждую порцию не больше time_slice секунд, так что
+    окно остается отзывчивым, а первые строки видны сразу.
+    """
+
+    def __init__(self, root, tree, make_values, on_progress=None, on_done=None,
+                 time_slice=0.015, max_batches=4):
+        self.root = root
+        self.tree = tree
+        self.make_values = make_values
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.time_slice = time_slice
+        self.count = 0
+        # Наибольший id вставленных строк (iid — первый столбец строки)
+        self.last_id = None
+        self._queue = queue.Queue(maxsize=max_batches)
+        self._pending = deque()
+        self._stop = threading.Event()
+        self._finished = threading.Event()
+        self.error = None
+
+    def start(self, executor, stream, *args):
+        """Запустить чтение stream(*args) в executor и вставку строк"""
+        executor.submit(self._produce, stream, *args)
+        self.root.after(1, self._tick)
+
+    def stop(self):
+        """Прекратить загрузку"""
+        self._stop.set()
+
+    def _produce(self, stream, *args):
+        try:
+            for batch in stream(*args):
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(batch, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if self._stop.is_set():
+                    return
+        except Exception as error:
+            self.error = error
+        finally:
+            self._finished.set()
+
+    def _tick(self):
+        if self._stop.is_set() or not self.tree.winfo_exists():
+            self._stop.set()
+            return
+
+        deadline = time.perf_counter() + self.time_slice
+        while time.perf_counter() < deadline:
+            if not self._pending:
+                try:
+                    self._pending.extend(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            row = self._pending.popleft()
+            # Строку мог уже добавить сверху экран (новые записи во время загрузки)
+            if not self.tree.exists(str(row[0])):
+                self.tree.insert('', 'end', iid=str(row[0]), values=self.make_values(row))
+            if self.last_id is None or row[0] > self.last_id:
+                self.last_id = row[0]
+            self.count += 1
+
+        if self._finished.is_set() and not self._pending and self._queue.empty():
+            if self.on_done is not None:
+                self.on_done(self.count)
+            return
+
+        if self.on_progress is not None:
+            self.on_progress(self.count)
+        # Если строки еще есть, продолжаем сразу, иначе ждем следующую пачку
+        self.root.after(1 if self._pending else 20, self._tick)
+
+
+class ScreenManager:
+    """Кэш экранов основной области окна.
+
+    Каждый экран строится в собственном фрейме внутри container. При уходе с
+    экрана фрейм только скрывается, при возврате показывается снова без
+    перестроения и повторных запросов. Экран запоминает версии таблиц, из
+    которых показывает данные (versions(tables)); если к возврату они
+    изменились, вызывается его функция обновления данных, а без нее экран
+    строится заново. Хранится не больше max_screens экранов: дольше всех не
+    открывавшийся уничтожается.
+    """
+
+    def __init__(self, container, versions, max_screens=6):
+        self.container = container
+        self.versions = versions
+        self.max_screens = max_screens
+        # key -> [фрейм, таблицы, версии таблиц, функция обновления, хранить ли]
+        self._screens = OrderedDict()
+        self.current = None
+
+    def open(self, key, tables=(), keep=True):
+        """Показать экран key.
+
+        Возвращает фрейм, если экран нужно построить (его еще нет или он
+        устарел и не умеет обновлять данные), иначе None. Экраны с keep=False
+        (например, формы) уничтожаются сразу при уходе с них.
+        """
+        if self.current is not None and self.current != key:
+            self._hide(self.current)
+
+        screen = self._screens.get(key)
+        if screen is not None:
+            self._screens.move_to_end(key)
+            screen[0].pack(fill='both', expand=True)
+            self.current = key
+            versions = self.versions(screen[1])
+            if versions == screen[2]:
+                return None
+            screen[2] = versions
+            if screen[3] is not None:
+                screen[3]()
+                return None
+            self.discard(key)
+
+        frame = tk.Frame(self.container, bg=self.container.cget('bg'))
+        frame.pack(fill='both', expand=True)
+        self._screens[key] = [frame, tuple(tables), self.versions(tables), None, keep]
+        self.current = key
+        while len(self._screens) > self.max_screens:
+            oldest = next(iter(self._screens))
+            self.discard(oldest)
+        return frame
+
+    def set_refresh(self, refresh):
+        """Функция обновления данных текущего экрана"""
+        if self.current in self._screens:
+            self._screens[self.current][3] = refresh
+
+    def sync(self):
+        """Запомнить текущие версии таблиц текущего экрана.
+
+        Для экранов, которые сами обновили показанные строки после записи,
+        чтобы при возврате они не перестраивались целиком.
+        """
+        screen = self._screens.get(self.current)
+        if screen is not None:
+            screen[2] = self.versions(screen[1])
+
+    def discard(self, key):
+        """Уничтожить экран key"""
+        screen = self._screens.pop(key, None)
+        if screen is not None:
+            screen[0].destroy()
+        if self.current == key:
+            self.current = None
+
+    def clear(self):
+        """Уничтожить все экраны"""
+        for key in list(self._screens):
+            self.discard(key)
+
+    def _hide(self, key):
+        screen = self._screens.get(key)
+        if screen is None:
+            return
+        if screen[4]:
+            screen[0].pack_forget()
+        else:
+            self.discard(key)
+
+
+class ProfilerPanel(tk.Toplevel):
+    """Окно режима профилирования: самые долгие операции и итоги по именам.
+
+    Таблицы обновляются раз в refresh_interval мс, пока окно открыто.
+    """
+
+    def __init__(self, root, tracer, on_export, refresh_interval=1000, limit=30):
+        super().__init__(root)
+        self.title("Профилирование")
+        self.geometry("760x520")
+        self.tracer = tracer
+        self.refresh_interval = refresh_interval
+        self.limit = limit
+
+        toolbar = tk.Frame(self)
+        toolbar.pack(fill='x', padx=5, pady=5)
+        tk.Button(toolbar, text="Экспорт трассы", command=on_export).pack(side='left')
+        tk.Button(toolbar, text="Очистить", command=self._clear).pack(side='left', padx=5)
+        self.category = tk.StringVar(value='')
+        for text, value in (("Все", ''), ("SQL", 'sql'), ("Экраны", 'screen'), ("Tk", 'tk')):
+            tk.Radiobutton(toolbar, text=text, variable=self.category, value=value,
+                           command=lambda: self._refresh(schedule=False)).pack(side='left')
+
+        tk.Label(self, text="Самые долгие операции", anchor='w').pack(fill='x', padx=5)
+        self.slowest = self._tree(('name', 'category', 'ms', 'details'),
+                                  ('Операция', 'Тип', 'мс', 'Строки / виджеты'),
+                                  (260, 70, 80, 300))
+        tk.Label(self, text="Итоги", anchor='w').pack(fill='x', padx=5)
+        self.totals = self._tree(('name', 'category', 'count', 'total', 'max'),
+                                 ('Операция', 'Тип', 'Вызовов', 'Всего, мс', 'Макс., мс'),
+                                 (260, 70, 90, 120, 120))
+        self._refresh()
+
+    def _tree(self, columns, headings, widths):
+        tree = ttk.Treeview(self, columns=columns, show='headings', height=8)
+        for column, heading, width in zip(columns, headings, widths):
+            tree.heading(column, text=heading)
+            tree.column(column, width=width, anchor='w')
+        tree.pack(fill='both', expand=True, padx=5, pady=(0, 5))
+        return tree
+
+    def _clear(self):
+        self.tracer.clear()
+        self._refresh(schedule=False)
+
+    def _refresh(self, schedule=True):
+        if not self.winfo_exists():
+            return
+        category = self.category.get() or None
+        self.slowest.delete(*self.slowest.get_children())
+        for name, cat, duration, args in self.tracer.slowest(self.limit, category):
+            details = ', '.join(f"{key}: {args[key]}" for key in ('rows', 'widgets')
+                                if key in args)
+            self.slowest.insert('', 'end', values=(name, cat, f"{duration * 1000:.2f}",
+                                                   details))
+        self.totals.delete(*self.totals.get_children())
+        totals = sorted(self.tracer.summary().items(), key=lambda item: item[1][1],
+                        reverse=True)
+        for (name, cat), (count, total, longest) in totals[:self.limit]:
+            if category is None or cat == category:
+                self.totals.insert('', 'end', values=(name, cat, count, f"{total * 1000:.1f}",
+                                                      f"{longest * 1000:.2f}"))
+        if schedule:
+            self.after(self.refresh_interval, self._refresh)
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobfinder_db import JobFinderRepository
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Пустая база с текущей схемой"""
+    repo = JobFinderRepository(str(tmp_path / 'test.db'))
+    repo.migrate()
+    yield repo
+    repo.close()
+
+
+@pytest.fixture
+def seeded_repo(repo):
+    """База с небольшим синтетическим набором данных"""
+    from jobfinder_seed import generate_dataset
+
+    generate_dataset(repo, 500, applications=1000, seekers=100, employers=10)
+    return repo
+
+
+@pytest.fixture
+def employer_id(repo):
+    return repo.create_employer('hr@example.com', 'hash', 'ООО Тест')
+
+
+@pytest.fixture
+def resume_id(repo):
+    seeker_id = repo.create_seeker('me@example.com', 'hash', 'Иван', 'Иванов')
+    return repo.create_resume(seeker_id, 'Python Developer', 'Python Developer', 150000,
+                              '3 года', 'Высшее', 'Python, SQL')
+
+
+@pytest.fixture
+def add_vacancy(repo):
+    """Добавить вакансию: add_vacancy(employer_id, title, **столбцы) -> id"""
+    from jobfinder_db import SQL_INSERT_VACANCY
+
+    def add(employer_id, title, description='', requirements='', salary_from=None,
+            salary_to=None, employment_type='full_time', city='Москва'):
+        conn = repo.connection()
+        with conn:
+            vacancy_id = conn.execute(SQL_INSERT_VACANCY, (
+                employer_id, title, description, requirements, salary_from, salary_to,
+                employment_type, city)).lastrowid
+        repo.mark_changed('vacancies')
+        return vacancy_id
+    return add
@@ -0,0 +1,27 @@
+from jobfinder_db import STATUS_CONFLICT, STATUS_NOT_ALLOWED
+
+
+def test_set_application_statuses_reports_rejections(repo, employer_id, resume_id,
+                                                     add_vacancy):
+    vacancies = [add_vacancy(employer_id, f"Вакансия {number}") for number in range(4)]
+    repo.create_applications(resume_id, vacancies, None)
+    ids = [row[0] for row in repo.connection().execute(
+        "SELECT id FROM applications ORDER BY id")]
+    hired, changed, ok, other = ids
+    repo.set_application_statuses(employer_id, {hired: 'pending'}, 'hired')
+    # Другое окно успело изменить отклик
+    repo.set_application_statuses(employer_id, {changed: 'pending'}, 'viewed')
+
+    updated, rejected = repo.set_application_statuses(
+        employer_id,
+        {hired: 'hired', changed: 'pending', ok: 'pending', 999: 'pending'},
+        'rejected')
+    assert updated == [ok]
+    assert rejected == {hired: (STATUS_NOT_ALLOWED, 'hired'),
+                        changed: (STATUS_CONFLICT, 'viewed'),
+                        999: (STATUS_CONFLICT, None)}
+
+    # Отклики чужого работодателя не меняются
+    stranger = repo.create_employer('other@example.com', 'hash', 'ООО Другое')
+    assert repo.set_application_statuses(stranger, {other: 'pending'}, 'viewed') == (
+        [], {other: (STATUS_CONFLICT, None)})
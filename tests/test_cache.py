@@ -0,0 +1,71 @@
+import jobfinder_db
+from jobfinder_db import QueryCache
+
+
+def fetch(cache, key, tables, result):
+    """Прочитать через кэш: result подставляется при промахе"""
+    found, value = cache.get(key, tables)
+    if found:
+        return value
+    cache.put(key, tables, result, value)
+    return result
+
+
+def test_hit_and_invalidation_by_table():
+    cache = QueryCache()
+    assert fetch(cache, 'a', ('vacancies',), 1) == 1
+    assert fetch(cache, 'b', ('users',), 2) == 2
+    assert fetch(cache, 'a', ('vacancies',), 'stale') == 1
+
+    cache.invalidate(('vacancies',))
+    assert cache.get('a', ('vacancies',))[0] is False
+    assert cache.get('b', ('users',)) == (True, 2)
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_result_read_during_write_is_not_cached():
+    cache = QueryCache()
+    found, token = cache.get('a', ('vacancies', 'users'))
+    assert not found
+    # Таблица изменилась, пока выполнялся запрос
+    cache.invalidate(('users',))
+    cache.put('a', ('vacancies', 'users'), 'stale', token)
+    assert cache.get('a', ('vacancies', 'users'))[0] is False
+
+    # После invalidate новая метка снова позволяет сохранить результат
+    assert fetch(cache, 'a', ('vacancies', 'users'), 'fresh') == 'fresh'
+    assert cache.get('a', ('vacancies', 'users')) == (True, 'fresh')
+
+
+def test_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(jobfinder_db.time, 'monotonic', lambda: now[0])
+    cache = QueryCache(ttl=60.0)
+    fetch(cache, 'a', ('vacancies',), 1)
+    now[0] += 59
+    assert cache.get('a', ('vacancies',)) == (True, 1)
+    now[0] += 2
+    assert cache.get('a', ('vacancies',))[0] is False
+    assert cache.stats()['entries'] == 0
+
+
+def test_lru_eviction():
+    cache = QueryCache(max_entries=2)
+    fetch(cache, 'a', ('t',), 1)
+    fetch(cache, 'b', ('t',), 2)
+    cache.get('a', ('t',))
+    fetch(cache, 'c', ('t',), 3)
+    assert cache.get('b', ('t',))[0] is False
+    assert cache.get('a', ('t',)) == (True, 1)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_repository_write_invalidates_triggered_tables(repo, employer_id, add_vacancy):
+    add_vacancy(employer_id, 'Python Developer')
+    assert len(repo.search_vacancies('python')) == 1
+    hits = repo.cache.stats()['hits']
+    assert len(repo.search_vacancies('python')) == 1
+    assert repo.cache.stats()['hits'] == hits + 1
+
+    add_vacancy(employer_id, 'Python Team Lead')
+    assert len(repo.search_vacancies('python')) == 2
@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+# Счетчики, пересчитанные по исходным таблицам
+SQL_EXPECTED_STATS = """
+    SELECT u.id,
+           (SELECT COUNT(*) FROM vacancies v WHERE v.employer_id = u.id),
+           (SELECT COUNT(*) FROM vacancies v WHERE v.employer_id = u.id AND v.is_active = 1),
+           COUNT(a.id),
+           COUNT(a.id) FILTER (WHERE a.status = 'pending'),
+           COUNT(a.id) FILTER (WHERE a.status = 'viewed'),
+           COUNT(a.id) FILTER (WHERE a.status = 'interview'),
+           COUNT(a.id) FILTER (WHERE a.status = 'rejected'),
+           COUNT(a.id) FILTER (WHERE a.status = 'hired')
+    FROM users u
+    LEFT JOIN vacancies v ON v.employer_id = u.id
+    LEFT JOIN applications a ON a.vacancy_id = v.id
+    WHERE u.user_type = 'employer'
+    GROUP BY u.id
+"""
+
+SQL_STATS = """
+    SELECT employer_id, vacancies_total, vacancies_active, applications_total,
+           applications_pending, applications_viewed, applications_interview,
+           applications_rejected, applications_hired
+    FROM employer_stats
+"""
+
+
+def assert_stats_consistent(conn):
+    expected = {row[0]: row[1:] for row in conn.execute(SQL_EXPECTED_STATS)}
+    actual = {row[0]: row[1:] for row in conn.execute(SQL_STATS)}
+    for employer_id, counts in expected.items():
+        assert actual.get(employer_id, (0,) * 8) == counts, employer_id
+
+
+def test_counters_after_seed(seeded_repo):
+    assert_stats_consistent(seeded_repo.connection())
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_counters_after_random_writes(seeded_repo, seed):
+    rnd = random.Random(seed)
+    conn = seeded_repo.connection()
+    employers = [row[0] for row in conn.execute(
+        "SELECT id FROM users WHERE user_type = 'employer'")]
+    statuses = ('pending', 'viewed', 'interview', 'rejected', 'hired')
+    for _ in range(200):
+        vacancy_ids = [row[0] for row in conn.execute("SELECT id FROM vacancies")]
+        application_ids = [row[0] for row in conn.execute("SELECT id FROM applications")]
+        action = rnd.randrange(6)
+        with conn:
+            if action == 0:
+                conn.execute("INSERT INTO vacancies (employer_id, title, is_active) VALUES (?, ?, ?)",
+                             (rnd.choice(employers), 'Новая', rnd.randrange(2)))
+            elif action == 1:
+                conn.execute("UPDATE vacancies SET is_active = 1 - is_active WHERE id = ?",
+                             (rnd.choice(vacancy_ids),))
+            elif action == 2:
+                # Перенос вакансии вместе с откликами к другому работодателю
+                conn.execute("UPDATE vacancies SET employer_id = ? WHERE id = ?",
+                             (rnd.choice(employers), rnd.choice(vacancy_ids)))
+            elif action == 3:
+                vacancy_id = rnd.choice(vacancy_ids)
+                conn.execute("DELETE FROM applications WHERE vacancy_id = ?", (vacancy_id,))
+                conn.execute("DELETE FROM vacancies WHERE id = ?", (vacancy_id,))
+            elif action == 4:
+                conn.execute("UPDATE applications SET status = ? WHERE id = ?",
+                             (rnd.choice(statuses), rnd.choice(application_ids)))
+            else:
+                conn.execute("DELETE FROM applications WHERE id = ?",
+                             (rnd.choice(application_ids),))
+    assert_stats_consistent(conn)
+
+
+def test_repository_stats_follow_writes(repo, employer_id, resume_id, add_vacancy):
+    assert repo.get_employer_stats(employer_id) == (0,) * 7
+    vacancy_id = add_vacancy(employer_id, 'Python Developer')
+    add_vacancy(employer_id, 'Java Developer')
+    assert repo.get_employer_stats(employer_id)[:4] == (2, 2, 0, 0)
+
+    application_id = repo.create_application(resume_id, vacancy_id, '')
+    assert repo.get_employer_stats(employer_id)[:4] == (2, 2, 1, 1)
+
+    updated, rejected = repo.set_application_statuses(
+        employer_id, {application_id: 'pending'}, 'interview')
+    assert updated and not rejected
+    assert repo.get_employer_stats(employer_id) == (2, 2, 1, 0, 1, 0, 0)
@@ -0,0 +1,75 @@
+from collections import Counter
+
+import pytest
+
+from jobfinder_db import SALARY_FACETS, build_facets_sql, build_fts_query, facet_counts
+
+pytest.importorskip('numpy')
+
+
+def sql_groups(repo, match, salary_from, salary_to):
+    params = [salary_from, salary_to] + ([match] if match else [])
+    return repo.connection().execute(build_facets_sql(bool(match)), params).fetchall()
+
+
+@pytest.mark.parametrize('keywords, salary_from, salary_to', [
+    ('', None, None),
+    ('', 100000, None),
+    ('', None, 150000),
+    ('python', 100000, 300000),
+    ('нет такого слова', None, None),
+])
+def test_index_groups_match_sql(seeded_repo, keywords, salary_from, salary_to):
+    match = build_fts_query(keywords)
+    index = seeded_repo.facet_index()
+    assert (sorted(index.groups(match, salary_from, salary_to))
+            == sorted(sql_groups(seeded_repo, match, salary_from, salary_to)))
+
+
+def test_matching_ids_empty(seeded_repo):
+    ids = seeded_repo.facet_index().matching_ids(build_fts_query('нет такого слова'))
+    assert ids.dtype.kind == 'i' and len(ids) == 0
+
+
+def test_facet_counts_match_group_by(seeded_repo):
+    conn = seeded_repo.connection()
+    city, salary_from = conn.execute(
+        "SELECT city, 100000 FROM vacancies WHERE is_active = 1 GROUP BY city "
+        "ORDER BY COUNT(*) DESC LIMIT 1").fetchone()
+    groups = sql_groups(seeded_repo, '', salary_from, None)
+    total, cities, types, salaries = facet_counts(groups, city=city)
+
+    matching = "is_active = 1 AND salary_to >= ?"
+    assert total == conn.execute(
+        f"SELECT COUNT(*) FROM vacancies WHERE {matching} AND city = ?",
+        (salary_from, city)).fetchone()[0]
+    # Фасет города не учитывает выбранный город
+    assert Counter(dict(cities)) == Counter(dict(conn.execute(
+        f"SELECT city, COUNT(*) FROM vacancies WHERE {matching} AND city != '' "
+        "GROUP BY city", (salary_from,)).fetchall()))
+    assert Counter(dict(types)) == Counter(dict(conn.execute(
+        f"SELECT employment_type, COUNT(*) FROM vacancies WHERE {matching} AND city = ? "
+        "AND employment_type != '' GROUP BY employment_type",
+        (salary_from, city)).fetchall()))
+    # Порог зарплаты не учитывает «зарплату от»
+    expected = []
+    for threshold in SALARY_FACETS:
+        count = conn.execute(
+            "SELECT COUNT(*) FROM vacancies WHERE is_active = 1 AND city = ? "
+            "AND salary_to >= ?", (city, threshold)).fetchone()[0]
+        if count:
+            expected.append((threshold, count))
+    assert salaries == expected
+
+
+def test_index_follows_changes(seeded_repo, employer_id, add_vacancy):
+    index = seeded_repo.facet_index()
+    index.groups()
+    vacancy_id = add_vacancy(employer_id, 'Редкая профессия', city='Тестоград',
+                             salary_to=500000)
+    conn = seeded_repo.connection()
+    assert sorted(index.groups()) == sorted(sql_groups(seeded_repo, '', None, None))
+    with conn:
+        conn.execute("UPDATE vacancies SET is_active = 0 WHERE id = ?", (vacancy_id,))
+    seeded_repo.mark_changed('vacancies')
+    assert sorted(index.groups()) == sorted(sql_groups(seeded_repo, '', None, None))
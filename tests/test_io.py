@@ -0,0 +1,141 @@
+import csv
+import json
+import os
+
+import pytest
+
+from jobfinder_db import EXPORT_VACANCY_COLUMNS
+from jobfinder_io import ExportCancelled, ExportJob, export_rows, import_vacancies
+
+
+class Interrupted(Exception):
+    pass
+
+
+def write_csv(path, titles, employer_id):
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['external_id', 'employer_id', 'title', 'city'])
+        for title in titles:
+            writer.writerow([title, employer_id, title, 'Москва'])
+
+
+def imported_titles(repo):
+    return [row[0] for row in repo.connection().execute(
+        "SELECT title FROM vacancies ORDER BY id")]
+
+
+def interrupt_after_first_batch(result):
+    raise Interrupted()
+
+
+def test_resume_after_interruption(repo, tmp_path, employer_id):
+    path = str(tmp_path / 'vacancies.csv')
+    titles = [f"v{number}" for number in range(10)]
+    write_csv(path, titles, employer_id)
+
+    with pytest.raises(Interrupted):
+        import_vacancies(repo, path, batch_size=4, on_progress=interrupt_after_first_batch)
+    assert imported_titles(repo) == titles[:4]
+
+    result = import_vacancies(repo, path, batch_size=4)
+    assert result.resumed_from == 4
+    assert result.imported == 6
+    assert imported_titles(repo) == titles
+    # Завершенный импорт удаляет контрольную точку
+    assert repo.connection().execute("SELECT COUNT(*) FROM import_checkpoints").fetchone()[0] == 0
+
+
+def test_checkpoint_of_other_file_at_same_path_is_discarded(repo, tmp_path, employer_id):
+    path = str(tmp_path / 'vacancies.csv')
+    write_csv(path, [f"old{number}" for number in range(10)], employer_id)
+    with pytest.raises(Interrupted):
+        import_vacancies(repo, path, batch_size=4, on_progress=interrupt_after_first_batch)
+
+    # Следующий файл лег по тому же пути
+    os.remove(path)
+    new_titles = [f"new{number}" for number in range(10)]
+    write_csv(path, new_titles, employer_id)
+    result = import_vacancies(repo, path, batch_size=4)
+    assert result.resumed_from == 0
+    assert result.imported == 10
+    assert imported_titles(repo)[4:] == new_titles
+
+
+def test_unknown_employer_is_rejected(repo, tmp_path, employer_id):
+    seeker_id = repo.create_seeker('me@example.com', 'hash', 'Иван', 'Иванов')
+    path = str(tmp_path / 'vacancies.ndjson')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f'{{"title": "ok", "employer_id": {employer_id}}}\n')
+        f.write(f'{{"title": "seeker", "employer_id": {seeker_id}}}\n')
+        f.write('{"title": "missing", "employer_id": 999}\n')
+
+    result = import_vacancies(repo, path)
+    assert result.imported == 1
+    assert [position for position, _ in result.errors] == [2, 3]
+    assert imported_titles(repo) == ['ok']
+    assert repo.connection().execute(
+        "SELECT employer_id FROM employer_stats").fetchall() == [(employer_id,)]
+
+    with pytest.raises(ValueError):
+        import_vacancies(repo, path, employer_id=seeker_id)
+
+
+TRICKY_TITLES = ['Обычная', 'С запятой, и "кавычками"', 'Две\nстроки', ' пробелы ', '=1+2']
+
+
+@pytest.fixture
+def exported_vacancies(repo, employer_id, add_vacancy):
+    other = repo.create_employer('other@example.com', 'hash', 'ООО Другое')
+    add_vacancy(other, 'Чужая вакансия')
+    for title in TRICKY_TITLES:
+        add_vacancy(employer_id, title, description=title + ';\r\nописание', salary_from=1000)
+    return employer_id
+
+
+def test_export_csv(repo, tmp_path, exported_vacancies):
+    path = str(tmp_path / 'vacancies.csv')
+    count = export_rows(repo.stream_vacancy_export(exported_vacancies, batch_size=2),
+                        EXPORT_VACANCY_COLUMNS, path)
+    assert count == len(TRICKY_TITLES)
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == count
+    assert list(rows[0]) == list(EXPORT_VACANCY_COLUMNS)
+    assert sorted(row['title'] for row in rows) == sorted(TRICKY_TITLES)
+    assert all(row['description'] == row['title'] + ';\r\nописание' for row in rows)
+    # NULL выгружается пустой строкой
+    assert {row['salary_to'] for row in rows} == {''}
+    assert not os.path.exists(path + '.part')
+
+
+def test_export_ndjson(repo, tmp_path, exported_vacancies):
+    path = str(tmp_path / 'vacancies.ndjson')
+    count = export_rows(repo.stream_vacancy_export(exported_vacancies, batch_size=2),
+                        EXPORT_VACANCY_COLUMNS, path)
+    with open(path, encoding='utf-8') as f:
+        rows = [json.loads(line) for line in f]
+    assert count == len(rows) == len(TRICKY_TITLES)
+    assert sorted(row['title'] for row in rows) == sorted(TRICKY_TITLES)
+    assert {row['salary_to'] for row in rows} == {None}
+
+
+def test_cancelled_export_keeps_old_file(repo, tmp_path, exported_vacancies):
+    path = str(tmp_path / 'vacancies.csv')
+    with open(path, 'w') as f:
+        f.write('old')
+    with pytest.raises(ExportCancelled):
+        export_rows(repo.stream_vacancy_export(exported_vacancies, batch_size=2),
+                    EXPORT_VACANCY_COLUMNS, path, should_stop=lambda: True)
+    with open(path) as f:
+        assert f.read() == 'old'
+    assert not os.path.exists(path + '.part')
+
+
+def test_export_job(repo, tmp_path, exported_vacancies):
+    path = str(tmp_path / 'vacancies.csv')
+    job = ExportJob(repo.stream_vacancy_export, (exported_vacancies, 2),
+                    EXPORT_VACANCY_COLUMNS, path, release=repo.release).start()
+    job._thread.join(10)
+    assert job.done and job.error is None and not job.cancelled
+    assert job.count == len(TRICKY_TITLES)
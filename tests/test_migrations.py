@@ -0,0 +1,20 @@
+from jobfinder_db import SCHEMA_VERSION, missing_triggers, schema_triggers
+
+
+def test_current_schema_check_is_cheap(repo):
+    # Проверка при запуске не строит эталонную схему в памяти
+    schema_triggers.cache_clear()
+    assert not repo.needs_migration()
+    assert repo.migrate() == (SCHEMA_VERSION, SCHEMA_VERSION)
+    assert schema_triggers.cache_info().currsize == 0
+
+
+def test_upgrade_restores_lost_triggers(repo):
+    conn = repo.connection()
+    conn.execute("DROP TRIGGER vacancies_fts_insert")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION - 1}")
+    conn.commit()
+
+    assert repo.needs_migration()
+    assert repo.migrate() == (SCHEMA_VERSION - 1, SCHEMA_VERSION)
+    assert missing_triggers(conn) == []
@@ -0,0 +1,15 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from jobfinder_db import HOT_QUERIES, SCHEMA_VERSION, JobFinderRepository, find_full_scans
+
+
+def test_hot_queries_use_indexes(tmp_path):
+    repo = JobFinderRepository(str(tmp_path / 'plans.db'))
+    try:
+        assert repo.migrate() == (0, SCHEMA_VERSION)
+        assert find_full_scans(repo.connection(), HOT_QUERIES) == []
+    finally:
+        repo.close()
@@ -0,0 +1,81 @@
+import pytest
+
+from jobfinder_records import MISSING, Vacancy, VacancyColumns, date_key, date_text, salary_text
+
+
+@pytest.mark.parametrize('salary_from, salary_to, text', [
+    (100000, 150000, "💰 100,000 - 150,000 руб."),
+    (100000, None, "💰 от 100,000 руб."),
+    (None, 150000, "💰 до 150,000 руб."),
+    (None, None, "💰 Зарплата не указана"),
+])
+def test_salary_text(salary_from, salary_to, text):
+    assert salary_text(salary_from, salary_to) == text
+
+
+@pytest.mark.parametrize('created_at', [
+    '2024-05-01 12:30:00',
+    '2024-05-01T12:30:00',
+    '2024-05-01 12:30:00.123456',
+    '2024-05-01T12:30:00.5',
+])
+def test_date_key_formats(created_at):
+    assert date_key(created_at) == 20240501123000
+    assert date_text(date_key(created_at)) == '2024-05-01 12:30:00'
+
+
+def test_missing_date():
+    assert date_key(None) == date_key('') == MISSING
+    assert date_text(MISSING) is None
+    assert date_key(None) < date_key('0001-01-01 00:00:00')
+
+
+ROWS = [
+    (3, 'Python', 'Описание', 100000, None, 'Москва', 'Полная занятость', 'Альфа',
+     '2024-05-02 10:00:00'),
+    (1, 'Go', None, None, 200000, None, 'Удаленная работа', 'Бета', None),
+    (2, 'Java', 'Текст', 150000, 250000, 'Казань', None, None, '2024-05-01T09:00:00.25'),
+]
+
+
+def test_columns_round_trip():
+    columns = VacancyColumns(ROWS)
+    assert len(columns) == 3
+    assert [vacancy.astuple() for vacancy in columns] == [
+        ROWS[0],
+        ROWS[1],
+        (2, 'Java', 'Текст', 150000, 250000, 'Казань', None, None, '2024-05-01 09:00:00'),
+    ]
+    # Vacancy и кортеж добавляются одинаково
+    copy = VacancyColumns(columns)
+    assert [vacancy.astuple() for vacancy in copy] == [vacancy.astuple() for vacancy in columns]
+    assert isinstance(copy[0], Vacancy)
+
+
+def test_columns_intern_low_cardinality_only():
+    city = ''.join(['Моск', 'ва'])
+    summary = ''.join(['Опис', 'ание'])
+    columns = VacancyColumns([ROWS[0], (4, 'Rust', summary, None, None, city, None, None, None)])
+    assert columns.columns['city'][0] is columns.columns['city'][1]
+    assert columns.columns['summary'][1] is summary
+
+
+@pytest.mark.parametrize('column, ascending, descending', [
+    ('city', [2, 3, 1], [3, 2, 1]),
+    ('employment_type', [3, 1, 2], [1, 3, 2]),
+    ('company_name', [3, 1, 2], [1, 3, 2]),
+    ('salary_from', [3, 2, 1], [2, 3, 1]),
+    ('salary_to', [1, 2, 3], [2, 1, 3]),
+    ('created_at', [2, 3, 1], [3, 2, 1]),
+])
+def test_sort_puts_missing_last(column, ascending, descending):
+    columns = VacancyColumns(ROWS)
+    assert [vacancy.id for vacancy in columns.sort(column)] == ascending
+    assert [vacancy.id for vacancy in columns.sort(column, reverse=True)] == descending
+
+
+def test_sort_view_of_filtered():
+    columns = VacancyColumns(ROWS).filter(salary_to=200000)
+    assert [vacancy.id for vacancy in columns] == [3, 2]
+    assert [vacancy.id for vacancy in columns.sort('salary_from', reverse=True)] == [2, 3]
+    assert [vacancy.id for vacancy in columns.without(2)] == [3]
@@ -0,0 +1,73 @@
+import pytest
+
+from jobfinder_db import build_fts_query, build_resume_query
+
+
+@pytest.mark.parametrize('text, query', [
+    ('', ''),
+    ('   ', ''),
+    ('"', ''),
+    ('*', ''),
+    ('py', '"py"'),
+    ('python', '"python"*'),
+    ('python dev', '"python" "dev"*'),
+    # Кавычки и операторы FTS5 во вводе - обычный текст
+    ('C++ "senior"', '"C" "senior"*'),
+    ('a OR b', '"a" "OR" "b"'),
+    ('NEAR(x y)', '"NEARx" "y"'),
+    ('Python -java', '"Python" "java"*'),
+    ('sql*', '"sql"*'),
+])
+def test_build_fts_query(text, query):
+    assert build_fts_query(text) == query
+
+
+@pytest.mark.parametrize('text', ['C++ "senior"', 'a OR b', 'NEAR(x y)', 'x AND NOT', '"'])
+def test_fts_query_is_valid(repo, employer_id, add_vacancy, text):
+    """Любой ввод дает запрос, который FTS5 разбирает без ошибки"""
+    vacancy_id = add_vacancy(employer_id, 'Senior C developer')
+    rows = repo.search_vacancies(text)
+    assert [row[0] for row in rows] in ([], [vacancy_id])
+
+
+def test_search_finds_prefix(repo, employer_id, add_vacancy):
+    vacancy_id = add_vacancy(employer_id, 'Python Developer', city='Казань')
+    add_vacancy(employer_id, 'Java Developer')
+    assert [row[0] for row in repo.search_vacancies('pyth')] == [vacancy_id]
+    assert [row[0] for row in repo.search_vacancies('developer', city='Казань')] == [vacancy_id]
+    # Кавычка внутри слова отбрасывается
+    assert [row[0] for row in repo.search_vacancies('py"th')] == [vacancy_id]
+
+
+@pytest.mark.parametrize('text, query, ranked', [
+    ('', '', False),
+    ('+ -', '', False),
+    ('python', '"python"', False),
+    ('python sql', '("python" AND "sql")', False),
+    ('python OR go', '("python" OR "go")', True),
+    ('python ИЛИ go', '("python" OR "go")', True),
+    # Операторы - только заглавными буквами
+    ('python or go', '("python" AND "or" AND "go")', False),
+    ('python NOT java', '("python" NOT "java")', False),
+    ('(python OR go) AND sql', '(("python" OR "go") AND "sql")', True),
+    ('"machine learning"', '"machine learning"', False),
+    ('py*', '"py"*', False),
+    ('p*', '"p"', False),
+    ('a"b', '("a" AND "b")', False),
+    ('"he said ""x"', '("he said " AND "x")', False),
+])
+def test_build_resume_query(text, query, ranked):
+    assert build_resume_query(text) == (query, ranked)
+
+
+@pytest.mark.parametrize('text', ['NOT python', '(python', 'python)', 'python AND'])
+def test_build_resume_query_errors(text):
+    with pytest.raises(ValueError):
+        build_resume_query(text)
+
+
+def test_search_resumes(repo, resume_id):
+    assert [row[0] for row in repo.search_resumes('python AND sql')] == [resume_id]
+    assert [row[0] for row in repo.search_resumes('java OR sql')] == [resume_id]
+    assert repo.search_resumes('python NOT sql') == []
+    assert [row[0] for row in repo.search_resumes('"python developer"')] == [resume_id]
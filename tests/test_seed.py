@@ -0,0 +1,81 @@
+import sqlite3
+from datetime import date
+
+import pytest
+
+from jobfinder_db import missing_triggers
+from jobfinder_seed import SyntheticData, generate_dataset
+
+
+class Interrupted(Exception):
+    pass
+
+
+def count(conn, sql):
+    return conn.execute(sql).fetchone()[0]
+
+
+def test_derived_tables_match_generated_rows(repo):
+    generate_dataset(repo, 300, applications=600, seekers=50, employers=5, batch_size=100)
+    conn = repo.connection()
+    assert missing_triggers(conn) == []
+    vacancies = count(conn, "SELECT COUNT(*) FROM vacancies")
+    assert count(conn, "SELECT COUNT(*) FROM vacancies_fts_docsize") == vacancies
+    assert count(conn, "SELECT COUNT(*) FROM vacancy_changes") == vacancies
+    assert count(conn, "SELECT COUNT(*) FROM resumes_fts_docsize") == 50
+    assert (count(conn, "SELECT SUM(vacancies_total) FROM employer_stats") == vacancies)
+    assert (count(conn, "SELECT SUM(applications_total) FROM employer_stats")
+            == count(conn, "SELECT COUNT(*) FROM applications") == 600)
+
+
+def test_concurrent_writer_waits_and_sees_triggers(repo):
+    other = sqlite3.connect(repo.db_path, timeout=0)
+    seen = []
+
+    def progress(table, done, total):
+        # Схема без триггеров не видна другим соединениям, а запись ждет
+        seen.append(missing_triggers(other))
+        with pytest.raises(sqlite3.OperationalError):
+            other.execute("INSERT INTO users (email, password_hash, user_type) "
+                          "VALUES ('x@example.com', 'hash', 'seeker')")
+        other.rollback()
+
+    try:
+        generate_dataset(repo, 100, seekers=10, employers=2, batch_size=50,
+                         on_progress=progress)
+    finally:
+        other.close()
+    assert seen and all(missing == [] for missing in seen)
+
+
+def test_interrupted_load_leaves_database_unchanged(repo):
+    generate_dataset(repo, 100, seekers=10, employers=2)
+    conn = repo.connection()
+    before = [count(conn, f"SELECT COUNT(*) FROM {table}")
+              for table in ('users', 'vacancies', 'applications', 'employer_stats')]
+
+    def interrupt(table, done, total):
+        if table == 'vacancies':
+            raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        generate_dataset(repo, 100, seekers=10, employers=2, batch_size=50,
+                         on_progress=interrupt)
+    assert missing_triggers(conn) == []
+    assert [count(conn, f"SELECT COUNT(*) FROM {table}")
+            for table in ('users', 'vacancies', 'applications', 'employer_stats')] == before
+
+
+def test_timestamps_are_utc():
+    data = SyntheticData(1, 1, 10, 10, (1, 1, 1), end=date(2024, 5, 1))
+    # Как CURRENT_TIMESTAMP: конец периода — полночь UTC, в любом часовом поясе
+    assert data._timestamp(data.end) == '2024-05-01 00:00:00'
+    assert max(row[-1] for row in data.vacancy_rows()) < '2024-05-01 00:00:00'
+
+
+def test_applications_at_vacancy_cap_are_unique():
+    # Каждое резюме откликается почти на все или на все вакансии
+    data = SyntheticData(1, 5, 400, 2000, (1, 1, 1), end=date(2024, 5, 1))
+    rows = list(data.application_rows())
+    assert len(rows) == 2000
+    assert len({(row[0], row[1]) for row in rows}) == 2000
@@ -0,0 +1,87 @@
+import http.client
+import json
+import sqlite3
+import uuid
+
+import pytest
+
+from jobfinder_server import (LOAD_COVER_LETTER, TOKEN_HEADER, LoopbackServer,
+                              RemoteRepository, load_bounds, run_load)
+
+
+@pytest.fixture
+def server(seeded_repo):
+    server = LoopbackServer(seeded_repo.db_path)
+    yield server
+    server.stop()
+
+
+def post(server, path, body=b'{}', headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', server.port, timeout=10)
+    try:
+        conn.request('POST', path, body, headers or {})
+        response = conn.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        conn.close()
+
+
+def test_concurrent_load_writes_land_once(server):
+    report = run_load(server.url, load_bounds(server.repo.db_path), clients=8,
+                      requests=40, token=server.token)
+    assert report['errors'] == {}
+    assert report['applied'] > 0
+
+    conn = sqlite3.connect(server.repo.db_path)
+    try:
+        created = conn.execute("SELECT COUNT(*) FROM applications WHERE cover_letter = ?",
+                               (LOAD_COVER_LETTER,)).fetchone()[0]
+        duplicates = conn.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM applications "
+            "GROUP BY resume_id, vacancy_id HAVING COUNT(*) > 1)").fetchone()[0]
+    finally:
+        conn.close()
+    assert created == report['applied']
+    assert duplicates == 0
+
+
+def test_repeated_write_with_same_key_runs_once(server):
+    headers = {'Content-Type': 'application/json', TOKEN_HEADER: server.token,
+               'Idempotency-Key': uuid.uuid4().hex}
+    body = json.dumps({'args': [1, [1, 2, 3], LOAD_COVER_LETTER]}).encode()
+    # Отклики резюме 1 удаляются, чтобы первый вызов их создал
+    server.repo.connection().execute("DELETE FROM applications WHERE resume_id = 1")
+    server.repo.connection().commit()
+
+    first = post(server, '/api/create_applications', body, headers)
+    repeated = post(server, '/api/create_applications', body, headers)
+    assert first == repeated
+    assert first[1]['result'] == [1, 2, 3]
+
+
+@pytest.mark.parametrize('headers, status', [
+    ({'Content-Type': 'application/json'}, 401),
+    ({'Content-Type': 'application/json', TOKEN_HEADER: 'wrong'}, 401),
+    ({'Content-Type': 'text/plain', 'token': None}, 415),
+    ({'Content-Type': 'application/json', 'token': None,
+      'Origin': 'http://example.com'}, 403),
+    ({'Content-Type': 'application/json', 'token': None, 'Host': 'evil.example'}, 403),
+])
+def test_rejects_foreign_requests(server, headers, status):
+    headers = dict(headers)
+    if 'token' in headers:
+        del headers['token']
+        headers[TOKEN_HEADER] = server.token
+    assert post(server, '/api/count_vacancies', headers=headers)[0] == status
+
+
+def test_remote_repository_calls_with_token(server):
+    remote = RemoteRepository(server.url, server.token)
+    try:
+        assert remote.count_vacancies() == server.repo.count_vacancies()
+        rows = [row for batch in remote.stream_vacancy_export(1, batch_size=7)
+                for row in batch]
+        assert len(rows) == server.repo.connection().execute(
+            "SELECT COUNT(*) FROM vacancies WHERE employer_id = 1").fetchone()[0] > 0
+    finally:
+        remote.close()
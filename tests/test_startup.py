@@ -0,0 +1,20 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Импорт модуля приложения в отдельном процессе: sys.modules без следов тестов
+CHECK = """
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location('app', 'Kurs rab PI.py')
+app = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(app)
+print(sorted(name for name in sys.modules if name.startswith(('jobfinder', 'sqlite3'))))
+"""
+
+
+def test_app_module_defers_data_and_screen_imports():
+    output = subprocess.run([sys.executable, '-c', CHECK], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    assert output.strip() == '[]'